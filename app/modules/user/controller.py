@@ -6,11 +6,13 @@
 @Desc    :   None
 """
 
-from fastapi import Depends
+from fastapi import Depends, Query, Request
 from fastapi_utils.cbv import cbv
 from fastapi_utils.inferring_router import InferringRouter
 
 from app.modules.user.service import UserService
+from core.plugins.warmup import warmup
+from core.tools.responses import StreamingJSONResponse, StreamingNDJSONResponse
 
 # 建立路由
 router = InferringRouter(prefix="/users", tags=["用户管理"])
@@ -23,13 +25,22 @@ class UserController:
     service: UserService = Depends(UserService)
 
     @router.get("/list", summary="用户列表")
-    def list(self):
-        return "self.service.list()"
+    @warmup(query={"limit": 100})
+    @warmup(query={"limit": 100}, headers={"accept": "application/x-ndjson"})
+    def list(self, request: Request, limit: int = Query(1000, ge=1, le=100000)):
+        """流式返回用户列表，默认为 JSON 数组"""
+        # 边查询边编码发送，Accept 为 application/x-ndjson 时每行返回一个用户
+        users = self.service.iter_users(limit)
+        if "application/x-ndjson" in request.headers.get("accept", ""):
+            return StreamingNDJSONResponse(users)
+        return StreamingJSONResponse(users)
 
     @router.post("/login", summary="登入系统")
     def login(self):
+        """登入系统"""
         return self.service.login()
 
     @router.post("/register", summary="用户注册")
     def register(self):
+        """用户注册"""
         return self.service.register()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   events.py
+@Time    :   2026/10/19 15:48:20
+@Desc    :   用户模块的事件及订阅者
+"""
+
+from datetime import datetime
+
+from core.plugins.events import Event, subscriber
+from core.plugins.loguru import logger
+
+
+class UserRegistered(Event):
+    """用户注册完成"""
+
+    registered_at: datetime
+
+
+@subscriber(UserRegistered, batch_size=50, batch_timeout=1)
+def write_register_audit(events: list[UserRegistered]):
+    """批量记录用户注册的审计日志"""
+    for event in events:
+        logger.info(
+            f"user registered at {event.registered_at:%Y-%m-%d %H:%M:%S}",
+            event_name="audit",
+        )
@@ -6,12 +6,35 @@
 @Desc    :   None
 """
 
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+
+from core.plugins.events import publish_event
+
+from .events import UserRegistered
+
 
 class UserService:
+    """用户服务"""
+
+    def iter_users(self, limit: int) -> Iterator[dict]:
+        """逐条生成用户列表，数据量大时配合流式响应使用，不一次性加载到内存"""
+        created_at = datetime(2025, 1, 1)
+        for user_id in range(1, limit + 1):
+            yield {
+                "id": user_id,
+                "username": f"user{user_id:06d}",
+                "created_at": created_at + timedelta(minutes=user_id),
+            }
+
     def login(self):
+        """登入系统"""
         return "Logged in"
 
     def register(self):
+        """用户注册，注册成功后发布事件"""
+        # 审计日志等耗时的后续处理交给事件订阅者，不占用请求的响应时间
+        publish_event(UserRegistered(registered_at=datetime.now()))
         return "Registered"
 
 
@@ -19,4 +42,5 @@ user_service = UserService()
 
 
 def login(self):
+    """登入系统"""
     return "Logged in"
@@ -34,6 +34,14 @@ class ISettings(BaseSettings):
     LOG_FILE_COMPRESSION: str = "gz"
     # 日志记录的等等级
     LOG_FILE_LEVEL: str = "INFO"
+    # 是否记录用户UA信息
+    LOG_RECORD_UA: bool = False
+    # 请求内span导出为OTLP-JSON文件的目录，为空则不导出
+    LOG_SPAN_EXPORT_PATH: str | None = None
+    # 是否延迟到响应发送之后再构造请求日志
+    LOG_DEFER_REQUEST: bool = False
+    # 记录的响应报文内容的字节数上限
+    LOG_RESPONSE_BODY_LIMIT: int = 64 * 1024
     # 日志需要过滤的不做记录的URL请求
     FLITER_REQUEST_URL: list[str] = [
         "/",
@@ -44,15 +52,102 @@ class ISettings(BaseSettings):
         "/static/swagger-ui.css",
         "/static/swagger-ui-bundle.js",
         "/static/redoc.standalone.js",
+        "/health/ready",
     ]
 
+    # ===========JSON参数配置==============
+    # json_helper 及接口响应使用的 JSON 实现 json | orjson | auto（安装了 orjson 时使用 orjson）
+    json_backend: str = "auto"
+
+    # ===========模块路由参数配置==============
+    # 控制器发现清单的路径，为空时使用当前用户的缓存目录
+    router_manifest_path: str | None = None
+    # 是否延迟到第一次请求时才导入控制器模块，只对清单中已记录路由前缀的模块生效，
+    # 导入前接口不会出现在 openapi 文档中，也不会被预热插件预热
+    router_lazy_import: bool = False
+    # 路由匹配方式 default | radix，radix 把路由编译为基数树，路由数量较多时查找更快
+    router_backend: str = "default"
+
+    # ===========插件注册表参数配置==============
+    # 额外启用的插件名称，用于 entry points 或 plugin_targets 中声明的插件
+    plugins_enabled: list[str] = []
+    # 配置方式声明的插件，插件名称: "module:ClassName"
+    plugin_targets: dict[str, str] = {}
+    # 发现插件使用的 entry points 分组
+    plugin_entry_point_group: str = "fastapi_lesson.plugins"
+
     # ===========SwaggeruiPluginClient插件参数配置==============
+    swaggerui_enabled: bool = True
     swaggerui_proxy: bool = False
 
+    # ===========JobsPluginClient插件参数配置==============
+    jobs_enabled: bool = False
+    # 同时执行的任务数量
+    jobs_concurrency: int = 8
+    # 队列中等待执行的任务数量上限，超出时拒绝新任务
+    jobs_max_pending: int = 1000
+    # 同步任务的执行方式 thread | process
+    jobs_executor: str = "thread"
+    # 线程池或进程池的大小
+    jobs_max_workers: int = 4
+    # 应用关闭时等待队列中任务执行完成的时间（秒）
+    jobs_drain_timeout: float = 30
+
+    # ===========WarmupPluginClient插件参数配置==============
+    warmup_enabled: bool = True
+    # 就绪检查接口的路径，预热完成之前返回503
+    warmup_ready_path: str = "/health/ready"
+    # 每个预热样例默认的请求次数
+    warmup_repeat: int = 1
+    # 单个预热请求的超时时间（秒）
+    warmup_timeout: float = 10
+    # 预热请求失败时是否启动失败
+    warmup_fail_on_error: bool = False
+
+    # ===========Prefork启动参数配置==============
+    prefork_host: str = "127.0.0.1"
+    prefork_port: int = 8000
+    # worker数量，为0时使用CPU核数
+    prefork_workers: int = 0
+    # 是否使用SO_REUSEPORT，系统不支持时使用父进程创建的共享socket
+    prefork_reuse_port: bool = True
+    prefork_backlog: int = 2048
+    # 每个worker处理的请求数上限及随机增加的数量，为0时不限制
+    prefork_max_requests: int = 0
+    prefork_max_requests_jitter: int = 0
+    # 每个worker独占内存的上限（MB），为0时不限制
+    prefork_max_memory_mb: int = 0
+    # 检查worker状态的间隔（秒）
+    prefork_check_interval: float = 1
+    # worker优雅退出的等待时间（秒）
+    prefork_graceful_timeout: float = 30
+
+    # ===========SchedulerPluginClient插件参数配置==============
+    scheduler_enabled: bool = False
+    # 多worker选主使用的锁文件，为空时使用系统临时目录
+    scheduler_lock_file: str | None = None
+    # 未拿到锁的worker重试的间隔（秒）
+    scheduler_leader_retry: float = 10
+
+    # ===========EventBusPluginClient插件参数配置==============
+    events_enabled: bool = False
+    # 订阅者队列的默认长度上限
+    events_max_queue: int = 1000
+    # 应用关闭时等待队列中事件处理完成的时间（秒）
+    events_drain_timeout: float = 10
+
     # ===========SessionPluginClient插件参数配置==============
-    # session_store: CookieStore | AsyncRedisStore | InMemoryStore = CookieStore(
-    #     secret_key="kTd5NsCsaj52TzHb"
-    # )
+    session_enabled: bool = False
+    # 会话的存储 memory：分片的进程内存储 | mmap：同一台机器上多worker共享的存储
+    session_store: str = "memory"
+    session_cookie_name: str = "session"
+    # 内存存储的分片数量及会话数量上限
+    session_memory_shards: int = 16
+    session_memory_max_sessions: int = 10000
+    # mmap存储的文件路径（为空时使用当前用户的缓存目录）、槽位数量及每个会话的最大字节数
+    session_mmap_path: str | None = None
+    session_mmap_slots: int = 4096
+    session_mmap_slot_size: int = 4096
     # 只是只允许https读取
     session_cookie_https_only: bool = False
     # 会话生存时间
@@ -62,14 +157,36 @@ class ISettings(BaseSettings):
     # 是否滚地会话时效续期
     session_is_rolling: bool = False
 
+    # ===========HttpClientPluginClient插件参数配置==============
+    http_client_enabled: bool = False
+    # 连接池的连接总数及保持的空闲连接数
+    http_client_max_connections: int = 100
+    http_client_max_keepalive: int = 20
+    # 每个目标主机同时进行的请求数量
+    http_client_per_host_limit: int = 20
+    # 请求超时（秒）及失败重试的次数
+    http_client_timeout: float = 10
+    http_client_retries: int = 2
+    # 熔断器的连续失败次数及重置时间（秒）
+    http_client_breaker_threshold: int = 5
+    http_client_breaker_reset_timeout: float = 30
+
     # ===========SqlalchemyPluginForClassV2Client插件参数配置==============
     # MYSQL_SERVER_HOST: str
     # MYSQL_USER_NAME: str
     # MYSQL_PASSWORD: str
     # MYSQL_DB_NAME: str
-    # # 数据库连接池
-    # SQLALCHEMY_DATABASE_ECHO: bool
-    # SQLALCHEMY_POOL_RECYCLE: int
-    # SQLALCHEMY_POOL_PRE_PING: bool
-    # SQLALCHEMY_POOL_SIZE: int
-    # SQLALCHEMY_MAX_OVERFLOW: int
+    sqlalchemy_enabled: bool = False
+    # 数据库连接地址，为空时使用 MYSQL_* 配置拼接 mysql+aiomysql 的地址
+    # 如 sqlite+aiosqlite:///./app.db
+    SQLALCHEMY_DATABASE_URL: str | None = None
+    # 数据库连接池
+    SQLALCHEMY_DATABASE_ECHO: bool = False
+    SQLALCHEMY_POOL_RECYCLE: int = 7200
+    SQLALCHEMY_POOL_PRE_PING: bool = True
+    SQLALCHEMY_POOL_SIZE: int = 20
+    SQLALCHEMY_MAX_OVERFLOW: int = 64
+    # 获取连接的超时时间（秒）
+    SQLALCHEMY_POOL_TIMEOUT: float = 30
+    # 慢查询的阈值（毫秒）
+    SQLALCHEMY_SLOW_QUERY_MS: float = 200
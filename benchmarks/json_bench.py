@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   json_bench.py
+@Time    :   2026/10/19 19:21:40
+@Desc    :   json_helper 各个 JSON 实现的性能对比
+运行：python -m benchmarks.json_bench
+"""
+
+import datetime
+import decimal
+import timeit
+
+from core.tools.json_helper import JSON_BACKENDS
+
+
+def make_payloads() -> dict:
+    """常见的数据形态：集中式日志记录、列表接口的行数据、嵌套的详情接口"""
+    now = datetime.datetime(2026, 10, 19, 19, 21, 40)
+    log_record = {
+        "trace_index": 3,
+        "event_name": "logic",
+        "msg": {"url": "/api/v1/users/list", "method": "GET", "params": {"page": 1}},
+        "cost_time": "0.05",
+        "ts": "2026-10-19 19:21:40",
+    }
+    rows = [
+        {
+            "id": i,
+            "username": f"user{i}",
+            "email": f"user{i}@example.com",
+            "balance": decimal.Decimal("1024.50"),
+            "is_active": i % 3 != 0,
+            "created_at": now,
+            "birthday": now.date(),
+            "tags": ["a", "b", "c"],
+        }
+        for i in range(100)
+    ]
+    detail = {
+        "code": 0,
+        "message": "ok",
+        "data": {
+            "user": rows[0],
+            "roles": [
+                {"id": i, "name": f"role{i}", "permissions": list(range(20))}
+                for i in range(10)
+            ],
+            "token": b"0123456789abcdef",
+        },
+    }
+    return {"log_record": log_record, "rows_100": rows, "detail": detail}
+
+
+def main(number: int = 2000) -> None:
+    """输出每种数据形态序列化、响应序列化及解析的平均耗时"""
+    payloads = make_payloads()
+    backends = {name: backend() for name, backend in JSON_BACKENDS.items()}
+    print(
+        f"{'payload':<12} {'operation':<12}"
+        + "".join(f"{name + '(us)':>14}" for name in backends)
+    )
+    for payload_name, payload in payloads.items():
+        text = backends["json"].dumps(payload)
+        operations = {
+            "dumps": lambda backend, payload=payload: backend.dumps(payload),
+            "dumps_bytes": lambda backend, payload=payload: backend.dumps_bytes(
+                payload
+            ),
+            "loads": lambda backend, text=text: backend.loads(text),
+        }
+        for operation, run in operations.items():
+            costs = [
+                timeit.timeit(lambda b=backend, run=run: run(b), number=number)
+                / number
+                * 1e6
+                for backend in backends.values()
+            ]
+            print(
+                f"{payload_name:<12} {operation:<12}"
+                + "".join(f"{cost:>14.2f}" for cost in costs)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   router_bench.py
+@Time    :   2026/10/19 18:10:37
+@Desc    :   路由匹配的性能对比，默认的逐个正则匹配与基数树匹配
+运行：python -m benchmarks.router_bench
+"""
+
+import asyncio
+from time import perf_counter
+
+from starlette.routing import Route, Router
+
+from core.tools.radix_router import RadixDispatcher
+
+
+class Endpoint:
+    """最简单的 ASGI 接口，排除接口本身的耗时"""
+
+    async def __call__(self, scope, receive, send) -> None:
+        """执行请求"""
+
+
+def make_router(size: int) -> Router:
+    """
+    创建指定数量路由的路由表，静态和带参数的路由各占一半。
+
+    Args:
+        size (int): 路由数量。
+    """
+    routes = []
+    for i in range(size // 2):
+        routes.append(Route(f"/api/v1/module{i}/list", Endpoint()))
+        routes.append(
+            Route(f"/api/v1/module{i}/{{item_id:int}}", Endpoint(), methods=["GET"])
+        )
+    return Router(routes=routes)
+
+
+async def run(app, paths: list[str], rounds: int) -> float:
+    """执行请求，返回每次请求的平均耗时（微秒）"""
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message) -> None:
+        pass
+
+    start_time = perf_counter()
+    for _ in range(rounds):
+        for path in paths:
+            scope = {"type": "http", "method": "GET", "path": path, "root_path": ""}
+            await app(scope, receive, send)
+    return (perf_counter() - start_time) / (rounds * len(paths)) * 1e6
+
+
+def main() -> None:
+    """输出 50、500、5000 个路由时的平均匹配耗时"""
+    print(f"{'routes':>8} {'default(us)':>12} {'radix(us)':>10} {'speedup':>8}")
+    for size in (50, 500, 5000):
+        router = make_router(size)
+        half = size // 2
+        # 分别请求靠前、中间、靠后的路由
+        paths = [
+            f"/api/v1/module{i}/{suffix}"
+            for i in (0, half // 2, half - 1)
+            for suffix in ("list", "42")
+        ]
+        rounds = max(20000 // size, 5)
+        default = asyncio.run(run(router.app, paths, rounds))
+        dispatcher = RadixDispatcher(router)
+        # 构建基数树不计入匹配耗时
+        dispatcher.candidates("/")
+        radix = asyncio.run(run(dispatcher, paths, rounds))
+        print(f"{size:>8} {default:>12.2f} {radix:>10.2f} {default / radix:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
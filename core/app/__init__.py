@@ -8,8 +8,16 @@
 
 import abc
 import logging
+import os
 
 from fastapi import FastAPI
+from loguru import logger as log
+
+from core.libs.profiling import REPORT_PATH_ENV, StartupProfile, import_profiler
+from core.tools.json_helper import (
+    dict_to_json_ensure_ascii,
+    dict_to_json_ensure_ascii_indent,
+)
 
 
 class IApplicationBuilder:
@@ -56,24 +64,54 @@ class IApplicationBuilder:
         raise NotImplementedError
 
     def build(self) -> FastAPI:
-        """创建实例"""
+        """
+        创建实例
+        记录每个阶段的耗时，生成启动报告保存在 app.state.startup_report 中，
+        设置了 STARTUP_PROFILE_IMPORTS 时报告中包含模块导入耗时，
+        设置了 STARTUP_BUDGET_MS 时检查启动耗时是否超出预算
+        """
+        profile = StartupProfile()
         try:
             # 约束注册流程-避免错误
             # 创建实例对象
-            app = self._instance_app()
+            with profile.phase("instance"):
+                app = self._instance_app()
             # 执行自定义的日志配置插件放在最后执行，以便获取到上下文的实例对象
-            self._register_loguru_log_client(app)
+            with profile.phase("loguru"):
+                self._register_loguru_log_client(app)
             # 执行错误注册
-            self._register_exception_handlers(app)
+            with profile.phase("exception_handlers"):
+                self._register_exception_handlers(app)
             # 执行插件的注册----优先于路由注册，避免部分的全局对象加载问题
-            self._register_plugins(app)
+            with profile.phase("plugins"):
+                self._register_plugins(app)
             # 执行中间件的注册
-            self._register_middlewares(app)
+            with profile.phase("middlewares"):
+                self._register_middlewares(app)
             # 注册全局请求，最外层进行注册
-            self._register_global_request(app)
+            with profile.phase("global_request"):
+                self._register_global_request(app)
             # 注册路由
-            self._register_routes(app)
+            with profile.phase("routes"):
+                self._register_routes(app)
+            self._report_startup(app, profile)
             return app
         except Exception as e:
             logging.critical(f"项目启动失败:{e}")
             raise e
+
+    def _report_startup(self, app: FastAPI, profile: StartupProfile) -> None:
+        """记录启动报告并检查启动耗时预算"""
+        # 应用创建完成之后的导入不再记录
+        import_profiler.stop()
+        app.state.startup_report = report = profile.report()
+        try:
+            # 超出预算且配置为 fail 时抛出异常，报告仍然需要记录
+            warning = profile.check_budget(report)
+        finally:
+            log.bind(event_name="startup").info(dict_to_json_ensure_ascii(report))
+            if report_path := os.environ.get(REPORT_PATH_ENV):
+                with open(report_path, "w", encoding="utf-8") as file:
+                    file.write(dict_to_json_ensure_ascii_indent(report))
+        if warning:
+            log.bind(event_name="startup").warning(warning)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   cachedir.py
+@Time    :   2026/10/19 22:24:36
+@Desc    :   当前用户私有的缓存目录
+"""
+
+import os
+
+# 缓存目录下的应用目录名
+APP_DIR_NAME = "fastapi-lesson"
+
+
+def user_cache_dir(*parts: str) -> str:
+    """
+    获取当前用户的缓存目录，不存在时创建，目录只有当前用户可以访问。
+    不使用系统临时目录，避免其他用户提前创建同名文件
+
+    Args:
+        *parts (str): 应用目录下的子目录。
+
+    Returns:
+        str: 目录路径，Linux 为 $XDG_CACHE_HOME 或 ~/.cache 下的 fastapi-lesson，
+            Windows 为 %LOCALAPPDATA% 下的 fastapi-lesson。
+    """
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    path = os.path.join(base, APP_DIR_NAME, *parts)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   context.py
+@Time    :   2026/10/19 12:20:44
+@Desc    :   统一的请求上下文
+"""
+
+import asyncio
+import threading
+from collections.abc import Callable, Hashable, Iterator, MutableMapping
+from contextvars import ContextVar
+from typing import Any
+
+from starlette.requests import Request
+
+
+class RequestCache(MutableMapping):
+    """
+    请求级别的缓存，请求结束时清空。
+    同一个请求内并发调用相同的key只会执行一次，其余调用等待第一次的结果
+    """
+
+    __slots__ = ("_data", "_pending", "_key_locks", "_lock", "hits", "misses")
+
+    def __init__(self) -> None:
+        """创建请求缓存"""
+        self._data: dict = {}
+        # 异步调用中正在执行的key -> (等待结果的 future, 执行调用的任务)
+        self._pending: dict[Hashable, tuple[asyncio.Future, asyncio.Task | None]] = {}
+        # 线程池中同步调用使用的key锁，可重入，被缓存的函数用相同的参数调用自身时不会死锁
+        self._key_locks: dict[Hashable, threading.RLock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getitem__(self, key: Hashable) -> Any:
+        """读取缓存"""
+        return self._data[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        """写入缓存"""
+        self._data[key] = value
+
+    def __delitem__(self, key: Hashable) -> None:
+        """删除缓存"""
+        del self._data[key]
+
+    def __iter__(self) -> Iterator:
+        """遍历缓存的key"""
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        """缓存数量"""
+        return len(self._data)
+
+    def get_or_call(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """
+        同步方式读取缓存，没有命中时调用函数并写入缓存。
+
+        Args:
+            key (Hashable): 缓存key。
+            func (Callable): 没有命中时调用的函数。
+            *args: 函数的位置参数。
+            **kwargs: 函数的关键字参数。
+        """
+        if key in self._data:
+            self.hits += 1
+            return self._data[key]
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.RLock())
+        with key_lock:
+            # 等待其他线程执行完成后再次检查
+            if key in self._data:
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            value = self._data[key] = func(*args, **kwargs)
+            return value
+
+    async def get_or_call_async(
+        self, key: Hashable, func: Callable, *args, **kwargs
+    ) -> Any:
+        """
+        异步方式读取缓存，同一个key并发调用时只执行一次。
+
+        Args:
+            key (Hashable): 缓存key。
+            func (Callable): 没有命中时调用的异步函数。
+            *args: 函数的位置参数。
+            **kwargs: 函数的关键字参数。
+        """
+        if key in self._data:
+            self.hits += 1
+            return self._data[key]
+        pending, owner = self._pending.get(key, (None, None))
+        if pending is not None:
+            if owner is not None and owner is asyncio.current_task():
+                # 被缓存的函数用相同的参数调用自身，等待自己的结果会死锁，直接调用
+                return await func(*args, **kwargs)
+            self.hits += 1
+            return await asyncio.shield(pending)
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = (future, asyncio.current_task())
+        try:
+            value = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # 异常不缓存，等待中的调用同样抛出异常
+            future.set_exception(e)
+            # 没有其他调用等待时，避免出现未获取异常的警告
+            future.exception()
+            raise
+        else:
+            self._data[key] = value
+            future.set_result(value)
+            return value
+        finally:
+            self._pending.pop(key, None)
+
+    def stats(self) -> dict:
+        """
+        获取缓存的命中统计信息。
+
+        Returns:
+            dict: 包含 hits、misses、size、hit_rate 的字典。
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+        self._pending.clear()
+        self._key_locks.clear()
+
+
+class RequestContext:
+    """
+    请求上下文，每个请求只创建一次，由全局请求中间件设置。
+    字段都是直接属性，读取时不需要再经过 request.state 的动态查找；
+    同步接口在线程池中执行时会复制上下文，读取到的是同一个对象
+    """
+
+    __slots__ = (
+        "request",
+        "traceid",
+        "traceindex",
+        "start_time",
+        "start_datetime",
+        "record_model",
+        "log_policy",
+        "log_msg",
+        "close_record",
+        "logger",
+        "root_span",
+        "_cache",
+    )
+
+    def __init__(self, request: Request) -> None:
+        """
+        创建请求上下文。
+
+        Args:
+            request (Request): 请求对象。
+        """
+        self.request = request
+        # 请求链路ID及链路内的日志序号
+        self.traceid: str | None = None
+        self.traceindex: int = 0
+        # 请求开始的 perf_counter 时间及请求到达的时间
+        self.start_time: float | None = None
+        self.start_datetime = None
+        # 日志记录模式及路由的日志策略
+        self.record_model = None
+        self.log_policy = None
+        # 请求日志内容
+        self.log_msg: dict | None = None
+        # 是否忽略请求链路下所有的日志
+        self.close_record: bool = False
+        # 请求级别的日志对象
+        self.logger = None
+        # 请求的根span
+        self.root_span = None
+        # 请求级别的缓存，第一次使用时创建
+        self._cache: RequestCache | None = None
+
+    @property
+    def cache(self) -> RequestCache:
+        """请求级别的缓存"""
+        if self._cache is None:
+            self._cache = RequestCache()
+        return self._cache
+
+    @property
+    def has_cache(self) -> bool:
+        """是否使用过请求缓存"""
+        return self._cache is not None
+
+    def close(self) -> None:
+        """请求结束时释放请求级别的资源"""
+        if self._cache is not None:
+            self._cache.clear()
+
+
+request_context_var: ContextVar[RequestContext | None] = ContextVar(
+    "request_context", default=None
+)
+
+
+def get_request_context() -> RequestContext | None:
+    """获取当前请求的上下文，没有处于请求中时返回None"""
+    return request_context_var.get()
+
+
+class RequestProxy:
+    """
+    当前请求对象的代理，可以在任意位置直接使用 request.headers 等属性
+    request.cache 为请求级别的缓存
+    """
+
+    __slots__ = ()
+
+    @property
+    def cache(self) -> RequestCache:
+        """当前请求的缓存"""
+        return request_context_var.get().cache
+
+    def __getattr__(self, name: str) -> Any:
+        """读取当前请求对象的属性"""
+        return getattr(request_context_var.get().request, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """设置当前请求对象的属性"""
+        setattr(request_context_var.get().request, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        """删除当前请求对象的属性"""
+        delattr(request_context_var.get().request, name)
+
+    def __getitem__(self, key: str) -> Any:
+        """读取当前请求对象 scope 中的值"""
+        return request_context_var.get().request[key]
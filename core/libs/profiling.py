@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   profiling.py
+@Time    :   2026/10/19 20:31:05
+@Desc    :   启动耗时分析：模块导入耗时及应用创建各阶段的耗时，只依赖标准库
+"""
+
+import importlib.abc
+import math
+import os
+import sys
+import threading
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import perf_counter
+
+# 开启模块导入耗时分析的环境变量
+PROFILE_IMPORTS_ENV = "STARTUP_PROFILE_IMPORTS"
+# 启动耗时预算（毫秒），为空时不检查
+BUDGET_ENV = "STARTUP_BUDGET_MS"
+# 超出预算时的处理 warn：记录警告 | fail：启动失败，用于 CI 检查启动耗时的退化
+BUDGET_MODE_ENV = "STARTUP_BUDGET_MODE"
+# 启动报告输出的 JSON 文件路径，为空时不输出
+REPORT_PATH_ENV = "STARTUP_PROFILE_OUTPUT"
+
+
+def env_flag(name: str) -> bool:
+    """读取布尔类型的环境变量"""
+    return os.environ.get(name, "").lower() in ("1", "true", "yes", "on")
+
+
+class StartupBudgetExceeded(RuntimeError):
+    """启动耗时超出预算"""
+
+
+class _TimedLoader:
+    """包装模块的 loader，记录执行模块代码的耗时，其他属性交给原 loader"""
+
+    def __init__(self, loader, profiler: "ImportProfiler") -> None:
+        self.loader = loader
+        self.profiler = profiler
+
+    def __getattr__(self, name: str):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        stack = self.profiler._stack()
+        # 子模块的导入耗时累计到栈顶，用于计算模块自身的耗时
+        stack.append(0.0)
+        start_time = perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = perf_counter() - start_time
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.profiler.records[module.__name__] = (elapsed, elapsed - children)
+            # 还原为原 loader，不影响 importlib.resources 等对 loader 类型的判断
+            module.__loader__ = self.loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self.loader
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """
+    模块导入耗时分析，与 python -X importtime 类似，结果可以写入启动报告
+    放在 sys.meta_path 的最前面，查找交给其他 finder，只包装找到的 loader 来记录执行耗时
+    用法示例：
+    import_profiler.start()
+    import heavy_module
+    import_profiler.stop()
+    print(import_profiler.report())
+    """
+
+    def __init__(self) -> None:
+        """创建分析器"""
+        # 模块名 -> (包含子模块的耗时, 自身耗时)，单位秒
+        self.records: dict[str, tuple[float, float]] = {}
+        self.started_at: float | None = None
+        self._local = threading.local()
+
+    @property
+    def active(self) -> bool:
+        """是否正在记录"""
+        return self in sys.meta_path
+
+    def _stack(self) -> list[float]:
+        """当前线程正在导入的模块栈"""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self) -> None:
+        """开始记录之后导入的模块"""
+        if self.active:
+            return
+        if self.started_at is None:
+            self.started_at = perf_counter()
+        sys.meta_path.insert(0, self)
+
+    def start_from_env(self) -> bool:
+        """设置了 STARTUP_PROFILE_IMPORTS 环境变量时开始记录"""
+        if env_flag(PROFILE_IMPORTS_ENV):
+            self.start()
+        return self.active
+
+    def stop(self) -> None:
+        """停止记录"""
+        if self.active:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        """交给后面的 finder 查找，找到之后包装 loader"""
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def report(self, top: int = 20) -> dict:
+        """
+        生成导入耗时报告。
+
+        Args:
+            top (int): 输出自身耗时最多的模块及顶层包的数量。
+
+        Returns:
+            dict: 总耗时、耗时最多的模块及按顶层包汇总的耗时（毫秒）。
+        """
+        packages: dict[str, float] = defaultdict(float)
+        for name, (_, self_time) in self.records.items():
+            packages[name.partition(".")[0]] += self_time
+        modules = sorted(
+            self.records.items(), key=lambda item: item[1][1], reverse=True
+        )
+        return {
+            "count": len(self.records),
+            "total_ms": round(sum(packages.values()) * 1000, 2),
+            "packages": {
+                name: round(seconds * 1000, 2)
+                for name, seconds in sorted(
+                    packages.items(), key=lambda item: item[1], reverse=True
+                )[:top]
+            },
+            "modules": [
+                {
+                    "module": name,
+                    "self_ms": round(self_time * 1000, 2),
+                    "total_ms": round(total * 1000, 2),
+                }
+                for name, (total, self_time) in modules[:top]
+            ],
+        }
+
+
+# 进程内共享的导入分析器，入口模块在导入应用之前启动
+import_profiler = ImportProfiler()
+
+
+class StartupProfile:
+    """
+    应用创建各阶段的耗时及启动耗时预算的检查
+    用法示例：
+    profile = StartupProfile()
+    with profile.phase("routes"):
+        register_routes(app)
+    report = profile.report()
+    profile.check_budget(report)
+    """
+
+    def __init__(self) -> None:
+        """开始计时"""
+        self.started_at = perf_counter()
+        # 阶段名 -> 耗时（毫秒），按执行顺序
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """记录一个阶段的耗时"""
+        start_time = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((perf_counter() - start_time) * 1000, 2)
+
+    def report(self, profiler: ImportProfiler = import_profiler) -> dict:
+        """
+        生成启动报告。
+
+        Args:
+            profiler (ImportProfiler): 导入耗时分析器，已经启动时报告中包含导入耗时。
+
+        Returns:
+            dict: build_ms 为创建应用的耗时，startup_ms 为从开始记录导入到应用创建完成的耗时。
+        """
+        now = perf_counter()
+        build_ms = round((now - self.started_at) * 1000, 2)
+        report = {"build_ms": build_ms, "startup_ms": build_ms, "phases": self.phases}
+        if profiler.started_at is not None:
+            report["startup_ms"] = round((now - profiler.started_at) * 1000, 2)
+            report["imports"] = profiler.report()
+        return report
+
+    @staticmethod
+    def check_budget(report: dict) -> str | None:
+        """
+        按环境变量 STARTUP_BUDGET_MS 检查启动耗时。
+
+        Args:
+            report (dict): 启动报告。
+
+        Raises:
+            StartupBudgetExceeded: 超出预算或预算配置无效，且 STARTUP_BUDGET_MODE=fail。
+
+        Returns:
+            str | None: 超出预算或预算配置无效时的说明，需要调用方记录警告。
+        """
+        budget = os.environ.get(BUDGET_ENV, "").strip()
+        if not budget:
+            return None
+        try:
+            budget_ms = float(budget)
+        except ValueError:
+            budget_ms = math.nan
+        if not math.isfinite(budget_ms) or budget_ms <= 0:
+            message = (
+                f"Invalid {BUDGET_ENV}={budget!r}, "
+                "expected a positive number of milliseconds"
+            )
+        else:
+            report["budget_ms"] = budget_ms
+            if report["startup_ms"] <= budget_ms:
+                return None
+            slowest = max(
+                report["phases"].items(), key=lambda item: item[1], default=None
+            )
+            message = (
+                f"Startup took {report['startup_ms']}ms, budget is {budget_ms}ms"
+                + (f", slowest phase: {slowest[0]} {slowest[1]}ms" if slowest else "")
+            )
+        if os.environ.get(BUDGET_MODE_ENV, "warn").lower() == "fail":
+            raise StartupBudgetExceeded(message)
+        return message
@@ -6,6 +6,7 @@
 @Desc    :   基础中间件类定义
 """
 
+import asyncio
 import functools
 import http
 import json
@@ -23,6 +24,45 @@ from starlette.middleware.base import (
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
+class ReplayReceive:
+    """
+    代理模式下回放提前读取的请求消息，中间件和接口都可以读取请求体
+    响应开始发送之后交给原始的 receive，流式响应监听客户端断开时不会一直拿到回放的消息而空转
+    """
+
+    def __init__(self, message: Message, receive: Receive) -> None:
+        """
+        Args:
+            message (Message): 提前读取的请求消息。
+            receive (Receive): 原始的接收消息的函数。
+        """
+        self.message = message
+        self.receive = receive
+        self.response_started = False
+
+    async def __call__(self) -> Message:
+        """响应开始前返回回放的消息，之后等待原始的消息（如客户端断开）"""
+        if self.response_started:
+            return await self.receive()
+        # 让出事件循环，避免循环读取的调用方阻塞响应的发送
+        await asyncio.sleep(0)
+        return self.message
+
+    async def replay(self) -> Message:
+        """响应发送之后仍需要重新读取请求体时使用"""
+        return self.message
+
+    def wrap_send(self, send: Send) -> Send:
+        """包装发送函数，在响应开始发送时切换到原始的 receive"""
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self.response_started = True
+            await send(message)
+
+        return _send
+
+
 class BaseMiddlewareNoResponse:
     """
     基础中间件类，不处理响应。
@@ -66,10 +106,8 @@ class BaseMiddlewareNoResponse:
             return
         # 解决读取BODY问题
         if self.is_proxy:
-            receive_ = await receive()
-
-            async def receive():
-                return receive_
+            receive = ReplayReceive(await receive(), receive)
+            send = receive.wrap_send(send)
 
         # 解析当前的请求体
         self.request = Request(scope, receive=receive)
@@ -300,8 +338,12 @@ class BaseResponseMiddleware:
     """
     基础响应中间件类，可以继续读取返回的响应报文。
     如果需要在内部读取请求体内容，需要在所有中间件的最后注册，并开启 `is_proxy=True`。
+    传给 after_request 的响应体最多保留 body_limit 个字节，流式响应在结束时才调用 after_request。
     """
 
+    # 保留的响应体字节数上限
+    body_limit: int = 64 * 1024
+
     def __init__(self, app: ASGIApp, is_proxy: bool = True) -> None:
         """
         初始化中间件。
@@ -375,10 +417,8 @@ class BaseResponseMiddleware:
 
         # 解决读取BODY问题
         if self.is_proxy:
-            receive_ = await receive()
-
-            async def receive():
-                return receive_
+            receive = ReplayReceive(await receive(), receive)
+            send = receive.wrap_send(send)
 
         # 解析当前的请求体
         self.request = Request(scope, receive=receive)
@@ -387,14 +427,23 @@ class BaseResponseMiddleware:
         # 自定义回调函数，可以自己进行重写实现具体的业务逻辑
         await self.before_request(self.request) or self.app
 
+        body_size = 0
+
         async def _next_send(message: Message) -> None:
+            nonlocal body_size
             if message.get("type") == "http.response.start":
                 response_info.headers = Headers(raw=message.get("headers"))
                 response_info.status_code = message.get("status")
             # 解析响应体内容信息
             elif message.get("type") == "http.response.body":
-                if body := message.get("body"):
-                    response_info.body += body.decode("utf-8", errors="ignore")
+                if (body := message.get("body")) and body_size < self.body_limit:
+                    body_slice = body[: self.body_limit - body_size]
+                    response_info.body += body_slice.decode("utf-8", errors="ignore")
+                body_size += len(body or b"")
+                if message.get("more_body", False):
+                    # 流式响应的中间部分直接发送
+                    await send(message)
+                    return
                 response = Response(
                     content=response_info.body,
                     status_code=response_info.status_code,
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   __init__.py
+@Time    :   2026/10/19 16:20:05
+@Desc    :   None
+"""
+
+from .client import DatabasePluginClient, current_session, get_db_session
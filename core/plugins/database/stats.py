@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   stats.py
+@Time    :   2026/10/19 16:20:05
+@Desc    :   连接池及SQL执行的统计
+"""
+
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from core.libs.context import get_request_context
+from core.plugins.loguru import logger
+
+
+class PoolStats:
+    """连接池获取连接的统计"""
+
+    __slots__ = ("checkouts", "wait_ms", "max_wait_ms")
+
+    def __init__(self) -> None:
+        """创建统计"""
+        self.checkouts = 0
+        self.wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record(self, wait_ms: float) -> None:
+        """记录一次获取连接的等待时间"""
+        self.checkouts += 1
+        self.wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def to_dict(self, pool: Pool) -> dict:
+        """转换为字典，包含连接池当前的使用情况"""
+        return {
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            "checkouts": self.checkouts,
+            "avg_wait_ms": round(self.wait_ms / self.checkouts, 3)
+            if self.checkouts
+            else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+def timed_pool_class(base: type[Pool], stats: PoolStats) -> type[Pool]:
+    """
+    创建记录获取连接等待时间的连接池类。
+    连接池重建（dispose）时使用相同的类，统计不会丢失
+
+    Args:
+        base (type[Pool]): 原始的连接池类。
+        stats (PoolStats): 统计对象。
+    """
+
+    class TimedPool(base):
+        """记录获取连接等待时间的连接池"""
+
+        def _do_get(self):
+            start_time = perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                stats.record((perf_counter() - start_time) * 1000)
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+class QueryStats:
+    """SQL执行的统计，慢查询按语句聚合，只保留有限数量的语句"""
+
+    def __init__(self, slow_query_ms: float, max_statements: int = 50) -> None:
+        """
+        创建统计。
+
+        Args:
+            slow_query_ms (float): 慢查询的阈值（毫秒）。
+            max_statements (int): 保留的慢查询语句数量上限。
+        """
+        self.slow_query_ms = slow_query_ms
+        self.max_statements = max_statements
+        self.count = 0
+        self.failed = 0
+        self.total_ms = 0.0
+        self.slow = 0
+        # 慢查询语句: [次数, 总耗时, 最大耗时]
+        self.slow_statements: dict[str, list] = {}
+
+    def listen(self, engine: Engine) -> None:
+        """监听引擎的SQL执行事件"""
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    @staticmethod
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (perf_counter() - conn.info["query_start_time"].pop()) * 1000
+        self.count += 1
+        self.total_ms += elapsed_ms
+        # 当前请求的SQL统计记录在请求的根span上，随请求链路一起输出
+        # 在SQLAlchemy的greenlet中同样可以读取请求上下文
+        request_context = get_request_context()
+        if request_context is not None and request_context.root_span is not None:
+            attributes = request_context.root_span.attributes
+            attributes["db.queries"] = attributes.get("db.queries", 0) + 1
+            attributes["db.cost_ms"] = round(
+                attributes.get("db.cost_ms", 0.0) + elapsed_ms, 3
+            )
+        if elapsed_ms >= self.slow_query_ms:
+            self._record_slow(statement, elapsed_ms)
+
+    def _handle_error(self, exception_context) -> None:
+        self.failed += 1
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+    def _record_slow(self, statement: str, elapsed_ms: float) -> None:
+        """记录慢查询"""
+        self.slow += 1
+        logger.info(
+            f"slow query {elapsed_ms:.2f}ms: {statement}", event_name="slow_query"
+        )
+        item = self.slow_statements.get(statement)
+        if item is None:
+            if len(self.slow_statements) >= self.max_statements:
+                return
+            item = self.slow_statements[statement] = [0, 0.0, 0.0]
+        item[0] += 1
+        item[1] += elapsed_ms
+        item[2] = max(item[2], elapsed_ms)
+
+    def to_dict(self) -> dict:
+        """转换为字典，慢查询按最大耗时排序"""
+        slowest = sorted(
+            self.slow_statements.items(), key=lambda item: item[1][2], reverse=True
+        )
+        return {
+            "count": self.count,
+            "failed": self.failed,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "slow": self.slow,
+            "slow_statements": [
+                {
+                    "statement": statement,
+                    "count": count,
+                    "avg_ms": round(total_ms / count, 3),
+                    "max_ms": round(max_ms, 3),
+                }
+                for statement, (count, total_ms, max_ms) in slowest[:10]
+            ],
+        }
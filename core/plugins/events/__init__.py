@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   __init__.py
+@Time    :   2026/10/19 15:48:20
+@Desc    :   None
+"""
+
+# 只导出事件的声明和发布，插件类由插件注册表在启用时从 client 导入
+from .base import Event, Subscriber, publish_event, subscriber
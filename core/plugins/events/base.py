@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   base.py
+@Time    :   2026/10/20 10:05:12
+@Desc    :   事件、订阅者的声明及发布，业务模块只导入这里，不会加载事件总线插件
+"""
+
+import inspect
+from collections.abc import Callable
+
+from pydantic import BaseModel, ConfigDict
+
+from core.libs.context import get_request_context
+
+
+class Event(BaseModel):
+    """事件基类，订阅父类事件时同样会收到子类事件"""
+
+    model_config = ConfigDict(frozen=True)
+
+
+class Subscriber:
+    """
+    事件订阅者的声明，只保存处理函数和配置，可以被多个应用共享。
+    队列、消费协程和处理统计由每个应用的事件总线插件各自创建
+    """
+
+    def __init__(
+        self,
+        name: str,
+        event_type: type[Event],
+        handler: Callable,
+        max_queue: int | None = None,
+        batch_size: int = 1,
+        batch_timeout: float = 0.5,
+        block: bool = True,
+    ) -> None:
+        """
+        创建订阅者。
+
+        Args:
+            name (str): 订阅者名称。
+            event_type (type[Event]): 订阅的事件类型。
+            handler (Callable): 同步或异步的处理函数，同步函数在线程中执行。
+            max_queue (int | None): 队列长度上限，为空时使用插件的默认配置。
+            batch_size (int): 大于1时按批处理，处理函数接收事件列表。
+            batch_timeout (float): 批处理时等待凑满一批的最长时间（秒）。
+            block (bool): 队列已满时异步发布是否等待，否则丢弃事件。
+        """
+        self.name = name
+        self.event_type = event_type
+        self.handler = handler
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.block = block
+        self.is_async = inspect.iscoroutinefunction(handler)
+
+
+# 通过 subscriber 装饰器声明的订阅者，插件启动时加载
+subscribers: list[Subscriber] = []
+
+
+def subscriber(
+    event_type: type[Event],
+    *,
+    name: str | None = None,
+    max_queue: int | None = None,
+    batch_size: int = 1,
+    batch_timeout: float = 0.5,
+    block: bool = True,
+) -> Callable:
+    """
+    声明事件订阅者，参数同 Subscriber。
+
+    用法示例：
+    from core.plugins.events import Event, subscriber
+
+    class UserRegistered(Event):
+        username: str
+
+    @subscriber(UserRegistered)
+    async def invalidate_cache(event: UserRegistered):
+        ...
+
+    @subscriber(UserRegistered, batch_size=100, batch_timeout=1)
+    def write_audit_log(events: list[UserRegistered]):
+        ...
+    """
+
+    def decorator(func: Callable) -> Callable:
+        subscribers.append(
+            Subscriber(
+                name or f"{func.__module__}.{func.__qualname__}",
+                event_type,
+                func,
+                max_queue=max_queue,
+                batch_size=batch_size,
+                batch_timeout=batch_timeout,
+                block=block,
+            )
+        )
+        return func
+
+    return decorator
+
+
+def publish_event(event: Event) -> bool:
+    """
+    在请求中发布事件，立即返回，同步接口在线程池中也可以调用。
+
+    Args:
+        event (Event): 事件对象。
+
+    Returns:
+        bool: 是否已发布，不在请求中或没有启用插件时返回False。
+    """
+    context = get_request_context()
+    # 事件总线插件安装时保存到 app.state.events
+    bus = getattr(context.request.app.state, "events", None) if context else None
+    if bus is None:
+        return False
+    bus.publish_nowait(event)
+    return True
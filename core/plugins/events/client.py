@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   client.py
+@Time    :   2026/10/19 15:48:20
+@Desc    :   进程内的异步事件总线插件
+"""
+
+import asyncio
+import threading
+from time import perf_counter
+
+from fastapi import FastAPI
+from pydantic_settings import BaseSettings as Settings
+
+from core.plugins.loguru import logger
+
+from ..pluginbase import IBasePlugin as BasePlugin
+from . import base
+from .base import Event, Subscriber
+
+
+class SubscriberQueue:
+    """订阅者在一个事件总线插件中的有界队列、消费协程及处理统计"""
+
+    def __init__(self, subscriber: Subscriber, default_max_queue: int) -> None:
+        """
+        创建订阅者的队列。
+
+        Args:
+            subscriber (Subscriber): 订阅者的声明。
+            default_max_queue (int): 订阅者没有指定时使用的队列长度上限。
+        """
+        self.subscriber = subscriber
+        self.name = subscriber.name
+        self.event_type = subscriber.event_type
+        self.batch_size = subscriber.batch_size
+        self.max_queue = subscriber.max_queue or default_max_queue
+        self.queue: asyncio.Queue[Event] | None = None
+        self.task: asyncio.Task | None = None
+        # 处理统计
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.total_ms = 0.0
+
+    def start(self) -> None:
+        """创建队列并启动消费协程"""
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.task = asyncio.create_task(self._consume(), name=f"subscriber-{self.name}")
+
+    async def offer(self, event: Event) -> None:
+        """投递事件，block 为真时队列已满会等待空位"""
+        if self.subscriber.block:
+            await self.queue.put(event)
+        else:
+            self.offer_nowait(event)
+
+    def offer_nowait(self, event: Event) -> None:
+        """投递事件，队列已满时丢弃"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _next_batch(self) -> list[Event]:
+        """获取一批事件，凑满 batch_size 或等待超时后返回"""
+        batch = [await self.queue.get()]
+        if self.batch_size <= 1:
+            return batch
+        deadline = asyncio.get_running_loop().time() + self.subscriber.batch_timeout
+        while len(batch) < self.batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _consume(self) -> None:
+        """消费队列中的事件"""
+        while True:
+            batch = await self._next_batch()
+            payload = batch if self.batch_size > 1 else batch[0]
+            start_time = perf_counter()
+            try:
+                if self.subscriber.is_async:
+                    await self.subscriber.handler(payload)
+                else:
+                    await asyncio.to_thread(self.subscriber.handler, payload)
+                self.delivered += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.info(
+                    f"[EventBus] subscriber {self.name} failed: {e!r}",
+                    event_name="event",
+                )
+            finally:
+                self.batches += 1
+                self.total_ms += (perf_counter() - start_time) * 1000
+                for _ in batch:
+                    self.queue.task_done()
+
+    def to_dict(self) -> dict:
+        """转换为统计信息字典"""
+        return {
+            "event": self.event_type.__name__,
+            "pending": self.queue.qsize() if self.queue else 0,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch_ms": round(self.total_ms / self.batches, 3)
+            if self.batches
+            else 0.0,
+        }
+
+
+class EventBusPluginClient(BasePlugin):
+    """
+    事件总线插件
+    发布事件只是放入订阅者的队列，耗时的处理在订阅者的消费协程中执行，不占用请求的响应时间
+    用法示例：
+    # 异步代码中发布，队列已满时等待
+    await request.app.state.events.publish(UserRegistered(username="admin"))
+    # 同步代码或线程池中发布，队列已满时丢弃
+    publish_event(UserRegistered(username="admin"))
+    """
+
+    name = "事件总线插件"
+    describe = "进程内的异步发布订阅，订阅者使用有界队列，支持批量处理"
+
+    class EventsConfig(Settings):
+        """默认配置"""
+
+        # 订阅者队列的默认长度上限
+        MAX_QUEUE: int = 1000
+        # 应用关闭时等待队列中事件处理完成的时间（秒）
+        DRAIN_TIMEOUT: float = 10
+
+    @classmethod
+    def from_settings(cls, app: FastAPI, name: str, settings) -> "EventBusPluginClient":
+        """根据应用配置创建插件"""
+        return cls(
+            app=app,
+            name=name,
+            settings=cls.EventsConfig(
+                MAX_QUEUE=settings.events_max_queue,
+                DRAIN_TIMEOUT=settings.events_drain_timeout,
+            ),
+        )
+
+    def setup(self, app: FastAPI, name: str = None, settings=None, *args, **kwargs):
+        """插件初始化"""
+        self.settings = settings or self.EventsConfig()
+        # 订阅者的声明是全局共享的，队列和消费协程属于当前插件，多个应用之间互不影响
+        self.queues: dict[Subscriber, SubscriberQueue] = {}
+        # 事件类型对应的订阅者队列，第一次发布时根据继承关系生成
+        self._routes: dict[type[Event], list[SubscriberQueue]] = {}
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        app.state.events = self
+
+    async def startup(self) -> None:
+        """启动所有订阅者"""
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self.queues = {
+            item: SubscriberQueue(item, self.settings.MAX_QUEUE)
+            for item in base.subscribers
+        }
+        self._routes.clear()
+        for queue in self.queues.values():
+            queue.start()
+
+    def refresh(self) -> None:
+        """启动之后导入的模块（如延迟导入的控制器）中声明的订阅者加入并启动"""
+        if self.loop is None:
+            return
+        added = [item for item in base.subscribers if item not in self.queues]
+        for item in added:
+            queue = self.queues[item] = SubscriberQueue(item, self.settings.MAX_QUEUE)
+            queue.start()
+        if added:
+            self._routes.clear()
+
+    async def shutdown(self) -> None:
+        """等待队列中的事件处理完成后停止订阅者"""
+        self.loop = None
+        running = [item for item in self.queues.values() if item.task is not None]
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(item.queue.join() for item in running)),
+                self.settings.DRAIN_TIMEOUT,
+            )
+        except TimeoutError:
+            logger.info(f"[{self.name} Plugin] drain timeout: {self.metrics()}")
+        for item in running:
+            item.task.cancel()
+        await asyncio.gather(*(item.task for item in running), return_exceptions=True)
+        for item in running:
+            item.task = None
+
+    def _match(self, event_type: type[Event]) -> list[SubscriberQueue]:
+        """获取事件类型的订阅者队列"""
+        matched = self._routes.get(event_type)
+        if matched is None:
+            matched = self._routes[event_type] = [
+                item
+                for item in self.queues.values()
+                if issubclass(event_type, item.event_type)
+            ]
+        return matched
+
+    async def publish(self, event: Event) -> None:
+        """
+        在事件循环中发布事件，订阅者队列已满时等待（block=False 的订阅者丢弃）。
+
+        Args:
+            event (Event): 事件对象。
+        """
+        if self.loop is None:
+            return
+        for item in self._match(type(event)):
+            await item.offer(event)
+
+    def publish_nowait(self, event: Event) -> None:
+        """
+        发布事件后立即返回，可以在线程中调用，订阅者队列已满时丢弃。
+
+        Args:
+            event (Event): 事件对象。
+        """
+        loop = self.loop
+        if loop is None:
+            return
+        if threading.get_ident() != self._loop_thread_id:
+            loop.call_soon_threadsafe(self.publish_nowait, event)
+            return
+        for item in self._match(type(event)):
+            item.offer_nowait(event)
+
+    def metrics(self) -> dict:
+        """
+        获取订阅者的统计信息。
+
+        Returns:
+            dict: 每个订阅者的队列长度、处理数量、丢弃数量等。
+        """
+        return {item.name: item.to_dict() for item in self.queues.values()}
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   cache.py
+@Time    :   2026/10/19 13:05:18
+@Desc    :   请求级别的缓存装饰器
+"""
+
+import functools
+import inspect
+from collections.abc import Callable, Hashable
+
+from core.libs.context import request_context_var
+
+
+def make_cache_key(func: Callable, args: tuple, kwargs: dict) -> Hashable:
+    """根据函数和调用参数生成缓存key"""
+    return (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+
+def request_cached(func: Callable = None, *, key: Callable | None = None) -> Callable:
+    """
+    请求级别的缓存装饰器，同一个请求内相同参数的调用只执行一次，请求结束后自动清空。
+    没有处于请求中或者参数无法hash时直接调用原函数
+    用法示例：
+    from core.plugins.globalrequest.cache import request_cached
+
+    class UserService:
+        @request_cached
+        def get_permissions(self, user_id: int):
+            ...
+
+        @request_cached(key=lambda self, user_id: ("user", user_id))
+        async def get_user(self, user_id: int):
+            ...
+
+    Args:
+        func (Callable): 被装饰的函数。
+        key (Callable | None): 自定义缓存key的生成函数，接收与被装饰函数相同的参数。
+    """
+    if func is None:
+        return functools.partial(request_cached, key=key)
+
+    def resolve_key(args: tuple, kwargs: dict) -> Hashable | None:
+        cache_key = (
+            key(*args, **kwargs)
+            if key is not None
+            else make_cache_key(func, args, kwargs)
+        )
+        try:
+            hash(cache_key)
+        except TypeError:
+            return None
+        return cache_key
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            context = request_context_var.get()
+            cache_key = resolve_key(args, kwargs) if context is not None else None
+            if cache_key is None:
+                return await func(*args, **kwargs)
+            return await context.cache.get_or_call_async(
+                cache_key, func, *args, **kwargs
+            )
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        context = request_context_var.get()
+        cache_key = resolve_key(args, kwargs) if context is not None else None
+        if cache_key is None:
+            return func(*args, **kwargs)
+        return context.cache.get_or_call(cache_key, func, *args, **kwargs)
+
+    return wrapper
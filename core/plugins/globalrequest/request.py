@@ -8,17 +8,16 @@
 
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from contextvars import ContextVar
 
 from fastapi import FastAPI
 from starlette.requests import Request
 from starlette.types import ASGIApp, Receive, Scope, Send
 
+from core.libs.context import RequestContext, RequestProxy, request_context_var
+
 from ..pluginbase import IBasePlugin as BasePlugin
-from .bind_ import bind_contextvar
 
-request_var: ContextVar[Request] = ContextVar("request")
-request: Request = bind_contextvar(request_var)
+request: Request = RequestProxy()
 
 
 class GlobalRequestLoadMiddleware:
@@ -60,12 +59,15 @@ class GlobalRequestLoadMiddleware:
         self, request: Request
     ) -> AsyncGenerator[None, None]:
         # token_middleware_id: Token = middleware_identifier.set(middleware_id)
-        # 设置全局
-        token = request_var.set(request)
+        # 设置全局，整个请求只创建一次请求上下文
+        context = RequestContext(request)
+        token = request_context_var.set(context)
         try:
             yield
         finally:
-            request_var.reset(token)
+            # 请求结束时清空请求级别的缓存
+            context.close()
+            request_context_var.reset(token)
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   __init__.py
+@Time    :   2026/10/19 17:40:26
+@Desc    :   None
+"""
+
+from .breaker import CircuitBreaker, CircuitOpenError
+from .client import HttpClientPluginClient, get_http_client
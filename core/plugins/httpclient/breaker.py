@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   breaker.py
+@Time    :   2026/10/19 17:40:26
+@Desc    :   熔断器
+"""
+
+from time import monotonic
+
+from ..pluginbase import PluginException
+
+
+class CircuitOpenError(PluginException):
+    """熔断器打开时拒绝请求"""
+
+
+class CircuitBreaker:
+    """
+    按目标主机的熔断器
+    连续失败达到阈值后打开，打开期间直接拒绝请求；
+    超过重置时间后进入半开状态，只放行一个试探请求，成功则关闭，失败则重新打开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    __slots__ = ("threshold", "reset_timeout", "failures", "opened_at", "_trial")
+
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30) -> None:
+        """
+        创建熔断器。
+
+        Args:
+            threshold (int): 打开熔断器的连续失败次数。
+            reset_timeout (float): 打开后进入半开状态的时间（秒）。
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        # 半开状态下是否已有试探请求
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        """熔断器的状态"""
+        if self.opened_at is None:
+            return self.CLOSED
+        if monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_request(self) -> None:
+        """请求前检查，熔断器打开时抛出 CircuitOpenError"""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._trial:
+            self._trial = True
+            return
+        raise CircuitOpenError("Circuit breaker is open")
+
+    def record_success(self) -> None:
+        """记录成功，关闭熔断器"""
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def release(self) -> None:
+        """
+        请求被取消或出现与目标主机无关的异常时调用，不改变熔断状态，
+        只释放半开状态下的试探名额，避免熔断器一直停留在打开状态
+        """
+        self._trial = False
+
+    def record_failure(self) -> None:
+        """记录失败，达到阈值或试探失败时打开熔断器"""
+        self.failures += 1
+        if self._trial or self.failures >= self.threshold:
+            self.opened_at = monotonic()
+            self._trial = False
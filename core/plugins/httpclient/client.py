@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   client.py
+@Time    :   2026/10/19 17:40:26
+@Desc    :   共享连接池的对外HTTP请求插件
+"""
+
+import asyncio
+import random
+from collections import defaultdict
+from time import perf_counter
+
+import httpx
+from fastapi import FastAPI
+from pydantic_settings import BaseSettings as Settings
+
+from core.libs.context import get_request_context
+from core.plugins.loguru import logger
+from core.plugins.loguru.span import Span, trace_span
+
+from ..pluginbase import IBasePlugin as BasePlugin
+from ..pluginbase import PluginException
+from .breaker import CircuitBreaker, CircuitOpenError
+
+# 默认重试的幂等请求方法
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class HostStats:
+    """目标主机的请求统计"""
+
+    __slots__ = ("requests", "failures", "retries", "rejected", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        """创建统计"""
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, failed: bool) -> None:
+        """记录一次请求"""
+        self.requests += 1
+        self.failures += failed
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_ms / self.requests, 3) if self.requests else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class HttpClientPluginClient(BasePlugin):
+    """
+    对外HTTP请求插件，整个应用共享一个 httpx.AsyncClient 连接池
+    请求自动带上当前请求的链路ID，耗时记录为请求链路中的span
+    用法示例：
+    from core.plugins.httpclient import get_http_client
+
+    async def get_weather():
+        response = await get_http_client().get("https://api.example.com/weather")
+        return response.json()
+    """
+
+    name = "HTTP请求插件"
+    describe = "连接池复用、按主机限流、超时重试及熔断的对外HTTP请求"
+
+    class HttpClientConfig(Settings):
+        """默认配置"""
+
+        # 连接池的连接总数及保持的空闲连接数
+        MAX_CONNECTIONS: int = 100
+        MAX_KEEPALIVE_CONNECTIONS: int = 20
+        # 空闲连接的保持时间（秒）
+        KEEPALIVE_EXPIRY: float = 30
+        # 每个目标主机同时进行的请求数量
+        PER_HOST_LIMIT: int = 20
+        # 请求超时及建立连接超时（秒）
+        TIMEOUT: float = 10
+        CONNECT_TIMEOUT: float = 3
+        # 失败重试的次数，退避时间按 RETRY_BACKOFF * 2^n 并加上随机抖动
+        RETRIES: int = 2
+        RETRY_BACKOFF: float = 0.2
+        # 需要重试的响应状态码
+        RETRY_STATUSES: list[int] = [502, 503, 504]
+        # 熔断器的连续失败次数及重置时间（秒）
+        BREAKER_THRESHOLD: int = 5
+        BREAKER_RESET_TIMEOUT: float = 30
+        # 传递链路ID的请求头
+        TRACE_HEADER: str = "X-Trace-Id"
+
+    def __init__(self, app: FastAPI = None, name=None, transport=None, **options):
+        """
+        插件初始化。
+
+        Args:
+            app (FastAPI): 应用实例。
+            name: 插件名称。
+            transport: 自定义的 httpx 传输层，如测试时使用 httpx.ASGITransport。
+            **options: 插件的其他参数，如 settings。
+        """
+        self.transport = transport
+        super().__init__(app, name, **options)
+
+    @classmethod
+    def from_settings(
+        cls, app: FastAPI, name: str, settings
+    ) -> "HttpClientPluginClient":
+        """根据应用配置创建插件"""
+        return cls(
+            app=app,
+            name=name,
+            settings=cls.HttpClientConfig(
+                MAX_CONNECTIONS=settings.http_client_max_connections,
+                MAX_KEEPALIVE_CONNECTIONS=settings.http_client_max_keepalive,
+                PER_HOST_LIMIT=settings.http_client_per_host_limit,
+                TIMEOUT=settings.http_client_timeout,
+                RETRIES=settings.http_client_retries,
+                BREAKER_THRESHOLD=settings.http_client_breaker_threshold,
+                BREAKER_RESET_TIMEOUT=settings.http_client_breaker_reset_timeout,
+            ),
+        )
+
+    def setup(self, app: FastAPI, name: str = None, settings=None, *args, **kwargs):
+        """插件初始化"""
+        self.settings = settings or self.HttpClientConfig()
+        self.client: httpx.AsyncClient | None = None
+        self.retry_statuses = frozenset(self.settings.RETRY_STATUSES)
+        self.host_limits: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.settings.PER_HOST_LIMIT)
+        )
+        self.breakers: dict[str, CircuitBreaker] = defaultdict(
+            lambda: CircuitBreaker(
+                self.settings.BREAKER_THRESHOLD, self.settings.BREAKER_RESET_TIMEOUT
+            )
+        )
+        self.stats: dict[str, HostStats] = defaultdict(HostStats)
+        app.state.http_client = self
+
+    async def startup(self) -> None:
+        """创建共享的连接池"""
+        settings = self.settings
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.MAX_CONNECTIONS,
+                max_keepalive_connections=settings.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(settings.TIMEOUT, connect=settings.CONNECT_TIMEOUT),
+            transport=self.transport,
+        )
+
+    async def shutdown(self) -> None:
+        """关闭连接池"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def make_trace_headers(self, span: Span) -> dict:
+        """
+        生成传递链路ID的请求头，包含 W3C traceparent。
+
+        Args:
+            span (Span): 本次对外请求的span，作为下游服务的父级span。
+        """
+        context = get_request_context()
+        if context is None or context.traceid is None:
+            return {}
+        return {
+            self.settings.TRACE_HEADER: context.traceid,
+            "traceparent": f"00-{context.traceid.replace('-', '')}-{span.span_id}-01",
+        }
+
+    def retry_delay(self, attempt: int) -> float:
+        """指数退避并加上随机抖动，避免大量请求同时重试"""
+        return self.settings.RETRY_BACKOFF * (2**attempt) * random.uniform(0.5, 1.5)
+
+    async def request(
+        self, method: str, url: str, *, retry: bool | None = None, **kwargs
+    ) -> httpx.Response:
+        """
+        发送请求，失败时按配置重试，目标主机熔断时抛出 CircuitOpenError。
+
+        Args:
+            method (str): 请求方法。
+            url (str): 请求地址。
+            retry (bool | None): 是否重试，默认只重试幂等的请求方法。
+            **kwargs: httpx 的请求参数。
+
+        Returns:
+            httpx.Response: 响应对象，重试后仍失败时返回最后一次的响应。
+        """
+        if self.client is None:
+            raise PluginException(f"[{self.name} Plugin] client is not started")
+        method = method.upper()
+        host = httpx.URL(url).host
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        retries = self.settings.RETRIES if retry else 0
+        breaker, stats = self.breakers[host], self.stats[host]
+        with trace_span(f"HTTP {method} {host}", **{"http.url": url}) as span:
+            headers = {
+                **self.make_trace_headers(span),
+                **(kwargs.pop("headers", None) or {}),
+            }
+            for attempt in range(retries + 1):
+                try:
+                    breaker.before_request()
+                except CircuitOpenError:
+                    stats.rejected += 1
+                    span.set_attribute("http.circuit", "open")
+                    raise
+                start_time = perf_counter()
+                try:
+                    async with self.host_limits[host]:
+                        response = await self.client.request(
+                            method, url, headers=headers, **kwargs
+                        )
+                except httpx.TransportError as e:
+                    stats.record((perf_counter() - start_time) * 1000, True)
+                    breaker.record_failure()
+                    if attempt >= retries:
+                        logger.info(
+                            f"[{self.name} Plugin] {method} {url} failed: {e!r}"
+                        )
+                        raise
+                except BaseException:
+                    # 请求被取消或参数错误等，不代表目标主机不可用，只释放试探名额
+                    breaker.release()
+                    raise
+                else:
+                    failed = response.status_code >= 500
+                    stats.record((perf_counter() - start_time) * 1000, failed)
+                    if failed:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                    if (
+                        response.status_code not in self.retry_statuses
+                        or attempt >= retries
+                    ):
+                        span.set_attribute("http.status_code", response.status_code)
+                        span.set_attribute("http.attempts", attempt + 1)
+                        return response
+                    await response.aclose()
+                stats.retries += 1
+                await asyncio.sleep(self.retry_delay(attempt))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """发送GET请求"""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """发送POST请求"""
+        return await self.request("POST", url, **kwargs)
+
+    def metrics(self) -> dict:
+        """
+        获取每个目标主机的请求统计。
+
+        Returns:
+            dict: 每个主机的请求数量、失败、重试、熔断状态及耗时。
+        """
+        return {
+            host: {**stats.to_dict(), "circuit": self.breakers[host].state}
+            for host, stats in self.stats.items()
+        }
+
+
+def get_http_client() -> HttpClientPluginClient:
+    """
+    获取当前应用的HTTP请求插件。
+
+    Returns:
+        HttpClientPluginClient: HTTP请求插件。
+    """
+    context = get_request_context()
+    client: HttpClientPluginClient | None = (
+        getattr(context.request.app.state, "http_client", None) if context else None
+    )
+    if client is None:
+        raise PluginException("HttpClient plugin is not enabled")
+    return client
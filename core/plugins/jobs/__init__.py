@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   __init__.py
+@Time    :   2026/10/19 14:30:12
+@Desc    :   None
+"""
+
+from .client import JobQueueFullError, JobsPluginClient, spawn_job
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   client.py
+@Time    :   2026/10/19 14:30:12
+@Desc    :   有界的后台任务执行插件
+"""
+
+import asyncio
+import functools
+import inspect
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+
+from fastapi import FastAPI
+from pydantic_settings import BaseSettings as Settings
+
+from core.libs.context import get_request_context
+from core.plugins.loguru import logger
+
+from ..pluginbase import IBasePlugin as BasePlugin
+from ..pluginbase import PluginException
+
+
+class JobQueueFullError(PluginException):
+    """任务队列已满"""
+
+
+class JobStats:
+    """同名任务的执行统计"""
+
+    __slots__ = ("count", "failed", "total_ms", "max_ms", "wait_ms")
+
+    def __init__(self) -> None:
+        """创建统计"""
+        self.count = 0
+        self.failed = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.wait_ms = 0.0
+
+    def record(self, run_ms: float, wait_ms: float, failed: bool) -> None:
+        """
+        记录一次执行。
+
+        Args:
+            run_ms (float): 执行耗时（毫秒）。
+            wait_ms (float): 在队列中等待的时间（毫秒）。
+            failed (bool): 是否执行失败。
+        """
+        self.count += 1
+        self.failed += failed
+        self.total_ms += run_ms
+        self.max_ms = max(self.max_ms, run_ms)
+        self.wait_ms += wait_ms
+
+    def to_dict(self) -> dict:
+        """转换为字典"""
+        return {
+            "count": self.count,
+            "failed": self.failed,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "avg_wait_ms": round(self.wait_ms / self.count, 3) if self.count else 0.0,
+        }
+
+
+class Job:
+    """队列中等待执行的任务"""
+
+    __slots__ = ("name", "func", "args", "kwargs", "traceid", "enqueued_at")
+
+    def __init__(
+        self, name: str, func: Callable, args: tuple, kwargs: dict, traceid: str | None
+    ) -> None:
+        """创建任务"""
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        # 提交任务的请求链路ID，用于日志关联
+        self.traceid = traceid
+        self.enqueued_at = perf_counter()
+
+
+class JobsPluginClient(BasePlugin):
+    """
+    后台任务插件，使用固定数量的协程消费有界队列。
+    异步任务直接在事件循环中执行，同步任务放到线程池或进程池中执行；
+    队列满时 spawn 直接拒绝，不会因为请求压力无限占用内存
+    用法示例：
+    from core.plugins.jobs import spawn_job
+
+    @router.post("/register")
+    async def register():
+        spawn_job(send_welcome_mail, user_id, job_name="welcome_mail")
+
+    使用进程池时任务函数和参数需要可以被pickle序列化
+    """
+
+    name = "后台任务插件"
+    describe = "有界并发和有界队列的后台任务执行，应用关闭时等待队列中的任务执行完成"
+
+    class JobsConfig(Settings):
+        """默认配置"""
+
+        # 同时执行的任务数量
+        CONCURRENCY: int = 8
+        # 队列中等待执行的任务数量上限
+        MAX_PENDING: int = 1000
+        # 同步任务的执行方式 thread | process
+        EXECUTOR: str = "thread"
+        # 线程池或进程池的大小
+        MAX_WORKERS: int = 4
+        # 应用关闭时等待队列中任务执行完成的时间（秒）
+        DRAIN_TIMEOUT: float = 30
+
+    @classmethod
+    def from_settings(cls, app: FastAPI, name: str, settings) -> "JobsPluginClient":
+        """根据应用配置创建插件"""
+        return cls(
+            app=app,
+            name=name,
+            settings=cls.JobsConfig(
+                CONCURRENCY=settings.jobs_concurrency,
+                MAX_PENDING=settings.jobs_max_pending,
+                EXECUTOR=settings.jobs_executor,
+                MAX_WORKERS=settings.jobs_max_workers,
+                DRAIN_TIMEOUT=settings.jobs_drain_timeout,
+            ),
+        )
+
+    def setup(self, app: FastAPI, name: str = None, settings=None, *args, **kwargs):
+        """插件初始化"""
+        self.settings = settings or self.JobsConfig()
+        self.queue: asyncio.Queue[Job] = asyncio.Queue(
+            maxsize=self.settings.MAX_PENDING
+        )
+        self.executor: Executor | None = None
+        self.workers: list[asyncio.Task] = []
+        self.accepting = False
+        self.running = 0
+        self.rejected = 0
+        self.stats: dict[str, JobStats] = {}
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        app.state.jobs = self
+
+    async def startup(self) -> None:
+        """启动任务消费协程"""
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        executor_class = (
+            ProcessPoolExecutor
+            if self.settings.EXECUTOR == "process"
+            else ThreadPoolExecutor
+        )
+        self.executor = executor_class(max_workers=self.settings.MAX_WORKERS)
+        self.workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{index}")
+            for index in range(self.settings.CONCURRENCY)
+        ]
+        self.accepting = True
+
+    async def shutdown(self) -> None:
+        """停止接收新任务，等待队列中的任务执行完成后释放执行池"""
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self.queue.join(), self.settings.DRAIN_TIMEOUT)
+        except TimeoutError:
+            logger.info(
+                f"[{self.name} Plugin] drain timeout, dropped {self.queue.qsize()} jobs"
+            )
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        self.loop = None
+        logger.info(f"[{self.name} Plugin] stopped: {self.metrics()}")
+
+    def _make_job(self, func: Callable, args: tuple, kwargs: dict) -> Job:
+        """创建任务，任务名称默认使用函数名称"""
+        job_name = kwargs.pop("job_name", None) or getattr(
+            func, "__qualname__", repr(func)
+        )
+        context = get_request_context()
+        return Job(job_name, func, args, kwargs, context.traceid if context else None)
+
+    def spawn(self, func: Callable, *args, **kwargs) -> bool:
+        """
+        提交任务后立即返回，队列已满或插件未启动时拒绝任务。
+        可以在线程池中调用（同步接口），此时交给事件循环放入队列，队列已满时在事件循环中记录拒绝
+
+        Args:
+            func (Callable): 同步或异步的任务函数。
+            *args: 任务函数的位置参数。
+            **kwargs: 任务函数的关键字参数，job_name 为统计使用的任务名称。
+
+        Returns:
+            bool: 是否提交成功，在线程中调用时只表示已交给事件循环。
+        """
+        job = self._make_job(func, args, kwargs)
+        loop = self.loop
+        if not self.accepting or loop is None:
+            self.rejected += 1
+            return False
+        # asyncio.Queue 不是线程安全的，不在事件循环所在的线程时切换到事件循环中执行
+        if threading.get_ident() != self._loop_thread_id:
+            loop.call_soon_threadsafe(self._enqueue, job)
+            return True
+        return self._enqueue(job)
+
+    def _enqueue(self, job: Job) -> bool:
+        """在事件循环中把任务放入队列，队列已满或插件已关闭时拒绝"""
+        if not self.accepting:
+            self.rejected += 1
+            return False
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.info(f"[{self.name} Plugin] queue full, rejected job: {job.name}")
+            return False
+        return True
+
+    async def submit(self, func: Callable, *args, **kwargs) -> None:
+        """
+        提交任务，队列已满时等待空位。
+
+        Args:
+            func (Callable): 同步或异步的任务函数。
+            *args: 任务函数的位置参数。
+            **kwargs: 任务函数的关键字参数，job_name 为统计使用的任务名称。
+        """
+        if not self.accepting:
+            raise JobQueueFullError(f"[{self.name} Plugin] not accepting jobs")
+        await self.queue.put(self._make_job(func, args, kwargs))
+
+    async def _worker(self) -> None:
+        """消费队列中的任务"""
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        """执行一个任务并记录耗时"""
+        start_time = perf_counter()
+        wait_ms = (start_time - job.enqueued_at) * 1000
+        failed = False
+        self.running += 1
+        try:
+            if inspect.iscoroutinefunction(job.func):
+                await job.func(*job.args, **job.kwargs)
+            else:
+                await asyncio.get_running_loop().run_in_executor(
+                    self.executor, functools.partial(job.func, *job.args, **job.kwargs)
+                )
+        except Exception as e:
+            failed = True
+            logger.info(
+                f"[{self.name} Plugin] job {job.name} failed: {e!r} traceid:{job.traceid}",
+                event_name="job",
+            )
+        finally:
+            self.running -= 1
+            run_ms = (perf_counter() - start_time) * 1000
+            self.stats.setdefault(job.name, JobStats()).record(run_ms, wait_ms, failed)
+
+    def metrics(self) -> dict:
+        """
+        获取任务执行的统计信息。
+
+        Returns:
+            dict: 包含队列长度、执行中数量、拒绝数量及每个任务的耗时统计。
+        """
+        return {
+            "pending": self.queue.qsize(),
+            "max_pending": self.settings.MAX_PENDING,
+            "running": self.running,
+            "rejected": self.rejected,
+            "jobs": {name: stats.to_dict() for name, stats in self.stats.items()},
+        }
+
+
+def spawn_job(func: Callable, *args, **kwargs) -> bool:
+    """
+    在请求中提交后台任务，立即返回。
+
+    Args:
+        func (Callable): 同步或异步的任务函数。
+        *args: 任务函数的位置参数。
+        **kwargs: 任务函数的关键字参数，job_name 为统计使用的任务名称。
+
+    Returns:
+        bool: 是否提交成功，不在请求中或没有启用插件时返回False。
+    """
+    context = get_request_context()
+    jobs: JobsPluginClient | None = (
+        getattr(context.request.app.state, "jobs", None) if context else None
+    )
+    if jobs is None:
+        return False
+    return jobs.spawn(func, *args, **kwargs)
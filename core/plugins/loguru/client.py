@@ -12,13 +12,17 @@ from urllib.parse import parse_qs
 from fastapi import FastAPI
 from pydantic_settings import BaseSettings as Settings
 from starlette.requests import Request
-from user_agents import parse
+from starlette.types import Scope
 
 from core.libs.logger.v1 import init_logging
 
 from ..pluginbase import IBasePlugin as BasePlugin
-from .enums import RecordModel
+from . import logger
+from .enums import LogPolicy, RecordModel
+from .filter import RequestUrlFilter, RoutePolicyTable
 from .middleware import LoguruPluginClientMiddleware
+from .span import OtlpJsonFileExporter
+from .useragent import UserAgentParseService
 
 
 class LoguruPluginClient(BasePlugin):
@@ -51,14 +55,16 @@ class LoguruPluginClient(BasePlugin):
 
     # 再静态的里面使用self来查询也可以，遵循从内到外的查询
 
-    def filter_request_url(self, request: Request):
-        """过滤不需要记录日志请求地址URL"""
-        path_info = request.url.path
-        if request.method == "OPTIONS":
-            return True
-        if "websocket" in path_info:
-            return True
-        return path_info in self.settings.FLITER_REQUEST_URL
+    def resolve_log_policy(self, scope: Scope) -> LogPolicy:
+        """
+        获取请求的日志记录策略，过滤的URL及路由预热插件发出的预热请求直接跳过记录
+        路由策略表在第一次请求时根据应用路由生成，之后直接查表
+        """
+        if self.url_filter.match(scope) or scope.get("state", {}).get("warmup"):
+            return LogPolicy.SKIP
+        if self.route_policy_table is None:
+            self.route_policy_table = RoutePolicyTable(self.app.routes)
+        return self.route_policy_table.resolve(scope)
 
     class LoguruConfig(Settings):
         """默认配置"""
@@ -84,11 +90,19 @@ class LoguruPluginClient(BasePlugin):
         NESS_ACCESS_HEADS_KEYS: list = []
         # 是否记录响应报文内容，如果包含内容过多，不建议记录
         IS_RECORD_RESPONSE: bool = True
+        # 记录的响应报文内容的字节数上限，超出部分不保留，流式响应的内存占用不随响应大小增长
+        RECORD_RESPONSE_LIMIT: int = 64 * 1024
         # 是否记录用户提交请求头信息
         IS_RECORD_HEADERS: bool = True
         # 是否记录用户UA信息
         IS_RECORD_UA: bool = False
-        # 需要过来的请求URL路径信息
+        # UA解析结果缓存的数量上限
+        UA_CACHE_SIZE: int = 1024
+        # 请求内span导出为OTLP-JSON文件的目录，为空则不导出
+        SPAN_EXPORT_PATH: str | None = None
+        # 是否延迟构造请求日志，开启后在响应发送之后再解析请求信息，需要中间件开启is_proxy
+        IS_DEFER_REQUEST_LOG: bool = False
+        # 需要过来的请求URL路径信息，支持 fnmatch 风格的通配符，如 /static/*
         FLITER_REQUEST_URL: list = [
             "/",
             "/favicon.ico",
@@ -100,13 +114,25 @@ class LoguruPluginClient(BasePlugin):
             "/static/redoc.standalone.js",
         ]
 
-    async def make_request_log_msg(self, request: Request):
-        """格式化日志"""
-        log_msg = None
-        if self.filter_request_url(request):
-            request.state.close_record = True
-        else:
-            _ip, method, url = request.client.host, request.method, request.url.path
+    async def make_request_log_msg(
+        self,
+        request: Request,
+        start_datetime: datetime | None = None,
+        policy: LogPolicy = LogPolicy.FULL,
+    ):
+        """
+        格式化日志
+        Args:
+            request (Request): 请求对象。
+            start_datetime (datetime | None): 请求到达的时间，延迟构造日志时传入，默认为当前时间。
+            policy (LogPolicy): 路由的日志记录策略，HEADERS_ONLY 时不解析表单和body。
+        """
+        # 过滤的URL在中间件中已经按 LogPolicy.SKIP 跳过，这里不再重复判断
+        start_datetime = start_datetime or datetime.now()
+        _ip, method, url = request.client.host, request.method, request.url.path
+        body_form = None
+        body = None
+        if policy == LogPolicy.FULL:
             # 解析请求提交的表单信息
             try:
                 body_form = await request.form()
@@ -114,119 +140,63 @@ class LoguruPluginClient(BasePlugin):
                 body_form = None
 
             # 解析请求提交的body信息
-            body = None
-            try:
-                pass
-                body_bytes = await request.body()
-                if body_bytes:
+            body_bytes = await request.body()
+            if body_bytes:
+                try:
+                    body = await request.json()
+                except Exception:
                     try:
-                        body = await request.json()
+                        body = body_bytes.decode("utf-8")
                     except Exception:
-                        pass
-                        if body_bytes:
-                            try:
-                                body = body_bytes.decode("utf-8")
-                            except Exception:
-                                body = body_bytes.decode("gb2312")
-            except Exception as e:
-                raise e
-            # 在这里记录下当前提交的body的数据，用于下文的提取
-            request.state.body = body
-            # 从头部里面获取出对应的请求头信息，用户用户机型等信息获取
-            try:
-                user_agent = parse(request.headers["user-agent"])
-                browser = user_agent.browser.version
-                if len(browser) >= 2:
-                    _browser_major, _browser_minor = browser[0], browser[1]
-                else:
-                    _browser_major, _browser_minor = 0, 0
-                # 用户当前系统OS信息提取
-                user_os = user_agent.os.version
-                if len(user_os) >= 2:
-                    _os_major, _os_minor = user_os[0], user_os[1]
-                else:
-                    _os_major, _os_minor = 0, 0
-
-                log_msg = {
-                    # 'headers': str(gziprequest.headers),
-                    # 'user_agent': str(gziprequest.user_agent),
-                    # 记录请求头信息----如果需要特殊的获取某些请求的记录则做相关的配置即可
-                    "headers": None
-                    if not self.settings.IS_RECORD_HEADERS
-                    else [
-                        request.headers.get(i, "")
-                        for i in self.settings.NESS_ACCESS_HEADS_KEYS
-                    ]
-                    if self.settings.NESS_ACCESS_HEADS_KEYS
-                    else None,
-                    # 记录请求URL信息
-                    "useragent": None
-                    if not self.settings.IS_RECORD_UA
-                    else {
-                        "os": f"{user_agent.os.family} {user_agent.os.version_string}",
-                        "browser": f"{user_agent.browser.family} {user_agent.browser.version_string}",
-                        "device": {
-                            "family": user_agent.device.family,
-                            "brand": user_agent.device.brand,
-                            "model": user_agent.device.model,
-                        },
-                    },
-                    "url": url,
-                    # 记录请求方法
-                    "method": method,
-                    # 记录请求来源IP
-                    # 'ip': ip,
-                    # 'path': gziprequest.path,
-                    # 记录请求提交的参数信息
-                    "params": {
-                        "query_params": parse_qs(str(request.query_params)),
-                        "from": body_form,
-                        "body": body,
-                    },
-                    # 记录请求的开始时间
-                    "ts": f"{datetime.now():%Y-%m-%d %H:%M:%S%z}",
-                    # 'start_time':  f'{(start_time)}',
-                }
-            except Exception as e:
-                log_msg = {
-                    # 'headers': str(gziprequest.headers),
-                    # 'user_agent': str(gziprequest.user_agent),
-                    # 记录请求头信息----如果需要特殊的获取某些请求的记录则做相关的配置即可
-                    "headers": None
-                    if not self.settings.IS_RECORD_HEADERS
-                    else [
-                        request.headers.get(i, "")
-                        for i in self.settings.NESS_ACCESS_HEADS_KEYS
-                    ]
-                    if self.settings.NESS_ACCESS_HEADS_KEYS
-                    else None,
-                    "url": url,
-                    # 记录请求方法
-                    "method": method,
-                    # 记录请求来源IP
-                    # 'ip': ip,
-                    # 'path': gziprequest.path,
-                    # 记录请求提交的参数信息
-                    "params": {
-                        "query_params": parse_qs(str(request.query_params)),
-                        "from": body_form,
-                        "body": body,
-                    },
-                    # 记录请求的开始时间
-                    "ts": f"{datetime.now():%Y-%m-%d %H:%M:%S%z}",
-                    # 'start_time':  f'{(start_time)}',
-                }
-                raise e
-
-            # 对于没有的数据清除
-            if not log_msg["headers"]:
-                log_msg.pop("headers")
-            if not log_msg["params"]["query_params"]:
-                log_msg["params"].pop("query_params")
-            if not log_msg["params"]["from"]:
-                log_msg["params"].pop("from")
-            if not log_msg["params"]["body"]:
-                log_msg["params"].pop("body")
+                        body = body_bytes.decode("gb2312")
+        # 在这里记录下当前提交的body的数据，用于下文的提取
+        request.state.body = body
+        # 从头部里面获取出对应的请求头信息，用户用户机型等信息获取
+        # 未开启UA记录时不做解析，开启时使用带缓存的解析服务
+        user_agent = (
+            self.user_agent_parser.parse(request.headers.get("user-agent", ""))
+            if self.settings.IS_RECORD_UA
+            else None
+        )
+        log_msg = {
+            # 'headers': str(gziprequest.headers),
+            # 'user_agent': str(gziprequest.user_agent),
+            # 记录请求头信息----如果需要特殊的获取某些请求的记录则做相关的配置即可
+            "headers": None
+            if not self.settings.IS_RECORD_HEADERS
+            else [
+                request.headers.get(i, "") for i in self.settings.NESS_ACCESS_HEADS_KEYS
+            ]
+            if self.settings.NESS_ACCESS_HEADS_KEYS
+            else None,
+            # 记录请求URL信息
+            "useragent": user_agent,
+            "url": url,
+            # 记录请求方法
+            "method": method,
+            # 记录请求来源IP
+            # 'ip': ip,
+            # 'path': gziprequest.path,
+            # 记录请求提交的参数信息
+            "params": {
+                "query_params": parse_qs(str(request.query_params)),
+                "from": body_form,
+                "body": body,
+            },
+            # 记录请求的开始时间
+            "ts": f"{start_datetime:%Y-%m-%d %H:%M:%S%z}",
+            # 'start_time':  f'{(start_time)}',
+        }
+
+        # 对于没有的数据清除
+        if not log_msg["headers"]:
+            log_msg.pop("headers")
+        if not log_msg["params"]["query_params"]:
+            log_msg["params"].pop("query_params")
+        if not log_msg["params"]["from"]:
+            log_msg["params"].pop("from")
+        if not log_msg["params"]["body"]:
+            log_msg["params"].pop("body")
         return log_msg
 
     def setup(self, app: FastAPI, name: str = None, settings=None, *args, **kwargs):
@@ -238,4 +208,37 @@ class LoguruPluginClient(BasePlugin):
         # 开始初始化
         # core_app.add_event_handler("startup", init_logging_ex)
         init_logging(settings)
+        # 启动时编译需要过滤的URL，路由策略表在路由注册完成后的第一次请求时生成
+        self.url_filter = RequestUrlFilter(settings.FLITER_REQUEST_URL)
+        self.route_policy_table: RoutePolicyTable | None = None
+        # 请求内span的导出器
+        self.span_exporter = (
+            OtlpJsonFileExporter(settings.SPAN_EXPORT_PATH, settings.PROJECT_SLUG)
+            if settings.SPAN_EXPORT_PATH
+            else None
+        )
+        # UA解析服务，解析库在第一次使用时才加载
+        self.user_agent_parser = UserAgentParseService(maxsize=settings.UA_CACHE_SIZE)
         app.add_middleware(LoguruPluginClientMiddleware, is_proxy=True, client=self)
+
+    def prebuild(self) -> None:
+        """路由注册完成之后生成路由策略表，预先 fork 时在父进程中执行"""
+        self.route_policy_table = RoutePolicyTable(self.app.routes)
+
+    def refresh(self) -> None:
+        """路由发生变化（如延迟导入的控制器）时在下一次请求重新生成路由策略表"""
+        self.route_policy_table = None
+
+    async def shutdown(self) -> None:
+        """应用关闭时记录UA解析缓存的命中情况，用于调整 UA_CACHE_SIZE"""
+        if self.settings.IS_RECORD_UA:
+            logger.info(f"[{self.name} Plugin] stopped: {self.metrics()}")
+
+    def metrics(self) -> dict:
+        """
+        获取日志记录的统计信息。
+
+        Returns:
+            dict: 包含 useragent 缓存的命中统计。
+        """
+        return {"useragent": self.user_agent_parser.cache_info()}
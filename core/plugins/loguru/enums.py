@@ -16,3 +16,14 @@ class RecordModel(Enum):
     SCATTERED = "scattered"
     # 集中式记录
     CENTRALIZED = "centralized"
+
+
+class LogPolicy(Enum):
+    """路由的日志记录策略"""
+
+    # 不记录
+    SKIP = "skip"
+    # 只记录请求头等基础信息，不读取请求体
+    HEADERS_ONLY = "headers_only"
+    # 完整记录
+    FULL = "full"
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   filter.py
+@Time    :   2026/10/19 10:48:15
+@Desc    :   日志URL过滤器和路由日志策略表
+"""
+
+import re
+from collections.abc import Callable, Iterable
+from fnmatch import translate
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import Scope
+
+from .enums import LogPolicy
+
+# 路由函数上保存日志策略的属性名
+LOG_POLICY_ATTR = "__log_policy__"
+# 通配符字符
+GLOB_CHARS = ("*", "?", "[")
+
+
+def log_policy(policy: LogPolicy) -> Callable:
+    """
+    声明路由的日志记录策略，需要放在路由装饰器的下面
+    用法示例：
+    @router.get("/list", summary="用户列表")
+    @log_policy(LogPolicy.HEADERS_ONLY)
+    def list(self):
+        ...
+    """
+
+    def decorator(func: Callable) -> Callable:
+        setattr(func, LOG_POLICY_ATTR, policy)
+        return func
+
+    return decorator
+
+
+class RequestUrlFilter:
+    """
+    启动时把需要过滤的URL编译为精确匹配集合、前缀元组和通配符正则，
+    直接对 scope["path"] 做判断，不需要创建Request对象也不需要读取请求体
+    配置示例：
+    ["/", "/docs", "/static/*", "/api/v1/*/health"]
+    """
+
+    __slots__ = ("exact_paths", "prefixes", "pattern")
+
+    def __init__(self, urls: Iterable[str]) -> None:
+        """
+        编译过滤规则。
+
+        Args:
+            urls (Iterable[str]): 需要过滤的URL，支持 fnmatch 风格的通配符。
+        """
+        exact_paths, prefixes, patterns = set(), [], []
+        for url in urls:
+            if not any(char in url for char in GLOB_CHARS):
+                exact_paths.add(url)
+            elif url.endswith("*") and not any(char in url[:-1] for char in GLOB_CHARS):
+                # 只在末尾带*的规则，直接使用前缀匹配
+                prefixes.append(url[:-1])
+            else:
+                patterns.append(translate(url))
+        self.exact_paths = frozenset(exact_paths)
+        self.prefixes = tuple(prefixes)
+        self.pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def match(self, scope: Scope) -> bool:
+        """
+        判断当前请求是否需要过滤。
+
+        Args:
+            scope (Scope): ASGI 作用域。
+
+        Returns:
+            bool: 需要过滤返回 `True`。
+        """
+        if scope.get("method") == "OPTIONS":
+            return True
+        path = scope["path"]
+        if "websocket" in path or path in self.exact_paths:
+            return True
+        if self.prefixes and path.startswith(self.prefixes):
+            return True
+        return self.pattern is not None and self.pattern.match(path) is not None
+
+
+class RoutePolicyTable:
+    """
+    路由日志策略表，只保存声明了策略的路由。
+    静态路由按 (method, path) 放入字典，带路径参数的路由保留少量的正则在后面逐个匹配
+    """
+
+    __slots__ = ("static_routes", "dynamic_routes")
+
+    def __init__(self, routes: Iterable[BaseRoute]) -> None:
+        """
+        根据应用的路由生成策略表。
+
+        Args:
+            routes (Iterable[BaseRoute]): 应用注册的路由。
+        """
+        self.static_routes: dict[tuple[str, str], LogPolicy] = {}
+        self.dynamic_routes: list[tuple[BaseRoute, LogPolicy]] = []
+        for route in routes:
+            policy = getattr(getattr(route, "endpoint", None), LOG_POLICY_ATTR, None)
+            if policy is None:
+                continue
+            if getattr(route, "param_convertors", None):
+                self.dynamic_routes.append((route, policy))
+            else:
+                for method in getattr(route, "methods", None) or ():
+                    self.static_routes[(method, route.path)] = policy
+
+    def resolve(self, scope: Scope) -> LogPolicy:
+        """
+        查询当前请求对应的日志策略，未声明的路由默认完整记录。
+
+        Args:
+            scope (Scope): ASGI 作用域。
+
+        Returns:
+            LogPolicy: 日志记录策略。
+        """
+        policy = self.static_routes.get((scope.get("method"), scope["path"]))
+        if policy is not None:
+            return policy
+        for route, policy in self.dynamic_routes:
+            if route.matches(scope)[0] == Match.FULL:
+                return policy
+        return LogPolicy.FULL
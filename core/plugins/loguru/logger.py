@@ -7,14 +7,15 @@
 """
 
 from datetime import datetime
+from itertools import count
 from time import perf_counter
 
 from fastapi import Request
 from loguru import logger as log
 
+from core.libs.context import RequestContext, request_context_var
 from core.tools.json_helper import dict_to_json
 
-from .contextvar import logrequest
 from .enums import RecordModel
 
 
@@ -30,57 +31,84 @@ def get_client_ip(request: Request):
     return request.client.host
 
 
-def info(msg, event_name="logic", model=RecordModel.SCATTERED):
-    """记录日志"""
-    try:
-        assert hasattr(logrequest.state, "traceid"), "需要先初始化日志插件对象"
-        if (
-            hasattr(logrequest.state, "close_record")
-            and not logrequest.state.close_record
-        ):
+class RequestBoundLogger:
+    """
+    请求级别的日志对象，在中间件中每个请求只创建一次，保存在请求上下文的 logger 字段中。
+    traceid、ip 在创建时绑定，链路序号、开始时间和记录模式直接读写请求上下文的字段
+    """
+
+    __slots__ = ("context", "ip", "trace_logs_record", "spans", "_counter", "_log")
+
+    def __init__(self, context: RequestContext, ip: str) -> None:
+        """
+        创建请求级别的日志对象。
+
+        Args:
+            context (RequestContext): 请求上下文，需要先设置好 traceid、start_time 和 record_model。
+            ip (str): 客户端IP。
+        """
+        self.context = context
+        self.ip = ip
+        self.trace_logs_record: list[str] = []
+        self.spans: list = []
+        # itertools.count 的 next 在GIL下是原子操作，线程池中的同步接口同样可以安全叠加
+        self._counter = count(1)
+        self._log = log.bind(traceid=context.traceid, ip=ip)
+
+    @property
+    def traceid(self) -> str:
+        """请求链路ID"""
+        return self.context.traceid
+
+    def record_span(self, span) -> None:
+        """记录结束的span，集中式日志模式下同时写入链路日志"""
+        self.spans.append(span)
+        if self.context.record_model == RecordModel.CENTRALIZED:
+            self.info(span.to_dict(), event_name="span")
+
+    def info(self, msg, event_name="logic", model=RecordModel.SCATTERED):
+        """记录日志"""
+        context = self.context
+        if context.close_record:
+            # 忽略整个请求链路下所有其他日志的日志请求
+            return
+        # 叠加事件ID编号
+        context.traceindex = traceindex = next(self._counter)
+        # 每个打点记录的都记录一下消耗的时间
+        end_time = f"{(perf_counter() - context.start_time):.2f}"
+        if context.record_model == model:
             # 分散日志记录
-            traceid = logrequest.state.traceid
-            # 叠加事件ID编号
-            logrequest.state.traceindex = traceindex = logrequest.state.traceindex + 1
-            start_time = logrequest.state.start_time
-            end_time = f"{(perf_counter() - start_time):.2f}"
-            # 每个打点记录的都记录一下消耗的时间
-            if logrequest.state.record_model == model:
-                try:
-                    log.bind(
-                        traceid=traceid,
-                        event_name=event_name,
-                        cost_time=end_time,
-                        traceindex=traceindex,
-                        ip=get_client_ip(request=logrequest),
-                    ).info(msg)
-                except Exception:
-                    return None
-            else:
-                # 集中式日志日志记录
-                logmsg = {
-                    # 定义链路所以序号
-                    "trace_index": traceindex,
-                    # 时间类型描述描述
-                    "event_name": event_name,
-                    # 日志内容详情
-                    "msg": msg,
-                    "cost_time": end_time,
-                    "ts": f"{datetime.now():%Y-%m-%d %H:%M:%S%z}",
-                }
-                logrequest.state.trace_logs_record.append(dict_to_json(logmsg))
-                # 标记事件结尾开始记录日志
-                if event_name == "response":
-                    try:
-                        log.bind(
-                            traceid=traceid, ip=get_client_ip(request=logrequest)
-                        ).info(f"[{','.join(logrequest.state.trace_logs_record)}]")
-                    except Exception:
-                        return None
-                pass
-
-    except Exception:
+            self._log.bind(
+                event_name=event_name, cost_time=end_time, traceindex=traceindex
+            ).info(msg)
+            return
+        # 集中式日志日志记录
+        logmsg = dict_to_json(
+            {
+                # 定义链路所以序号
+                "trace_index": traceindex,
+                # 时间类型描述描述
+                "event_name": event_name,
+                # 日志内容详情
+                "msg": msg,
+                "cost_time": end_time,
+                "ts": f"{datetime.now():%Y-%m-%d %H:%M:%S%z}",
+            }
+        )
+        if event_name == "request":
+            # 延迟构造的请求日志仍然放在链路的最前面
+            self.trace_logs_record.insert(0, logmsg)
+        else:
+            self.trace_logs_record.append(logmsg)
+        # 标记事件结尾开始记录日志
+        if event_name == "response":
+            self._log.info(f"[{','.join(self.trace_logs_record)}]")
+
+
+def info(msg, event_name="logic", model=RecordModel.SCATTERED):
+    """记录日志，没有处于请求中时直接记录"""
+    context = request_context_var.get()
+    if context is None or context.logger is None:
         log.bind(event_name=event_name).info(msg)
-    else:
-        # 忽略整个请求链路下所有其他日志的日志请求
-        pass
+        return
+    context.logger.info(msg, event_name=event_name, model=model)
@@ -7,7 +7,7 @@
 """
 
 import json
-from contextvars import ContextVar
+from datetime import datetime
 from time import perf_counter
 from uuid import uuid4
 
@@ -17,9 +17,33 @@ from starlette.requests import Request
 from starlette.responses import Response
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from core.libs.context import RequestContext, request_context_var
+from core.middleware.base import ReplayReceive
+
 from . import logger
-from .contextvar import log_request_var, logrequest
-from .enums import RecordModel
+from .enums import LogPolicy, RecordModel
+from .span import Span, current_span_var
+
+# 记录内容的文本类响应类型
+TEXT_MEDIA_TYPES = (
+    "text/",
+    "application/json",
+    "application/xml",
+    "application/javascript",
+)
+
+
+def is_text_response(headers: Headers) -> bool:
+    """
+    判断响应体是否为可以记录的文本，压缩过的及图片等二进制的响应体不记录内容。
+
+    Args:
+        headers (Headers): 响应头。
+    """
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return not content_type or content_type.startswith(TEXT_MEDIA_TYPES)
 
 
 class ResponseInfo(BaseModel):
@@ -27,6 +51,8 @@ class ResponseInfo(BaseModel):
 
     headers: Headers | None = Field(default=None, title="Response header")
     body: str = Field(default="", title="Response body")
+    # 响应体的实际字节数，超过记录上限的部分不保存在 body 中
+    body_size: int = Field(default=0, title="Response body size")
     status_code: int | None = Field(default=None, title="Status code")
 
     class Config:
@@ -35,10 +61,6 @@ class ResponseInfo(BaseModel):
         arbitrary_types_allowed = True
 
 
-# 存储日志内容的上下文信息
-log_msg_var: ContextVar[dict] = ContextVar("log_msg_var", default=None)
-
-
 class LoguruPluginClientMiddleware:
     """
     FastAPI 中间件，用于集成 Loguru 日志库。
@@ -80,52 +102,72 @@ class LoguruPluginClientMiddleware:
         """
         return json.loads(await self.get_body())
 
-    async def before_request(self, request: Request) -> None:
+    async def before_request(self, request: Request, context: RequestContext) -> None:
         """
         请求前的处理，设置追踪 ID 和开始时间。
         如果需要修改请求信息，可直接重写此方法
         Args:
             request (Request): 请求对象。
+            context (RequestContext): 请求上下文。
         """
-        request.state.traceid = str(uuid4())
-        request.state.traceindex = 0
+        context.traceid = str(uuid4())
+        context.traceindex = 0
         #
-        request.state.close_record = False
+        context.close_record = False
         # 计算时间
-        request.state.start_time = perf_counter()
+        context.start_time = perf_counter()
+        # 记录请求到达的时间，延迟构造日志时使用
+        context.start_datetime = datetime.now()
+
+    async def make_deferred_request_log(
+        self, request: Request, context: RequestContext, receive: Receive
+    ) -> None:
+        """
+        延迟构造并记录请求日志。
+        在响应发送完毕之后调用，使用中间件保留的请求体缓冲重新解析请求信息
+        Args:
+            request (Request): 请求对象。
+            context (RequestContext): 请求上下文。
+            receive (Receive): 回放已读取请求体的接收函数。
+        """
+        # 使用新的请求对象重新解析，避免受到下游对请求流消费的影响
+        replay_request = Request(request.scope, receive=receive)
+        context.log_msg = log_msg = await self.client.make_request_log_msg(
+            replay_request,
+            start_datetime=context.start_datetime,
+            policy=context.log_policy,
+        )
+        if log_msg:
+            logger.info(log_msg, event_name="request")
 
     async def after_request(
-        self, request: Request, token=None, response: Response = None
+        self, request: Request, context: RequestContext, response: Response = None
     ) -> None:
         """
         请求后的处理，记录响应内容。
         记录请求耗时等，注意这里没办法对响应结果进行处理
         Args:
             request (Request): 请求对象。
-            token: 上下文变量的令牌。
+            context (RequestContext): 请求上下文。
             response (Response): 响应对象。
         """
+        # 结束请求的根span
+        root_span = context.root_span
+        if root_span.end_ns is None:
+            root_span.set_attribute("http.status_code", response.status_code)
+            root_span.finish()
+            context.logger.record_span(root_span)
+        # 记录请求缓存的命中情况，只被插件用来保存对象时不记录
+        if context.has_cache and (context.cache.hits or context.cache.misses):
+            logger.info(context.cache.stats(), event_name="request_cache")
         # 记录响应报文体内容信息
-        log_msg = log_msg_var.get()
-        if log_msg is None:
-            log_msg = {}
-            log_msg_var.set(log_msg)
-
         if (
             self.client.settings.IS_RECORD_RESPONSE
-            and log_msg
+            and context.log_msg
             and response.status_code != 404
         ):
             logger.info(str(response.body, "utf-8"), event_name="response")
 
-        try:
-            request.state.traceindex = None
-            request.state.traceid = None
-            request.state.trace_logs_record = None
-            log_request_var.reset(token)
-        except Exception as e:
-            logger.error(f"Error resetting context var: {e}")
-
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """
         中间件的主要调用方法。
@@ -142,73 +184,136 @@ class LoguruPluginClientMiddleware:
             await self.app(scope, receive, send)
             return
 
-        # 解决读取BODY问题
-        if self.is_proxy:
-            receive_ = await receive()
-
-            async def receive():
-                return receive_
-
-        # 这里考虑直接读取一次body然后保存到对应的上下文中
-
-        # 解析当前的请求体
-        self.request = Request(scope, receive=receive)
-        # 获取到客户端对象需要过滤的不记录的URL信息，这里直接的跳过
-        if self.client.filter_request_url(request=self.request):
+        # 获取到客户端对象需要过滤的不记录的URL信息，在读取BODY之前直接根据路径判断跳过
+        policy = self.client.resolve_log_policy(scope)
+        if policy == LogPolicy.SKIP:
             # 新增过滤直接跳过不需要做其他判断处理
             return await self.app(scope, receive, send)
+        # 只记录请求头信息的路由不需要读取BODY
+        is_proxy = self.is_proxy and policy == LogPolicy.FULL
 
-        # 解析报文体内容
-        response_info = ResponseInfo()
-        # 自定义回调函数，可以自己进行重写实现具体的业务逻辑
-        await self.before_request(self.request) or self.app
-        # 解析当前的请求体
-        token = log_request_var.set(self.request)
-
-        # 离散是日志记录模式
-        if self.client.settings.MODEL == RecordModel.SCATTERED:
-            logrequest.state.record_model = RecordModel.SCATTERED
-            log_msg = await self.client.make_request_log_msg(self.request)
-            log_msg_var.set(log_msg or {})
-            # 如果过滤了，则也记录请求信息了
-            if log_msg:
-                logger.info(log_msg, event_name="request")
-        else:
-            # 集中式日志记录模式
-            # 创建全局是日志上下文
-            logrequest.state.record_model = RecordModel.CENTRALIZED
-            self.request.state.trace_logs_record = []
-            log_msg = await self.client.make_request_log_msg(self.request)
-            log_msg_var.set(log_msg or {})
-            logger.info(log_msg, event_name="request")
+        # 解决读取BODY问题
+        if is_proxy:
+            receive = ReplayReceive(await receive(), receive)
+            send = receive.wrap_send(send)
 
-        # 下一个循环体
-        async def _next_send(message: Message) -> None:
-            """
-            处理响应消息。
-
-            Args:
-                message (Message): 响应消息。
-            """
-            if message["type"] == "http.response.start":
-                response_info.headers = Headers(raw=message["headers"])
-                response_info.status_code = message["status"]
-            # 解析响应体内容信息
-            elif message["type"] == "http.response.body":
-                if body := message.get("body"):
-                    response_info.body += body.decode("utf-8")
-                response = Response(
-                    content=response_info.body,
-                    status_code=response_info.status_code,
-                    headers=dict(response_info.headers),
-                )
-                await self.after_request(
-                    request=self.request, token=token, response=response
-                )
-
-            await send(message)
+        # 这里考虑直接读取一次body然后保存到对应的上下文中
 
+        # 解析当前的请求体
+        self.request = request = Request(scope, receive=receive)
+        # 请求上下文由全局请求中间件创建，未注册全局请求插件时在这里创建
+        context = request_context_var.get()
+        token = None
+        if context is None:
+            context = RequestContext(request)
+            token = request_context_var.set(context)
+
+        # 设置上下文之后的异常（如解析请求体失败）也要还原上下文、关闭请求上下文
+        span_token = None
         try:
+            # 解析报文体内容
+            response_info = ResponseInfo()
+            # 自定义回调函数，可以自己进行重写实现具体的业务逻辑
+            await self.before_request(request, context) or self.app
+            context.log_policy = policy
+            context.record_model = self.client.settings.MODEL
+            # 每个请求只创建一次日志对象，预先绑定traceid和ip
+            context.logger = logger.RequestBoundLogger(
+                context, ip=logger.get_client_ip(request)
+            )
+            # 整个请求的根span，接口内的span都挂在它的下面
+            context.root_span = Span(
+                f"{scope['method']} {scope['path']}",
+                attributes={
+                    "http.method": scope["method"],
+                    "http.target": scope["path"],
+                },
+            )
+            span_token = current_span_var.set(context.root_span)
+            # 延迟模式下只保留原始的请求引用，日志内容在响应发送之后再构造
+            is_defer = self.client.settings.IS_DEFER_REQUEST_LOG and is_proxy
+
+            # 离散是日志记录模式
+            if context.record_model == RecordModel.SCATTERED:
+                if not is_defer:
+                    context.log_msg = log_msg = await self.client.make_request_log_msg(
+                        request, policy=policy
+                    )
+                    # 如果过滤了，则也记录请求信息了
+                    if log_msg:
+                        logger.info(log_msg, event_name="request")
+            else:
+                # 集中式日志记录模式
+                if not is_defer:
+                    context.log_msg = log_msg = await self.client.make_request_log_msg(
+                        request, policy=policy
+                    )
+                    logger.info(log_msg, event_name="request")
+
+            # 下一个循环体
+            async def _next_send(message: Message) -> None:
+                """
+                处理响应消息。
+
+                Args:
+                    message (Message): 响应消息。
+                """
+                if message["type"] == "http.response.start":
+                    response_info.headers = Headers(raw=message["headers"])
+                    response_info.status_code = message["status"]
+                # 解析响应体内容信息
+                elif message["type"] == "http.response.body":
+                    body = message.get("body")
+                    # 只保留记录上限以内的响应内容，流式响应不会在内存中累积
+                    limit = self.client.settings.RECORD_RESPONSE_LIMIT
+                    if (
+                        body
+                        and response_info.body_size < limit
+                        and is_text_response(response_info.headers)
+                    ):
+                        body_slice = body[: limit - response_info.body_size]
+                        response_info.body += body_slice.decode(
+                            "utf-8", errors="ignore"
+                        )
+                    response_info.body_size += len(body or b"")
+                    if message.get("more_body", False):
+                        # 流式响应的中间部分直接发送，响应结束时再记录
+                        await send(message)
+                        return
+                    if response_info.body and response_info.body_size > limit:
+                        response_info.body += (
+                            f"...(truncated, {response_info.body_size} bytes)"
+                        )
+                    response = Response(
+                        content=response_info.body,
+                        status_code=response_info.status_code,
+                        headers=dict(response_info.headers),
+                    )
+                    if is_defer:
+                        # 先把响应发送给客户端，再构造请求日志，避免日志耗时计入首字节时间
+                        await send(message)
+                        await self.make_deferred_request_log(
+                            request, context, receive.replay
+                        )
+                        await self.after_request(
+                            request=request, context=context, response=response
+                        )
+                        return
+                    await self.after_request(
+                        request=request, context=context, response=response
+                    )
+
+                await send(message)
+
             await self.app(scope, receive, _next_send)
         finally:
-            pass
+            if span_token is not None:
+                # 响应发送完成之后再导出请求内记录的span
+                if self.client.span_exporter is not None:
+                    await self.client.span_exporter.export(
+                        context.traceid, context.logger.spans
+                    )
+                current_span_var.reset(span_token)
+            if token is not None:
+                context.close()
+                request_context_var.reset(token)
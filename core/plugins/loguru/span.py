@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   span.py
+@Time    :   2026/10/19 11:36:02
+@Desc    :   请求内的轻量耗时打点（span）
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import os
+import threading
+from collections.abc import Callable
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter_ns, time_ns
+
+from core.libs.context import request_context_var
+
+# 单调时钟和系统时钟的差值，用于把单调时间戳换算为导出时的Unix时间
+WALL_CLOCK_OFFSET_NS = time_ns() - perf_counter_ns()
+
+# 当前正在执行的span，用于嵌套时查找父级
+current_span_var: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """一次耗时打点记录，开始和结束时间使用单调时钟的纳秒时间戳"""
+
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes")
+
+    def __init__(
+        self, name: str, parent_id: str | None = None, attributes: dict | None = None
+    ) -> None:
+        """
+        创建并开始一个span。
+
+        Args:
+            name (str): span名称。
+            parent_id (str | None): 父级span的ID。
+            attributes (dict | None): 附加的属性信息。
+        """
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.start_ns = perf_counter_ns()
+        self.end_ns: int | None = None
+
+    def set_attribute(self, key: str, value) -> None:
+        """设置属性"""
+        self.attributes[key] = value
+
+    def finish(self) -> None:
+        """结束span"""
+        if self.end_ns is None:
+            self.end_ns = perf_counter_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        """耗时（毫秒），未结束时计算到当前时间"""
+        end_ns = self.end_ns if self.end_ns is not None else perf_counter_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+    def to_dict(self) -> dict:
+        """转换为日志记录使用的字典"""
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+        }
+
+    def to_otlp(self, trace_id: str) -> dict:
+        """
+        转换为 OTLP-JSON 格式的span。
+
+        Args:
+            trace_id (str): 32位十六进制的链路ID。
+        """
+        end_ns = self.end_ns if self.end_ns is not None else perf_counter_ns()
+        return {
+            "traceId": trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns + WALL_CLOCK_OFFSET_NS),
+            "endTimeUnixNano": str(end_ns + WALL_CLOCK_OFFSET_NS),
+            "attributes": [
+                {"key": key, "value": otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+
+
+def otlp_value(value) -> dict:
+    """把属性值转换为 OTLP 的 AnyValue"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class SpanContext:
+    """
+    span的上下文管理器和装饰器，支持同步和异步
+    用法示例：
+    from core.plugins.loguru.span import trace_span
+
+    with trace_span("UserService.login", user_id=1) as span:
+        span.set_attribute("hit", True)
+
+    async with trace_span("serialize"):
+        ...
+
+    @trace_span("UserService.register")
+    def register(self):
+        ...
+    """
+
+    __slots__ = ("name", "attributes", "span", "_token")
+
+    def __init__(self, name: str, **attributes) -> None:
+        """
+        初始化span上下文。
+
+        Args:
+            name (str): span名称。
+            **attributes: 附加的属性信息。
+        """
+        self.name = name
+        self.attributes = attributes
+        self.span: Span | None = None
+        self._token = None
+
+    def __enter__(self) -> Span:
+        """开始span，并设置为当前span"""
+        parent = current_span_var.get()
+        self.span = Span(
+            self.name,
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=dict(self.attributes),
+        )
+        self._token = current_span_var.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        """结束span，并记录到当前请求中"""
+        span = self.span
+        span.finish()
+        if exc is not None:
+            span.set_attribute("error", repr(exc))
+        current_span_var.reset(self._token)
+        context = request_context_var.get()
+        if context is not None and context.logger is not None:
+            context.logger.record_span(span)
+
+    async def __aenter__(self) -> Span:
+        """异步方式开始span"""
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """异步方式结束span"""
+        self.__exit__(exc_type, exc, tb)
+
+    def __call__(self, func: Callable) -> Callable:
+        """作为装饰器使用，每次调用创建新的span"""
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                async with SpanContext(self.name, **self.attributes):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with SpanContext(self.name, **self.attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def trace_span(name: str, **attributes) -> SpanContext:
+    """
+    创建span上下文，可以作为上下文管理器或装饰器使用。
+
+    Args:
+        name (str): span名称。
+        **attributes: 附加的属性信息。
+
+    Returns:
+        SpanContext: span上下文。
+    """
+    return SpanContext(name, **attributes)
+
+
+class OtlpJsonFileExporter:
+    """
+    把请求内的span按 OTLP-JSON 格式导出到本地目录，每个请求一行，按天分文件
+    文件可以直接使用 otel-collector 的 otlpjsonfile receiver 读取
+    """
+
+    def __init__(self, directory: str, service_name: str) -> None:
+        """
+        初始化导出器。
+
+        Args:
+            directory (str): 导出的目录。
+            service_name (str): 服务名称。
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def make_payload(self, traceid: str, spans: list[Span]) -> str:
+        """生成一个请求的 OTLP-JSON 内容"""
+        trace_id = traceid.replace("-", "")
+        return json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                {
+                                    "key": "service.name",
+                                    "value": {"stringValue": self.service_name},
+                                }
+                            ]
+                        },
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": "core.plugins.loguru"},
+                                "spans": [span.to_otlp(trace_id) for span in spans],
+                            }
+                        ],
+                    }
+                ]
+            },
+            ensure_ascii=False,
+        )
+
+    def write(self, payload: str) -> None:
+        """写入文件"""
+        file_path = self.directory / f"spans-{datetime.now():%Y%m%d}.json"
+        with self._lock, file_path.open("a", encoding="utf-8") as file:
+            file.write(payload + "\n")
+
+    async def export(self, traceid: str, spans: list[Span]) -> None:
+        """
+        在线程中导出，不阻塞事件循环。
+
+        Args:
+            traceid (str): 请求链路ID。
+            spans (list[Span]): 请求内记录的span。
+        """
+        if spans:
+            await asyncio.to_thread(self.write, self.make_payload(traceid, spans))
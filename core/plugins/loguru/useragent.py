@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   useragent.py
+@Time    :   2026/10/19 10:12:40
+@Desc    :   带缓存的用户UA解析服务
+"""
+
+from functools import lru_cache
+
+
+class UserAgentParseService:
+    """
+    用户UA解析服务，按原始UA字符串做有限大小的LRU缓存。
+    user_agents 的正则库在第一次解析时才加载，不开启UA记录时不会产生任何加载开销
+    用法示例：
+    parser = UserAgentParseService(maxsize=1024)
+    parser.parse(request.headers.get("user-agent", ""))
+    parser.cache_info()
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        初始化解析服务。
+
+        Args:
+            maxsize (int): 缓存的UA字符串数量上限，默认为 1024。
+        """
+        self.maxsize = maxsize
+        self._parse_cached = lru_cache(maxsize=maxsize)(self._parse)
+
+    @staticmethod
+    def _parse(ua_string: str) -> dict:
+        """解析UA字符串为日志记录使用的字典，第一次调用时才导入解析库"""
+        from user_agents import parse
+
+        user_agent = parse(ua_string)
+        return {
+            "os": f"{user_agent.os.family} {user_agent.os.version_string}",
+            "browser": f"{user_agent.browser.family} {user_agent.browser.version_string}",
+            "device": {
+                "family": user_agent.device.family,
+                "brand": user_agent.device.brand,
+                "model": user_agent.device.model,
+            },
+        }
+
+    def parse(self, ua_string: str) -> dict:
+        """
+        解析UA字符串，命中缓存时直接返回之前的解析结果。
+
+        Args:
+            ua_string (str): 请求头中的原始UA字符串。
+
+        Returns:
+            dict: 包含 os、browser、device 的字典，结果在缓存中共享，不要修改。
+        """
+        return self._parse_cached(ua_string or "")
+
+    def cache_info(self) -> dict:
+        """
+        获取缓存的命中统计信息。
+
+        Returns:
+            dict: 包含 hits、misses、maxsize、currsize、hit_rate 的字典。
+        """
+        info = self._parse_cached.cache_info()
+        total = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "maxsize": info.maxsize,
+            "currsize": info.currsize,
+            "hit_rate": round(info.hits / total, 4) if total else 0.0,
+        }
+
+    def cache_clear(self) -> None:
+        """清空缓存及统计信息"""
+        self._parse_cached.cache_clear()
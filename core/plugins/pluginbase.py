@@ -7,6 +7,10 @@
 """
 
 import abc
+import asyncio
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from time import perf_counter
 
 from fastapi import FastAPI
 
@@ -25,6 +29,8 @@ class IBasePlugin(metaclass=abc.ABCMeta):
     describe: str  # 描述
     # 依赖FastAPI主应用对象
     app: FastAPI | None = None
+    # 依赖的其他插件名称，启动时先启动依赖的插件
+    depends_on: tuple[str, ...] = ()
 
     def __init__(self, app: FastAPI = None, name=None, settings=None, **options):
         """创建应用的插件"""
@@ -38,6 +44,10 @@ class IBasePlugin(metaclass=abc.ABCMeta):
             self.settings = settings
 
             self.setup(app, name, settings, **options)
+            # 插件对象保存，应用启动和关闭时执行插件的 startup 和 shutdown
+            if not hasattr(app.state, "plugins"):
+                app.state.plugins = {}
+            app.state.plugins[self.name] = self
             logger.info(f"[{name} Plugin] initialized")
         else:
             pass
@@ -51,9 +61,127 @@ class IBasePlugin(metaclass=abc.ABCMeta):
         """检测插件是否已安装"""
         return bool(self.app)
 
+    @classmethod
+    def from_settings(cls, app: FastAPI, name: str, settings) -> "IBasePlugin":
+        """
+        根据应用配置创建并安装插件，插件注册表启用插件时调用。
+        插件需要从应用配置中读取参数时重写该方法
+
+        Args:
+            app (FastAPI): 应用实例。
+            name (str): 插件名称。
+            settings: 应用配置。
+        """
+        return cls(app=app, name=name)
+
     @abc.abstractmethod
     def setup(self, app: FastAPI, name: str = None, settings=None, **options):
         """插件初始化"""
-        # 插件对象保存
-        # self.core_app.state.core_plugins={}
-        # self.core_app.state.core_plugins[self.name] = self
+
+    async def startup(self) -> None:  # noqa: B027
+        """应用启动时执行，用于预热连接池、预加载数据等异步初始化"""
+
+    async def shutdown(self) -> None:  # noqa: B027
+        """应用关闭时执行，用于释放插件持有的资源"""
+
+    def prebuild(self) -> None:  # noqa: B027
+        """
+        创建应用之后、接收请求之前执行，用于压缩静态资源、生成缓存等不需要事件循环的准备工作。
+        预先 fork 的启动器在父进程中调用，结果由所有 worker 共享；连接等需要事件循环的资源放在 startup 中
+        """
+
+    def refresh(self) -> None:  # noqa: B027
+        """
+        应用启动之后又导入了模块、注册了路由时执行（如延迟导入的控制器），
+        在启动时缓存了路由或模块级声明的插件需要重写来刷新
+        """
+
+
+def sort_plugins(plugins: dict[str, IBasePlugin]) -> list[list[IBasePlugin]]:
+    """
+    根据插件的依赖关系分批，同一批内的插件互不依赖可以并发启动。
+
+    Args:
+        plugins (dict[str, IBasePlugin]): 插件名称和插件对象。
+
+    Returns:
+        list[list[IBasePlugin]]: 按启动顺序排列的插件批次。
+    """
+    for plugin in plugins.values():
+        for depend_name in plugin.depends_on:
+            if depend_name not in plugins:
+                raise PluginException(
+                    f"[{plugin.name} Plugin] depends on unknown plugin: {depend_name}"
+                )
+    batches, started = [], set()
+    pending = dict(plugins)
+    while pending:
+        batch = [
+            plugin
+            for plugin in pending.values()
+            if all(depend_name in started for depend_name in plugin.depends_on)
+        ]
+        if not batch:
+            raise PluginException(f"Circular plugin dependencies: {', '.join(pending)}")
+        for plugin in batch:
+            pending.pop(plugin.name)
+            started.add(plugin.name)
+        batches.append(batch)
+    return batches
+
+
+async def timed_call(plugin: IBasePlugin, method: str) -> float:
+    """执行插件的启动或关闭方法，返回耗时（毫秒）"""
+    start_time = perf_counter()
+    await getattr(plugin, method)()
+    return (perf_counter() - start_time) * 1000
+
+
+@asynccontextmanager
+async def plugins_lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    """
+    应用生命周期内的插件启动和关闭。
+    没有依赖关系的插件并发启动，关闭时按启动的相反顺序执行
+    用法示例：
+    app = FastAPI(lifespan=plugins_lifespan)
+    """
+    plugins: dict[str, IBasePlugin] = getattr(app.state, "plugins", {})
+    batches = sort_plugins(plugins)
+    report: dict[str, float] = {}
+    app.state.plugin_startup_report = report
+    start_time = perf_counter()
+    started: list[list[IBasePlugin]] = []
+    try:
+        for batch in batches:
+            results = await asyncio.gather(
+                *(timed_call(plugin, "startup") for plugin in batch),
+                return_exceptions=True,
+            )
+            # 启动成功的插件在退出时需要关闭
+            started.append(
+                [
+                    plugin
+                    for plugin, result in zip(batch, results, strict=True)
+                    if not isinstance(result, BaseException)
+                ]
+            )
+            for plugin, result in zip(batch, results, strict=True):
+                if isinstance(result, BaseException):
+                    raise PluginException(
+                        f"[{plugin.name} Plugin] startup failed: {result}"
+                    ) from result
+                report[plugin.name] = round(result, 2)
+                logger.info(f"[{plugin.name} Plugin] started in {result:.2f}ms")
+        logger.info(
+            f"Plugins started in {(perf_counter() - start_time) * 1000:.2f}ms: {report}"
+        )
+        yield
+    finally:
+        for batch in reversed(started):
+            results = await asyncio.gather(
+                *(timed_call(plugin, "shutdown") for plugin in batch),
+                return_exceptions=True,
+            )
+            for plugin, result in zip(batch, results, strict=True):
+                if isinstance(result, BaseException):
+                    logger.info(f"[{plugin.name} Plugin] shutdown failed: {result}")
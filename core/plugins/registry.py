@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   registry.py
+@Time    :   2026/10/19 13:52:07
+@Desc    :   插件注册表，按配置开关延迟导入并启用插件
+"""
+
+import importlib
+from importlib.metadata import entry_points
+
+from fastapi import FastAPI
+
+from core.plugins.loguru import logger
+
+from .pluginbase import IBasePlugin, PluginException
+
+# 第三方包通过该分组的 entry points 注册插件
+# [project.entry-points."fastapi_lesson.plugins"]
+# Demo = "demo_plugin.client:DemoPluginClient"
+ENTRY_POINT_GROUP = "fastapi_lesson.plugins"
+
+
+class PluginSpec:
+    """插件的注册信息，插件类只在第一次使用时才导入"""
+
+    __slots__ = ("name", "target", "enabled_by", "_plugin_class")
+
+    def __init__(self, name: str, target: str, enabled_by: str | None = None) -> None:
+        """
+        创建插件注册信息。
+
+        Args:
+            name (str): 插件名称。
+            target (str): 插件类的导入路径，格式为 "module:ClassName"。
+            enabled_by (str | None): 控制是否启用插件的配置项名称。
+        """
+        self.name = name
+        self.target = target
+        self.enabled_by = enabled_by
+        self._plugin_class: type[IBasePlugin] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        """插件类是否已导入"""
+        return self._plugin_class is not None
+
+    def load(self) -> type[IBasePlugin]:
+        """导入插件类"""
+        if self._plugin_class is None:
+            module_path, _, attr = self.target.partition(":")
+            try:
+                plugin_class = getattr(importlib.import_module(module_path), attr)
+            except (ImportError, AttributeError) as e:
+                raise PluginException(
+                    f"[{self.name} Plugin] load failed {self.target}: {e}"
+                ) from e
+            if not (
+                isinstance(plugin_class, type) and issubclass(plugin_class, IBasePlugin)
+            ):
+                raise PluginException(
+                    f"[{self.name} Plugin] {self.target} is not a IBasePlugin"
+                )
+            self._plugin_class = plugin_class
+        return self._plugin_class
+
+    def is_enabled(self, settings) -> bool:
+        """
+        根据配置判断是否启用插件。
+        配置项 plugins_enabled 中列出的插件，或者 enabled_by 对应的配置项为真时启用
+        """
+        if self.name in getattr(settings, "plugins_enabled", ()):
+            return True
+        return bool(self.enabled_by and getattr(settings, self.enabled_by, False))
+
+
+class PluginRegistry:
+    """
+    插件注册表
+    用法示例：
+    plugin_registry.register(
+        "Swaggerui", "core.plugins.swaggerui:SwaggeruiPluginClient", enabled_by="swaggerui_enabled"
+    )
+    plugin_registry.activate(app, settings)
+    """
+
+    def __init__(self) -> None:
+        """创建插件注册表，注册表在进程内共享，已安装的插件保存在各自应用的 app.state.plugins 中"""
+        self.specs: dict[str, PluginSpec] = {}
+
+    def register(self, name: str, target: str, enabled_by: str | None = None) -> None:
+        """
+        注册插件，只记录导入路径不会导入插件。
+
+        Args:
+            name (str): 插件名称。
+            target (str): 插件类的导入路径，格式为 "module:ClassName"。
+            enabled_by (str | None): 控制是否启用插件的配置项名称。
+        """
+        self.specs[name] = PluginSpec(name, target, enabled_by)
+
+    def discover(self, settings) -> None:
+        """
+        发现 entry points 和配置项 plugin_targets 中声明的插件。
+
+        Args:
+            settings: 应用配置。
+        """
+        group = getattr(settings, "plugin_entry_point_group", ENTRY_POINT_GROUP)
+        for entry_point in entry_points(group=group):
+            self.specs.setdefault(
+                entry_point.name, PluginSpec(entry_point.name, entry_point.value)
+            )
+        for name, target in getattr(settings, "plugin_targets", {}).items():
+            self.specs.setdefault(name, PluginSpec(name, target))
+
+    def activate(self, app: FastAPI, settings) -> dict[str, IBasePlugin]:
+        """
+        导入并安装所有启用的插件，未启用的插件不会被导入。
+
+        Args:
+            app (FastAPI): 应用实例。
+            settings: 应用配置。
+
+        Returns:
+            dict[str, IBasePlugin]: 本次安装的插件。
+        """
+        self.discover(settings)
+        installed: dict[str, IBasePlugin] = getattr(app.state, "plugins", {})
+        activated: dict[str, IBasePlugin] = {}
+        for name, spec in self.specs.items():
+            # 同一个应用重复启用时跳过已安装的插件，不同应用各自安装
+            if name in installed or not spec.is_enabled(settings):
+                continue
+            plugin_class = spec.load()
+            activated[name] = plugin_class.from_settings(app, name, settings)
+        logger.info(f"Activated plugins: {', '.join(activated) or '-'}")
+        return activated
+
+    @staticmethod
+    def get(app: FastAPI, name: str) -> IBasePlugin | None:
+        """
+        获取应用已安装的插件。
+
+        Args:
+            app (FastAPI): 应用实例。
+            name (str): 插件名称。
+        """
+        return getattr(app.state, "plugins", {}).get(name)
+
+
+plugin_registry = PluginRegistry()
+# 内置插件
+plugin_registry.register(
+    "Swaggerui",
+    "core.plugins.swaggerui:SwaggeruiPluginClient",
+    enabled_by="swaggerui_enabled",
+)
+plugin_registry.register(
+    "Jobs",
+    "core.plugins.jobs:JobsPluginClient",
+    enabled_by="jobs_enabled",
+)
+plugin_registry.register(
+    "Scheduler",
+    "core.plugins.scheduler:SchedulerPluginClient",
+    enabled_by="scheduler_enabled",
+)
+plugin_registry.register(
+    "Events",
+    "core.plugins.events.client:EventBusPluginClient",
+    enabled_by="events_enabled",
+)
+plugin_registry.register(
+    "Database",
+    "core.plugins.database:DatabasePluginClient",
+    enabled_by="sqlalchemy_enabled",
+)
+plugin_registry.register(
+    "Session",
+    "core.plugins.session:SessionPluginClient",
+    enabled_by="session_enabled",
+)
+plugin_registry.register(
+    "HttpClient",
+    "core.plugins.httpclient:HttpClientPluginClient",
+    enabled_by="http_client_enabled",
+)
+# 预热插件依赖其他所有插件，在最后启动
+plugin_registry.register(
+    "Warmup",
+    "core.plugins.warmup:WarmupPluginClient",
+    enabled_by="warmup_enabled",
+)
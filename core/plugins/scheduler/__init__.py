@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   __init__.py
+@Time    :   2026/10/19 15:05:36
+@Desc    :   None
+"""
+
+from .client import SchedulerPluginClient, scheduled
+from .triggers import CronTrigger, IntervalTrigger
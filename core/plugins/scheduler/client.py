@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   client.py
+@Time    :   2026/10/19 15:05:36
+@Desc    :   多worker安全的定时任务插件
+"""
+
+import asyncio
+import inspect
+import os
+import tempfile
+from collections.abc import Callable
+from datetime import datetime
+from time import perf_counter
+
+from fastapi import FastAPI
+from pydantic_settings import BaseSettings as Settings
+
+from core.plugins.loguru import logger
+
+from ..pluginbase import IBasePlugin as BasePlugin
+from ..pluginbase import PluginException
+from .triggers import CronTrigger, IntervalTrigger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLeaderLock:
+    """
+    基于文件锁的选主，同一台机器上只有一个worker能拿到锁
+    持有锁的进程退出后操作系统自动释放锁，其他worker下次重试时接管
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        创建文件锁。
+
+        Args:
+            path (str): 锁文件路径。
+        """
+        self.path = path
+        self._file = None
+
+    @property
+    def is_leader(self) -> bool:
+        """当前进程是否持有锁"""
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """尝试获取锁，不阻塞"""
+        if self._file is not None:
+            return True
+        # 持有锁期间保持文件打开，获取失败或释放锁时关闭
+        file = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            file.close()
+            return False
+        file.seek(0)
+        file.truncate()
+        file.write(str(os.getpid()))
+        file.flush()
+        self._file = file
+        return True
+
+    def release(self) -> None:
+        """释放锁"""
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class ScheduledTask:
+    """定时任务及其执行统计"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        trigger: IntervalTrigger | CronTrigger,
+        allow_overlap: bool = False,
+    ) -> None:
+        """
+        创建定时任务。
+
+        Args:
+            name (str): 任务名称。
+            func (Callable): 任务函数，同步函数在线程中执行。
+            trigger (IntervalTrigger | CronTrigger): 触发器。
+            allow_overlap (bool): 上一次未执行完成时是否允许再次执行。
+        """
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.allow_overlap = allow_overlap
+        self.next_run: datetime | None = None
+        self.running = 0
+        # 执行统计
+        self.runs = 0
+        self.failed = 0
+        self.skipped = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+
+    async def run(self) -> None:
+        """执行一次任务并记录耗时"""
+        start_time = perf_counter()
+        self.running += 1
+        try:
+            if inspect.iscoroutinefunction(self.func):
+                await self.func()
+            else:
+                await asyncio.to_thread(self.func)
+        except Exception as e:
+            self.failed += 1
+            logger.info(
+                f"[Scheduler] task {self.name} failed: {e!r}", event_name="schedule"
+            )
+        finally:
+            self.running -= 1
+            self.runs += 1
+            self.last_ms = (perf_counter() - start_time) * 1000
+            self.total_ms += self.last_ms
+            self.max_ms = max(self.max_ms, self.last_ms)
+
+    def to_dict(self) -> dict:
+        """转换为统计信息字典"""
+        return {
+            "trigger": repr(self.trigger),
+            "next_run": f"{self.next_run:%Y-%m-%d %H:%M:%S}" if self.next_run else None,
+            "running": self.running,
+            "runs": self.runs,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "last_ms": round(self.last_ms, 3),
+            "avg_ms": round(self.total_ms / self.runs, 3) if self.runs else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+# 通过 scheduled 装饰器声明的定时任务，插件启动时加载
+scheduled_tasks: dict[str, ScheduledTask] = {}
+
+
+def scheduled(
+    every: float | None = None,
+    cron: str | None = None,
+    name: str | None = None,
+    allow_overlap: bool = False,
+) -> Callable:
+    """
+    声明定时任务，every 和 cron 二选一。
+
+    Args:
+        every (float | None): 执行间隔（秒）。
+        cron (str | None): cron 表达式。
+        name (str | None): 任务名称，默认为函数名称。
+        allow_overlap (bool): 上一次未执行完成时是否允许再次执行。
+
+    用法示例：
+    from core.plugins.scheduler import scheduled
+
+    @scheduled(every=5)
+    async def do_things():
+        ...
+
+    @scheduled(cron="0 3 * * *")
+    async def clean_expired():
+        ...
+    """
+    if (every is None) == (cron is None):
+        raise PluginException("scheduled requires exactly one of every or cron")
+    trigger = IntervalTrigger(every) if every is not None else CronTrigger(cron)
+
+    def decorator(func: Callable) -> Callable:
+        task_name = name or f"{func.__module__}.{func.__qualname__}"
+        scheduled_tasks[task_name] = ScheduledTask(
+            task_name, func, trigger, allow_overlap
+        )
+        return func
+
+    return decorator
+
+
+class SchedulerPluginClient(BasePlugin):
+    """
+    定时任务插件
+    多worker运行时通过文件锁选主，每台机器上每个任务只执行一次；
+    未拿到锁的worker定期重试，持有锁的worker退出后自动接管
+    """
+
+    name = "定时任务插件"
+    describe = "支持间隔和cron触发的异步定时任务，同一台机器上只有一个worker执行"
+
+    class SchedulerConfig(Settings):
+        """默认配置"""
+
+        # 选主使用的锁文件，为空时使用系统临时目录
+        LOCK_FILE: str | None = None
+        # 未拿到锁的worker重试的间隔（秒）
+        LEADER_RETRY: float = 10
+        # 应用关闭时等待执行中任务完成的时间（秒）
+        SHUTDOWN_TIMEOUT: float = 10
+
+    @classmethod
+    def from_settings(
+        cls, app: FastAPI, name: str, settings
+    ) -> "SchedulerPluginClient":
+        """根据应用配置创建插件"""
+        return cls(
+            app=app,
+            name=name,
+            settings=cls.SchedulerConfig(
+                LOCK_FILE=settings.scheduler_lock_file,
+                LEADER_RETRY=settings.scheduler_leader_retry,
+            ),
+        )
+
+    def setup(self, app: FastAPI, name: str = None, settings=None, *args, **kwargs):
+        """插件初始化"""
+        self.settings = settings or self.SchedulerConfig()
+        lock_file = self.settings.LOCK_FILE or os.path.join(
+            tempfile.gettempdir(), "fastapi-lesson-scheduler.lock"
+        )
+        self.leader_lock = FileLeaderLock(lock_file)
+        self.tasks: dict[str, ScheduledTask] = {}
+        self.running_tasks: set[asyncio.Task] = set()
+        self._loop_task: asyncio.Task | None = None
+        app.state.scheduler = self
+
+    def add_task(
+        self,
+        func: Callable,
+        every: float | None = None,
+        cron: str | None = None,
+        name: str | None = None,
+        allow_overlap: bool = False,
+    ) -> None:
+        """添加定时任务，参数同 scheduled"""
+        scheduled(every, cron, name, allow_overlap)(func)
+
+    async def startup(self) -> None:
+        """启动调度循环"""
+        self.tasks = scheduled_tasks
+        self._loop_task = asyncio.create_task(self._schedule_loop(), name="scheduler")
+
+    async def shutdown(self) -> None:
+        """停止调度，等待执行中的任务完成后释放锁"""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        if self.running_tasks:
+            await asyncio.wait(
+                self.running_tasks, timeout=self.settings.SHUTDOWN_TIMEOUT
+            )
+            for task in self.running_tasks:
+                task.cancel()
+        self.leader_lock.release()
+
+    async def _schedule_loop(self) -> None:
+        """调度循环，只有持有锁的worker执行任务"""
+        while True:
+            if not self.leader_lock.is_leader:
+                if not self.leader_lock.acquire():
+                    await asyncio.sleep(self.settings.LEADER_RETRY)
+                    continue
+                logger.info(f"[{self.name} Plugin] became leader pid:{os.getpid()}")
+                now = datetime.now()
+                for task in self.tasks.values():
+                    task.next_run = task.trigger.next_run(now)
+            now = datetime.now()
+            for task in self.tasks.values():
+                if task.next_run is None:
+                    # 启动后新添加的任务
+                    task.next_run = task.trigger.next_run(now)
+                if task.next_run > now:
+                    continue
+                task.next_run = task.trigger.next_run(now)
+                if task.running and not task.allow_overlap:
+                    # 上一次还未执行完成，跳过本次
+                    task.skipped += 1
+                    continue
+                running_task = asyncio.create_task(task.run(), name=task.name)
+                self.running_tasks.add(running_task)
+                running_task.add_done_callback(self.running_tasks.discard)
+            wake_at = min((task.next_run for task in self.tasks.values()), default=None)
+            delay = (
+                (wake_at - datetime.now()).total_seconds()
+                if wake_at
+                else self.settings.LEADER_RETRY
+            )
+            await asyncio.sleep(max(delay, 0.01))
+
+    def metrics(self) -> dict:
+        """
+        获取定时任务的统计信息。
+
+        Returns:
+            dict: 包含是否为主worker及每个任务的执行统计。
+        """
+        return {
+            "leader": self.leader_lock.is_leader,
+            "pid": os.getpid(),
+            "tasks": {name: task.to_dict() for name, task in self.tasks.items()},
+        }
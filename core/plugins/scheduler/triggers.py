@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   triggers.py
+@Time    :   2026/10/19 15:05:36
+@Desc    :   定时任务的触发器
+"""
+
+from datetime import datetime, timedelta
+
+from ..pluginbase import PluginException
+
+
+class IntervalTrigger:
+    """固定间隔触发"""
+
+    def __init__(self, seconds: float) -> None:
+        """
+        创建间隔触发器。
+
+        Args:
+            seconds (float): 触发间隔（秒）。
+        """
+        if seconds <= 0:
+            raise PluginException(f"Invalid interval: {seconds}")
+        self.interval = timedelta(seconds=seconds)
+
+    def next_run(self, after: datetime) -> datetime:
+        """获取 after 之后的下一次触发时间"""
+        return after + self.interval
+
+    def __repr__(self) -> str:
+        """输出触发器信息"""
+        return f"every {self.interval.total_seconds()}s"
+
+
+class CronTrigger:
+    """
+    cron 表达式触发，格式为 "分 时 日 月 周"，支持 *、a-b、a,b 及 */n、a-b/n
+    周的取值为 0-7，0 和 7 都表示周日；日和周都有限制时满足其一即触发
+    用法示例：
+    CronTrigger("*/5 * * * *")  # 每5分钟
+    CronTrigger("30 2 * * 1-5")  # 工作日的 02:30
+    """
+
+    # 各字段的取值范围
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str) -> None:
+        """
+        解析 cron 表达式。
+
+        Args:
+            expression (str): cron 表达式。
+        """
+        fields = expression.split()
+        if len(fields) != 5:
+            raise PluginException(f"Invalid cron expression: {expression}")
+        self.expression = expression
+        parsed = [
+            self._parse_field(field, low, high)
+            for field, (low, high) in zip(fields, self.FIELD_RANGES, strict=True)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # 7 也表示周日
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # 字段为 * 时不参与日和周的或判断
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> frozenset[int]:
+        """解析单个字段为允许的取值集合"""
+        values: set[int] = set()
+        for part in field.split(","):
+            value_range, _, step = part.partition("/")
+            if value_range == "*":
+                start, end = low, high
+            elif "-" in value_range:
+                start, end = (int(value) for value in value_range.split("-", 1))
+            else:
+                start = end = int(value_range)
+            if start < low or end > high or start > end:
+                raise PluginException(f"Invalid cron field: {field}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return frozenset(values)
+
+    def _day_matches(self, moment: datetime) -> bool:
+        """判断日期是否满足日和周的限制"""
+        day_match = moment.day in self.days
+        # cron 中周日为0，weekday() 中周一为0
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return weekday_match
+        if self.any_weekday:
+            return day_match
+        return day_match or weekday_match
+
+    def next_run(self, after: datetime) -> datetime:
+        """获取 after 之后的下一次触发时间，不匹配时按月、日、时跳过以减少循环次数"""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = after.year + 5
+        while moment.year <= limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(
+                    day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise PluginException(f"Cron expression never matches: {self.expression}")
+
+    def __repr__(self) -> str:
+        """输出触发器信息"""
+        return f"cron {self.expression}"
@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   __init__.py
+@Time    :   2026/10/19 16:58:41
+@Desc    :   None
+"""
+
+from .client import Session, SessionNotLoaded, SessionPluginClient, load_session
+from .stores import MmapStore, SessionStore, ShardedMemoryStore
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   client.py
+@Time    :   2026/10/19 16:58:41
+@Desc    :   会话插件
+"""
+
+import json
+import os
+import re
+import secrets
+from collections.abc import Iterator, MutableMapping
+from http.cookies import SimpleCookie
+from typing import Any
+
+from fastapi import FastAPI
+from pydantic_settings import BaseSettings as Settings
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection, Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.libs.cachedir import user_cache_dir
+
+from ..pluginbase import IBasePlugin as BasePlugin
+from ..pluginbase import PluginException
+from .stores import MmapStore, SessionStore, ShardedMemoryStore
+
+# 会话ID为32位十六进制字符串
+SESSION_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+class SessionNotLoaded(PluginException):
+    """关闭自动加载时，使用会话前需要先调用 load_session"""
+
+
+class Session(MutableMapping):
+    """
+    请求的会话，第一次读写时才从存储中加载，只有修改过才写回存储
+    修改嵌套的对象（如 session["cart"].append(1)）不会被检测到，需要调用 mark_modified
+    """
+
+    __slots__ = ("store", "session_id", "auto_load", "loaded", "modified", "_data")
+
+    def __init__(self, store: SessionStore, session_id: str | None, auto_load: bool):
+        """
+        创建会话。
+
+        Args:
+            store (SessionStore): 会话存储。
+            session_id (str | None): 请求cookie中的会话ID。
+            auto_load (bool): 是否在第一次读写时自动加载。
+        """
+        self.store = store
+        self.session_id = session_id
+        self.auto_load = auto_load
+        # 是否已从存储中加载
+        self.loaded = False
+        # 是否修改过
+        self.modified = False
+        self._data: dict = {}
+
+    def load(self) -> None:
+        """从存储中加载会话"""
+        if self.loaded:
+            return
+        self.loaded = True
+        if self.session_id is None:
+            return
+        raw = self.store.read(self.session_id)
+        if raw is None:
+            # 会话已过期或被淘汰，写回时使用新的ID
+            self.session_id = None
+            return
+        self._data = json.loads(raw)
+
+    @property
+    def data(self) -> dict:
+        """会话数据，未加载时按配置自动加载"""
+        if not self.loaded:
+            if not self.auto_load:
+                raise SessionNotLoaded("Session is not loaded, call load_session first")
+            self.load()
+        return self._data
+
+    def mark_modified(self) -> None:
+        """标记为已修改，用于修改了嵌套的对象"""
+        self.modified = True
+
+    def regenerate_id(self) -> None:
+        """登录等权限变化时更换会话ID，避免会话固定攻击"""
+        self.load()
+        if self.session_id is not None:
+            self.store.remove(self.session_id)
+        self.session_id = None
+        self.modified = True
+
+    def __getitem__(self, key: str) -> Any:
+        """读取会话数据"""
+        return self.data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """写入会话数据"""
+        self.data[key] = value
+        self.modified = True
+
+    def __delitem__(self, key: str) -> None:
+        """删除会话数据"""
+        del self.data[key]
+        self.modified = True
+
+    def __iter__(self) -> Iterator:
+        """遍历会话数据的key"""
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        """会话数据的数量"""
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        """输出会话信息"""
+        return (
+            f"<Session {self.session_id} loaded={self.loaded} modified={self.modified}>"
+        )
+
+
+async def load_session(conn: HTTPConnection) -> Session:
+    """
+    加载当前请求的会话，关闭自动加载时使用会话前需要先调用。
+
+    Args:
+        conn (HTTPConnection): 请求对象。
+
+    Returns:
+        Session: 当前请求的会话。
+    """
+    session: Session = conn.session
+    session.load()
+    return session
+
+
+class SessionPluginClient(BasePlugin):
+    """
+    会话插件，request.session 为当前请求的会话
+    用法示例：
+    @router.post("/login")
+    def login(request: Request):
+        request.session.regenerate_id()
+        request.session["user_id"] = 1
+    """
+
+    name = "会话插件"
+    describe = (
+        "按需加载、只在修改后写回的会话，支持分片内存存储和多worker共享的mmap存储"
+    )
+
+    class SessionConfig(Settings):
+        """默认配置"""
+
+        # 会话的存储 memory | mmap
+        STORE: str = "memory"
+        COOKIE_NAME: str = "session"
+        # 只允许https读取
+        COOKIE_HTTPS_ONLY: bool = False
+        # 会话生存时间（秒）
+        LIFETIME: int = 3600 * 24 * 14
+        # 是否在第一次读写时自动加载
+        IS_AUTO_LOAD: bool = True
+        # 是否每次请求都续期
+        IS_ROLLING: bool = False
+        # 内存存储的分片数量及会话数量上限
+        MEMORY_SHARDS: int = 16
+        MEMORY_MAX_SESSIONS: int = 10000
+        # mmap存储的文件路径（为空时使用当前用户的缓存目录）、槽位数量及槽位大小
+        MMAP_PATH: str | None = None
+        MMAP_SLOTS: int = 4096
+        MMAP_SLOT_SIZE: int = 4096
+
+    @classmethod
+    def from_settings(cls, app: FastAPI, name: str, settings) -> "SessionPluginClient":
+        """根据应用配置创建插件"""
+        return cls(
+            app=app,
+            name=name,
+            settings=cls.SessionConfig(
+                STORE=settings.session_store,
+                COOKIE_NAME=settings.session_cookie_name,
+                COOKIE_HTTPS_ONLY=settings.session_cookie_https_only,
+                LIFETIME=settings.session_lifetime,
+                IS_AUTO_LOAD=settings.session_is_auto_load,
+                IS_ROLLING=settings.session_is_rolling,
+                MEMORY_SHARDS=settings.session_memory_shards,
+                MEMORY_MAX_SESSIONS=settings.session_memory_max_sessions,
+                MMAP_PATH=settings.session_mmap_path,
+                MMAP_SLOTS=settings.session_mmap_slots,
+                MMAP_SLOT_SIZE=settings.session_mmap_slot_size,
+            ),
+        )
+
+    def setup(self, app: FastAPI, name: str = None, settings=None, *args, **kwargs):
+        """插件初始化"""
+        self.settings = settings = settings or self.SessionConfig()
+        if settings.STORE == "mmap":
+            self.store: SessionStore = MmapStore(
+                settings.MMAP_PATH
+                or os.path.join(user_cache_dir("session"), "sessions.mmap"),
+                slots=settings.MMAP_SLOTS,
+                slot_size=settings.MMAP_SLOT_SIZE,
+            )
+        else:
+            self.store = ShardedMemoryStore(
+                shards=settings.MEMORY_SHARDS,
+                max_sessions=settings.MEMORY_MAX_SESSIONS,
+            )
+        app.add_middleware(SessionMiddleware, client=self)
+
+    async def startup(self) -> None:
+        """
+        打开存储。prefork 时在 fork 之后的每个worker中执行，
+        mmap存储的文件描述符不会在worker之间共享，文件锁才能互斥
+        """
+        self.store.open()
+
+    async def shutdown(self) -> None:
+        """关闭存储"""
+        self.store.close()
+
+    def make_cookie(self, session_id: str, max_age: int) -> str:
+        """生成 Set-Cookie 的内容"""
+        cookie = SimpleCookie()
+        cookie[self.settings.COOKIE_NAME] = session_id
+        morsel = cookie[self.settings.COOKIE_NAME]
+        morsel["path"] = "/"
+        morsel["max-age"] = max_age
+        morsel["httponly"] = True
+        morsel["samesite"] = "lax"
+        if self.settings.COOKIE_HTTPS_ONLY:
+            morsel["secure"] = True
+        return morsel.OutputString()
+
+    def commit(self, session: Session) -> str | None:
+        """
+        响应开始时写回会话，返回需要设置的cookie。
+        没有读写过的会话不访问存储，只读的会话仅在开启续期时刷新有效期
+        """
+        if not session.loaded:
+            return None
+        lifetime = self.settings.LIFETIME
+        if session.modified:
+            if not session._data:
+                # 清空的会话直接删除
+                if session.session_id is None:
+                    return None
+                self.store.remove(session.session_id)
+                return self.make_cookie("", 0)
+            session.session_id = session.session_id or secrets.token_hex(16)
+        elif not (self.settings.IS_ROLLING and session.session_id):
+            return None
+        self.store.write(
+            session.session_id,
+            json.dumps(session._data, ensure_ascii=False).encode(),
+            lifetime,
+        )
+        return self.make_cookie(session.session_id, lifetime)
+
+
+class SessionMiddleware:
+    """把会话放入请求的 scope，响应开始时写回修改过的会话"""
+
+    def __init__(self, app: ASGIApp, client: SessionPluginClient) -> None:
+        """创建中间件"""
+        self.app = app
+        self.client = client
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """执行请求"""
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        session_id = Request(scope).cookies.get(self.client.settings.COOKIE_NAME)
+        if session_id is not None and not SESSION_ID_PATTERN.fullmatch(session_id):
+            # 不是本插件生成的会话ID，直接忽略
+            session_id = None
+        session = scope["session"] = Session(
+            self.client.store, session_id, self.client.settings.IS_AUTO_LOAD
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                cookie = self.client.commit(session)
+                if cookie is not None:
+                    MutableHeaders(scope=message).append("set-cookie", cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
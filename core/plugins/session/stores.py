@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   stores.py
+@Time    :   2026/10/19 16:58:41
+@Desc    :   会话的存储
+"""
+
+import abc
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from core.plugins.loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class SessionStore(metaclass=abc.ABCMeta):
+    """
+    会话存储的定义
+    存储都在本机内完成读写，使用同步接口，线程池中的同步接口也可以直接懒加载会话
+    """
+
+    @abc.abstractmethod
+    def read(self, session_id: str) -> bytes | None:
+        """读取会话数据，不存在或已过期时返回None"""
+
+    @abc.abstractmethod
+    def write(self, session_id: str, data: bytes, ttl: int) -> None:
+        """写入会话数据，ttl 为有效时间（秒）"""
+
+    @abc.abstractmethod
+    def remove(self, session_id: str) -> None:
+        """删除会话"""
+
+    def open(self) -> None:  # noqa: B027
+        """打开存储持有的资源，插件在应用启动时（多进程时在 fork 之后的 worker 中）调用"""
+
+    def close(self) -> None:  # noqa: B027
+        """释放存储持有的资源"""
+
+
+class ShardedMemoryStore(SessionStore):
+    """
+    分片的内存存储，每个分片独立加锁并按LRU淘汰
+    只在当前worker进程内有效，多worker时使用 MmapStore
+    """
+
+    def __init__(self, shards: int = 16, max_sessions: int = 10000) -> None:
+        """
+        创建内存存储。
+
+        Args:
+            shards (int): 分片数量。
+            max_sessions (int): 会话数量上限，平均分配到每个分片。
+        """
+        self.shards: list[OrderedDict[str, tuple[float, bytes]]] = [
+            OrderedDict() for _ in range(shards)
+        ]
+        self.locks = [threading.Lock() for _ in range(shards)]
+        self.shard_size = max(max_sessions // shards, 1)
+
+    def _shard(self, session_id: str) -> int:
+        """获取会话所在的分片"""
+        return zlib.crc32(session_id.encode()) % len(self.shards)
+
+    def read(self, session_id: str) -> bytes | None:
+        """读取会话数据"""
+        index = self._shard(session_id)
+        shard = self.shards[index]
+        with self.locks[index]:
+            item = shard.get(session_id)
+            if item is None:
+                return None
+            expires_at, data = item
+            if expires_at < time.time():
+                del shard[session_id]
+                return None
+            shard.move_to_end(session_id)
+            return data
+
+    def write(self, session_id: str, data: bytes, ttl: int) -> None:
+        """写入会话数据，分片已满时淘汰最久未使用的会话"""
+        index = self._shard(session_id)
+        shard = self.shards[index]
+        with self.locks[index]:
+            shard[session_id] = (time.time() + ttl, data)
+            shard.move_to_end(session_id)
+            while len(shard) > self.shard_size:
+                shard.popitem(last=False)
+
+    def remove(self, session_id: str) -> None:
+        """删除会话"""
+        index = self._shard(session_id)
+        with self.locks[index]:
+            self.shards[index].pop(session_id, None)
+
+    def __len__(self) -> int:
+        """会话数量"""
+        return sum(len(shard) for shard in self.shards)
+
+
+class MmapStore(SessionStore):
+    """
+    基于内存映射文件的存储，同一台机器上的多个worker共享会话
+    文件按固定大小分槽，会话ID哈希到槽位后线性探测；探测范围内没有空位时覆盖最早过期的会话
+    跨进程的读写使用文件锁（Windows 下只有进程内的锁）
+    文件在 open 时才打开，每个worker各自打开，文件锁才能在worker之间互斥；
+    文件只有当前用户可以读写，其他用户创建的文件拒绝使用
+    """
+
+    # 槽位头：会话ID(32字节)、过期时间、数据长度
+    HEADER = struct.Struct("<32sdI")
+    EMPTY_KEY = b"\0" * 32
+
+    def __init__(
+        self, path: str, slots: int = 4096, slot_size: int = 4096, probes: int = 8
+    ) -> None:
+        """
+        创建存储，不打开文件。
+
+        Args:
+            path (str): 映射文件的路径。
+            slots (int): 槽位数量，即最多保存的会话数量。
+            slot_size (int): 每个槽位的字节数，会话数据不能超过槽位大小减去槽位头。
+            probes (int): 冲突时线性探测的槽位数量。
+        """
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.probes = min(probes, slots)
+        self.max_data_size = slot_size - self.HEADER.size
+        self._file = None
+        self._mmap: mmap.mmap | None = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        """打开映射文件，不存在时以 0600 权限创建"""
+        if self._mmap is not None:
+            return
+        size = self.slots * self.slot_size
+        flags = (
+            os.O_RDWR
+            | os.O_CREAT
+            | getattr(os, "O_NOFOLLOW", 0)
+            | getattr(os, "O_CLOEXEC", 0)
+            | getattr(os, "O_BINARY", 0)
+        )
+        fd = os.open(self.path, flags, 0o600)
+        try:
+            stat = os.fstat(fd)
+            if hasattr(os, "getuid"):
+                if stat.st_uid != os.getuid():
+                    raise PermissionError(
+                        f"[MmapStore] {self.path} is owned by another user"
+                    )
+                if stat.st_mode & 0o077:
+                    os.fchmod(fd, 0o600)
+            if stat.st_size < size:
+                os.ftruncate(fd, size)
+            self._mmap = mmap.mmap(fd, size)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._file = os.fdopen(fd, "r+b")
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """进程内及跨进程加锁"""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(
+                    self._file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                )
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _probe(self, session_id: str):
+        """依次返回会话ID可能所在的槽位偏移量及槽位头"""
+        start = zlib.crc32(session_id.encode()) % self.slots
+        for step in range(self.probes):
+            offset = ((start + step) % self.slots) * self.slot_size
+            yield offset, self.HEADER.unpack_from(self._mmap, offset)
+
+    def read(self, session_id: str) -> bytes | None:
+        """读取会话数据"""
+        key = session_id.encode()
+        with self._locked(exclusive=False):
+            for offset, (slot_key, expires_at, length) in self._probe(session_id):
+                if slot_key == key:
+                    if expires_at < time.time():
+                        return None
+                    start = offset + self.HEADER.size
+                    return self._mmap[start : start + length]
+        return None
+
+    def write(self, session_id: str, data: bytes, ttl: int) -> None:
+        """写入会话数据，超过槽位大小时不保存"""
+        if len(data) > self.max_data_size:
+            logger.info(
+                f"[MmapStore] session data too large: {len(data)} > {self.max_data_size}"
+            )
+            return
+        key = session_id.encode()
+        now = time.time()
+        with self._locked(exclusive=True):
+            target, oldest = None, None
+            for offset, (slot_key, expires_at, _) in self._probe(session_id):
+                if slot_key == key:
+                    target = offset
+                    break
+                if target is None and (slot_key == self.EMPTY_KEY or expires_at < now):
+                    target = offset
+                if oldest is None or expires_at < oldest[1]:
+                    oldest = (offset, expires_at)
+            if target is None:
+                target = oldest[0]
+            self.HEADER.pack_into(self._mmap, target, key, now + ttl, len(data))
+            start = target + self.HEADER.size
+            self._mmap[start : start + len(data)] = data
+
+    def remove(self, session_id: str) -> None:
+        """删除会话"""
+        key = session_id.encode()
+        with self._locked(exclusive=True):
+            for offset, (slot_key, _, _) in self._probe(session_id):
+                if slot_key == key:
+                    self.HEADER.pack_into(self._mmap, offset, self.EMPTY_KEY, 0, 0)
+                    return
+
+    def close(self) -> None:
+        """关闭映射文件"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -6,13 +6,17 @@
 @Desc    :   None
 """
 
+import json
+
 from fastapi import FastAPI, Request
 from fastapi.openapi.docs import (
     get_redoc_html,
     get_swagger_ui_html,
     get_swagger_ui_oauth2_redirect_html,
 )
-from fastapi.staticfiles import StaticFiles
+
+from core.tools.precompressed import PrecompressedBody
+from core.tools.staticfiles import PrecompressedStaticFiles
 
 from ..pluginbase import IBasePlugin as BasePlugin
 
@@ -23,11 +27,21 @@ class SwaggeruiPluginClient(BasePlugin):
     name = "本地的Swaggerui文档，避免在线访问"
     describe = "该插件启用后，会自动过滤之前路由设置，只保留下来/docs的路由访问"
 
+    # 文档页面使用的内容类型
+    HTML_MEDIA_TYPE = "text/html; charset=utf-8"
+
     def __init__(self, app: FastAPI = None, name=None, proxy=False, **options):
         """插件初始化"""
         self.proxy = proxy
         super().__init__(app, name, **options)
 
+    @classmethod
+    def from_settings(
+        cls, app: FastAPI, name: str, settings
+    ) -> "SwaggeruiPluginClient":
+        """根据应用配置创建插件"""
+        return cls(app=app, name=name, proxy=settings.swaggerui_proxy)
+
     def setup(self, app: FastAPI, name: str = None, *args, **kwargs):
         """插件初始化"""
         # 启用插件后自动关闭之前的配置在线文档
@@ -39,11 +53,22 @@ class SwaggeruiPluginClient(BasePlugin):
 
         # assert app.redoc_url is None and app.docs_url is None, '本地的Swaggerui文档插件，请先关闭APP原始的开关设置为None'
         # 过滤路由的方式，不用手动的关闭app.redoc_url is None and app.docs_url is None
+        # openapi.json 和 oauth2-redirect 由插件提供预先压缩的版本
+        filtered_paths = (
+            "/docs",
+            "/redoc",
+            app.openapi_url,
+            app.swagger_ui_oauth2_redirect_url,
+        )
         app.router.routes = [
-            route
-            for route in app.routes
-            if route.path != "/docs" and route.path != "/redoc"
+            route for route in app.routes if route.path not in filtered_paths
         ]
+        # 文档内容只生成一次，按 root_path 缓存压缩后的字节
+        self._openapi_source: dict | None = None
+        self._openapi_bodies: dict[str, PrecompressedBody] = {}
+        self._swagger_bodies: dict[str, PrecompressedBody] = {}
+        self._redoc_body: PrecompressedBody | None = None
+        self._oauth2_redirect_body: PrecompressedBody | None = None
         # 需要先设置了关闭才可以自定义
         import pathlib
 
@@ -59,17 +84,31 @@ class SwaggeruiPluginClient(BasePlugin):
         if "/__init__.py" in cur_file_path:
             cur_file_path = cur_file_path.replace("/__init__.py", "")
 
-        # 挂载静态目录
-        app.mount(
-            "/static", StaticFiles(directory=f"{cur_file_path}/static"), name="static"
-        )
+        # 挂载静态目录，文件预先压缩，页面中引用的地址带上内容哈希以便长期缓存
+        self.static = PrecompressedStaticFiles(directory=f"{cur_file_path}/static")
+        app.mount("/static", self.static, name="static")
+
+        if app.openapi_url:
+
+            @app.get(app.openapi_url, include_in_schema=False)
+            async def openapi(req: Request):
+                root_path = req.scope.get("root_path", "").rstrip("/")
+                return self.openapi_body(root_path).response(req)
 
         # 自定义需要在关闭的情况下才可以
         @app.get("/docs", include_in_schema=False)
         @app.get("/swagger/docs", include_in_schema=False)
         async def custom_swagger_ui_html(req: Request):
             root_path = req.scope.get("root_path", "").rstrip("/")
-            openapi_url = root_path + req.app.openapi_url
+            body = self._swagger_bodies.get(root_path)
+            if body is None:
+                body = self._swagger_bodies[root_path] = self.html_body(
+                    render_swagger_ui_html(root_path)
+                )
+            return body.response(req)
+
+        def render_swagger_ui_html(root_path: str):
+            openapi_url = root_path + app.openapi_url
             # INFO  2022-10-01 19:01:43.980 | azyxfastcore.core_plugins.swaggerui:custom_swagger_ui_html:77 |  - root_path：
             # INFO  2022-10-01 19:01:43.980 | azyxfastcore.core_plugins.swaggerui:custom_swagger_ui_html:78 |  - openapi_url：('/openapi.json',)
             # 如果是反向代理之后的话，就不需要设置--- swagger_js_url="/static/swagger-ui-bundle.js",并且返回代理那需要配置为：
@@ -84,15 +123,10 @@ class SwaggeruiPluginClient(BasePlugin):
             # 	location /swagger-ui.css {
             # 		proxy_pass http://woreid_right_pay_online_api_up/static/swagger-ui.css;
             # 	}
-            if self.proxy:
-                swagger_js_url = "/swagger-ui-bundle.js"
-                swagger_css_url = "/swagger-ui.css"
-                swagger_favicon_url = "/favicon.png"
-            else:
-                pass
-                swagger_js_url = "/static/swagger-ui-bundle.js"
-                swagger_css_url = "/static/swagger-ui.css"
-                swagger_favicon_url = "/static/favicon.png"
+            static_prefix = "/" if self.proxy else "/static/"
+            swagger_js_url = static_prefix + self.static.url_for("swagger-ui-bundle.js")
+            swagger_css_url = static_prefix + self.static.url_for("swagger-ui.css")
+            swagger_favicon_url = static_prefix + self.static.url_for("favicon.png")
 
             return get_swagger_ui_html(
                 openapi_url=openapi_url,
@@ -108,19 +142,27 @@ class SwaggeruiPluginClient(BasePlugin):
                 # swagger_favicon_url: str = "https://fastapi.tiangolo.com/img/favicon.png",
             )
 
-        @app.get(app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
-        async def swagger_ui_redirect():
-            return get_swagger_ui_oauth2_redirect_html()
+        if app.swagger_ui_oauth2_redirect_url:
+
+            @app.get(app.swagger_ui_oauth2_redirect_url, include_in_schema=False)
+            async def swagger_ui_redirect(req: Request):
+                if self._oauth2_redirect_body is None:
+                    self._oauth2_redirect_body = self.html_body(
+                        get_swagger_ui_oauth2_redirect_html()
+                    )
+                return self._oauth2_redirect_body.response(req)
 
         @app.get("/redoc", include_in_schema=False)
-        async def redoc_html():
-            if self.proxy:
-                redoc_js_url = "/redoc.standalone.js"
-                redoc_favicon_url = "/favicon.png"
-            else:
-                pass
-                redoc_js_url = "/static/redoc.standalone.js"
-                redoc_favicon_url = "/static/favicon.png"
+        async def redoc_html(req: Request):
+            # redoc 页面不使用 root_path，所有请求共用一份
+            if self._redoc_body is None:
+                self._redoc_body = self.html_body(render_redoc_html())
+            return self._redoc_body.response(req)
+
+        def render_redoc_html():
+            static_prefix = "/" if self.proxy else "/static/"
+            redoc_js_url = static_prefix + self.static.url_for("redoc.standalone.js")
+            redoc_favicon_url = static_prefix + self.static.url_for("favicon.png")
 
             return get_redoc_html(
                 openapi_url=app.openapi_url,
@@ -129,3 +171,58 @@ class SwaggeruiPluginClient(BasePlugin):
                 with_google_fonts=False,
                 redoc_favicon_url=redoc_favicon_url,
             )
+
+    def html_body(self, response) -> PrecompressedBody:
+        """把生成的文档页面转换为预先压缩的内容"""
+        return PrecompressedBody(response.body, media_type=self.HTML_MEDIA_TYPE)
+
+    def openapi_body(self, root_path: str) -> PrecompressedBody:
+        """
+        获取预先压缩的 openapi 文档，应用的文档重新生成后（如延迟导入的模块加载后）自动更新。
+
+        Args:
+            root_path (str): 反向代理的路径前缀。
+
+        Returns:
+            PrecompressedBody: 压缩后的文档内容。
+        """
+        schema = self.app.openapi()
+        if schema is not self._openapi_source:
+            self._openapi_source = schema
+            self._openapi_bodies.clear()
+        body = self._openapi_bodies.get(root_path)
+        if body is None:
+            servers = schema.get("servers", [])
+            if (
+                root_path
+                and self.app.root_path_in_servers
+                and root_path not in {server.get("url") for server in servers}
+            ):
+                schema = {**schema, "servers": [{"url": root_path}, *servers]}
+            # 与 JSONResponse 的序列化方式保持一致
+            content = json.dumps(
+                schema,
+                ensure_ascii=False,
+                allow_nan=False,
+                indent=None,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            body = self._openapi_bodies[root_path] = PrecompressedBody(
+                content, media_type="application/json"
+            )
+        return body
+
+    def prebuild(self) -> None:
+        """压缩静态文件、生成并压缩 openapi 文档，预先 fork 时在父进程中执行"""
+        self.static.compress_all()
+        if self.app.openapi_url:
+            self.openapi_body(self.app.root_path.rstrip("/"))
+
+    async def startup(self) -> None:
+        """
+        应用启动时压缩静态文件、生成并压缩 openapi 文档，第一次请求不再需要等待。
+        父进程中已经执行过 prebuild 时直接使用已压缩的内容
+        """
+        await self.static.prepare()
+        if self.app.openapi_url:
+            self.openapi_body(self.app.root_path.rstrip("/"))
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   __init__.py
+@Time    :   2026/10/19 21:16:40
+@Desc    :   None
+"""
+
+from .client import WarmupPluginClient, WarmupSample, warmup
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   client.py
+@Time    :   2026/10/19 21:16:40
+@Desc    :   接收流量之前在进程内预热路由的插件
+"""
+
+import asyncio
+import json
+from collections.abc import Callable
+from time import perf_counter
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic_settings import BaseSettings as Settings
+
+from core.plugins.loguru import logger
+
+from ..pluginbase import IBasePlugin as BasePlugin
+from ..pluginbase import PluginException
+
+# 接口函数上保存预热样例的属性名
+SAMPLES_ATTR = "__warmup_samples__"
+# 预热请求的 request.state 中标记为预热的属性名，日志插件据此跳过记录
+WARMUP_STATE_KEY = "warmup"
+# 说明样例与接口不匹配的状态码：路径不存在、方法不允许、参数校验失败
+SAMPLE_ERROR_STATUS = frozenset({404, 405, 422})
+
+
+class WarmupSample:
+    """一个预热请求的样例"""
+
+    __slots__ = ("method", "path_params", "query", "json", "headers", "repeat")
+
+    def __init__(
+        self,
+        method: str | None = None,
+        path_params: dict | None = None,
+        query: dict | None = None,
+        json: object = None,
+        headers: dict[str, str] | None = None,
+        repeat: int | None = None,
+    ) -> None:
+        """
+        Args:
+            method (str | None): 请求方法，为空时使用路由的第一个方法。
+            path_params (dict | None): 路径参数。
+            query (dict | None): 查询参数。
+            json (object): 请求体，序列化为 JSON。
+            headers (dict[str, str] | None): 请求头。
+            repeat (int | None): 请求次数，为空时使用插件配置。
+        """
+        self.method = method
+        self.path_params = path_params or {}
+        self.query = query or {}
+        self.json = json
+        self.headers = headers or {}
+        self.repeat = repeat
+
+
+def warmup(
+    *,
+    method: str | None = None,
+    path_params: dict | None = None,
+    query: dict | None = None,
+    json: object = None,
+    headers: dict[str, str] | None = None,
+    repeat: int | None = None,
+) -> Callable:
+    """
+    声明接口参与预热并提供样例请求，可以叠加多个，只有声明了的接口才会被预热。
+    放在路由装饰器的下面，预热请求会真正执行接口，不要用于有副作用的接口
+    用法示例：
+    @router.get("/list")
+    @warmup(query={"limit": 100})
+    def list(self, limit: int): ...
+    """
+    sample = WarmupSample(method, path_params, query, json, headers, repeat)
+
+    def decorator(func: Callable) -> Callable:
+        func.__dict__.setdefault(SAMPLES_ATTR, []).append(sample)
+        return func
+
+    return decorator
+
+
+async def call_app(
+    app: FastAPI, method: str, path: str, query: dict, headers: dict, body: bytes
+) -> int:
+    """
+    在进程内把请求交给应用处理，经过完整的中间件，返回响应状态码。
+
+    Args:
+        app (FastAPI): 应用实例。
+        method (str): 请求方法。
+        path (str): 请求路径。
+        query (dict): 查询参数。
+        headers (dict): 请求头。
+        body (bytes): 请求体。
+    """
+    raw_headers = [(b"host", b"warmup"), (b"user-agent", b"warmup")]
+    raw_headers += [(k.lower().encode(), str(v).encode()) for k, v in headers.items()]
+    if body:
+        raw_headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(query, doseq=True).encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 0),
+        # 标记为预热请求，不计入访问日志
+        "state": {WARMUP_STATE_KEY: True},
+    }
+    status = 0
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # 响应发送完成之后才断开，流式响应监听断开时一直等待
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            response_complete.set()
+
+    await app(scope, receive, send)
+    response_complete.set()
+    return status
+
+
+class WarmupPluginClient(BasePlugin):
+    """
+    路由预热插件
+    应用启动时（其他插件启动之后、开始接收请求之前）在进程内按样例请求声明了 @warmup 的接口，
+    提前生成验证器、依赖、序列化计划、日志格式化等第一次请求才会创建的对象，
+    并提供就绪检查接口，预热完成之后才返回就绪
+    用法示例：
+    curl http://127.0.0.1:8000/health/ready
+    """
+
+    name = "路由预热插件"
+    describe = "接收流量之前预热路由，预热完成后就绪检查才返回成功"
+
+    class WarmupConfig(Settings):
+        """默认配置"""
+
+        # 就绪检查接口的路径
+        READY_PATH: str = "/health/ready"
+        # 每个样例默认的请求次数
+        REPEAT: int = 1
+        # 单个预热请求的超时时间（秒）
+        TIMEOUT: float = 10
+        # 预热请求失败（超时、异常、5xx 或样例与接口不匹配）时是否启动失败
+        FAIL_ON_ERROR: bool = False
+
+    @classmethod
+    def from_settings(cls, app: FastAPI, name: str, settings) -> "WarmupPluginClient":
+        """根据应用配置创建插件"""
+        return cls(
+            app=app,
+            name=name,
+            settings=cls.WarmupConfig(
+                READY_PATH=settings.warmup_ready_path,
+                REPEAT=settings.warmup_repeat,
+                TIMEOUT=settings.warmup_timeout,
+                FAIL_ON_ERROR=settings.warmup_fail_on_error,
+            ),
+        )
+
+    def setup(self, app: FastAPI, name: str = None, settings=None, *args, **kwargs):
+        """插件初始化"""
+        self.settings = settings or self.WarmupConfig()
+        self.ready = False
+        self.report: dict = {}
+        app.add_api_route(
+            self.settings.READY_PATH,
+            self.readiness,
+            methods=["GET"],
+            include_in_schema=False,
+        )
+        app.state.warmup = self
+
+    @property
+    def depends_on(self) -> tuple[str, ...]:
+        """在其他所有插件启动之后再预热"""
+        plugins = getattr(self.app.state, "plugins", {})
+        return tuple(name for name in plugins if name != self.name)
+
+    def collect(self) -> list[tuple[APIRoute, WarmupSample]]:
+        """收集声明了预热样例的接口"""
+        return [
+            (route, sample)
+            for route in self.app.routes
+            if isinstance(route, APIRoute)
+            for sample in getattr(route.endpoint, SAMPLES_ATTR, ())
+        ]
+
+    async def run(self) -> dict:
+        """
+        执行预热。
+
+        Returns:
+            dict: 预热的接口、每个样例第一次和最后一次请求的耗时及失败的请求。
+        """
+        start_time = perf_counter()
+        # 文档在第一次访问时才生成
+        self.app.openapi()
+        routes, errors = [], []
+        for route, sample in self.collect():
+            method = (
+                sample.method or sorted(route.methods - {"HEAD"} or route.methods)[0]
+            )
+            try:
+                path = route.path_format.format(**sample.path_params)
+                body = (
+                    json.dumps(sample.json).encode() if sample.json is not None else b""
+                )
+            except Exception as e:  # noqa: BLE001
+                # 样例与路由不匹配（缺少路径参数、请求体无法序列化）时记为失败，不中断启动
+                errors.append(
+                    f"{method} {route.path}: invalid sample, {type(e).__name__}: {e}"
+                )
+                continue
+            timings = []
+            for _ in range(sample.repeat or self.settings.REPEAT):
+                request_start = perf_counter()
+                try:
+                    status = await asyncio.wait_for(
+                        call_app(
+                            self.app, method, path, sample.query, sample.headers, body
+                        ),
+                        self.settings.TIMEOUT,
+                    )
+                except Exception as e:  # noqa: BLE001
+                    status, error = 0, f"{type(e).__name__}: {e}"
+                else:
+                    error = (
+                        f"status {status}"
+                        if status >= 500 or status in SAMPLE_ERROR_STATUS
+                        else None
+                    )
+                timings.append(round((perf_counter() - request_start) * 1000, 2))
+                if error:
+                    errors.append(f"{method} {path}: {error}")
+                    break
+            routes.append(
+                {
+                    "route": f"{method} {path}",
+                    "status": status,
+                    "first_ms": timings[0],
+                    "last_ms": timings[-1],
+                }
+            )
+        return {
+            "elapsed_ms": round((perf_counter() - start_time) * 1000, 2),
+            "routes": routes,
+            "errors": errors,
+        }
+
+    async def startup(self) -> None:
+        """预热完成之后标记为就绪"""
+        self.report = await self.run()
+        logger.info(f"[{self.name} Plugin] {self.report}")
+        if self.report["errors"] and self.settings.FAIL_ON_ERROR:
+            raise PluginException(
+                f"[{self.name} Plugin] warm-up failed: {self.report['errors']}"
+            )
+        self.ready = True
+
+    async def shutdown(self) -> None:
+        """关闭时不再就绪，负载均衡停止转发新的请求"""
+        self.ready = False
+
+    async def readiness(self) -> JSONResponse:
+        """就绪检查，预热完成之前返回 503"""
+        return JSONResponse(
+            {"ready": self.ready, "warmup": self.report},
+            status_code=200 if self.ready else 503,
+        )
+
+    def metrics(self) -> dict:
+        """获取预热结果"""
+        return {"ready": self.ready, **self.report}
@@ -8,11 +8,23 @@
 
 import datetime
 import decimal
+import enum
 import json
+import uuid
+
+from .serializer import EXACT_TYPE_CONVERTERS, default_serializer
+
+try:
+    import orjson
+except ImportError:  # 未安装时只能使用标准库
+    orjson = None
 
 
 class CJsonEncoder(json.JSONEncoder):
-    """自定义 JSON 编码器，支持对 datetime、date、decimal 和 bytes 类型进行编码"""
+    """
+    自定义 JSON 编码器，支持对 datetime、date、decimal、bytes、UUID 和枚举类型进行编码
+    UUID 转为字符串、枚举转为值，与 orjson 内置的转换结果一致
+    """
 
     def default(self, obj):
         """
@@ -24,6 +36,10 @@ class CJsonEncoder(json.JSONEncoder):
         Returns:
             序列化后的对象表示。
         """
+        converter = EXACT_TYPE_CONVERTERS.get(type(obj))
+        if converter is not None:
+            return converter(obj)
+        # 子类及类字典对象
         if hasattr(obj, "keys") and hasattr(obj, "__getitem__"):
             return dict(obj)
         if isinstance(obj, datetime.datetime):
@@ -34,9 +50,192 @@ class CJsonEncoder(json.JSONEncoder):
             return float(obj)
         if isinstance(obj, bytes):
             return str(obj, encoding="utf-8")
+        if isinstance(obj, uuid.UUID):
+            return str(obj)
+        if isinstance(obj, enum.Enum):
+            return obj.value
         return super().default(obj)
 
 
+# 无状态的编码器，供 orjson 的 default 复用
+_encoder = CJsonEncoder()
+
+
+def _has_non_finite(data) -> bool:
+    """
+    检查数据中是否有 NaN、Infinity，orjson 会把它们输出为 null，需要交给标准库处理。
+    只遍历字典、列表和元组，Decimal 及类字典对象按 CJsonEncoder 的转换检查
+    """
+    stack = [data]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        obj = pop()
+        obj_type = type(obj)
+        if obj_type is dict:
+            extend(obj.values())
+        elif obj_type is list or obj_type is tuple:
+            extend(obj)
+        elif obj_type is float:
+            # NaN 和 Infinity 减去自身不等于 0
+            if obj - obj != 0.0:
+                return True
+        elif obj_type in (str, int, bool, type(None)):
+            continue
+        elif isinstance(obj, float | decimal.Decimal):
+            if not decimal.Decimal(obj).is_finite():
+                return True
+        elif isinstance(obj, dict | list | tuple):
+            extend(obj.values() if isinstance(obj, dict) else obj)
+        elif hasattr(obj, "keys") and hasattr(obj, "__getitem__"):
+            extend(dict(obj).values())
+    return False
+
+
+class StdJsonBackend:
+    """标准库 json 的实现"""
+
+    name = "json"
+
+    def dumps(self, data, ensure_ascii: bool = True, indent: int | None = None) -> str:
+        """
+        序列化为 JSON 字符串。
+
+        Args:
+            data: 要序列化的数据。
+            ensure_ascii (bool): 是否把非 ASCII 字符转义。
+            indent (int | None): 缩进的空格数，为空时不格式化。
+
+        Returns:
+            str: JSON 字符串。
+        """
+        return json.dumps(
+            data, cls=CJsonEncoder, ensure_ascii=ensure_ascii, indent=indent
+        )
+
+    def dumps_bytes(self, data) -> bytes:
+        """序列化为紧凑的 UTF-8 字节，与 JSONResponse 的输出格式一致，用于响应"""
+        return json.dumps(
+            data,
+            cls=CJsonEncoder,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def loads(self, data):
+        """解析 JSON 字符串或字节"""
+        return json.loads(data)
+
+
+# 数字都替换为 0 之后查找连续的19个 0，比正则表达式逐个位置匹配快得多
+_DIGITS_TO_ZERO = bytes.maketrans(b"123456789", b"000000000")
+_LONG_DIGITS = b"0" * 19
+
+
+def _has_long_digits(data: str | bytes | bytearray) -> bool:
+    """
+    检查 JSON 文本中是否有19位以上的数字，orjson 会把超过64位的整数解析为浮点数。
+    数字在字符串或小数中时也会返回 True，交给标准库解析不影响结果
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8", "surrogatepass")
+    return _LONG_DIGITS in data.translate(_DIGITS_TO_ZERO)
+
+
+class OrjsonBackend(StdJsonBackend):
+    """
+    orjson 的实现，与标准库的实现接受相同的数据、抛出相同的异常，解析结果相同：
+    - datetime、date、Decimal、bytes、UUID、枚举使用 CJsonEncoder 相同的转换
+    - 需要缩进、需要转义的非 ASCII 字符、非字符串的 key、超过64位的整数等交给标准库处理，
+      解析时有19位以上的数字也交给标准库，保证大整数不会变成浮点数
+    - 包含 NaN、Infinity 时交给标准库（dumps 输出 NaN，dumps_bytes 抛出 ValueError），
+      只在输出中有 null 时才检查，不影响没有空值的数据
+    输出的文本格式与标准库不同：dumps 也是紧凑格式（{"a":1}，标准库为 {"a": 1}），
+    浮点数的指数写法不同（1.5e-7，标准库为 1.5e-07）
+    """
+
+    name = "orjson"
+
+    # 日期和 dataclass 交给 default 处理；非字符串的 key 由 orjson 抛出 TypeError，交给标准库
+    OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if orjson is not None
+        else 0
+    )
+
+    def _dumps(self, data) -> bytes | None:
+        """使用 orjson 序列化，需要交给标准库处理时返回 None"""
+        try:
+            result = orjson.dumps(data, default=_encoder.default, option=self.OPTIONS)
+        except TypeError:
+            return None
+        if b"null" in result and _has_non_finite(data):
+            return None
+        return result
+
+    def dumps(self, data, ensure_ascii: bool = True, indent: int | None = None) -> str:
+        """序列化为 JSON 字符串"""
+        if indent is None:
+            result = self._dumps(data)
+            if result is not None:
+                result = result.decode("utf-8")
+                if not ensure_ascii or result.isascii():
+                    return result
+        return super().dumps(data, ensure_ascii=ensure_ascii, indent=indent)
+
+    def dumps_bytes(self, data) -> bytes:
+        """序列化为紧凑的 UTF-8 字节，用于响应"""
+        result = self._dumps(data)
+        if result is None:
+            return super().dumps_bytes(data)
+        return result
+
+    def loads(self, data):
+        """解析 JSON 字符串或字节，NaN 等 orjson 不支持的内容交给标准库"""
+        if not isinstance(data, str | bytes | bytearray) or _has_long_digits(data):
+            # 标准库不支持的类型由标准库抛出 TypeError；orjson 把超过64位的整数解析为浮点数
+            return super().loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().loads(data)
+
+
+# 可以使用的实现
+JSON_BACKENDS = {"json": StdJsonBackend}
+if orjson is not None:
+    JSON_BACKENDS["orjson"] = OrjsonBackend
+
+_backend: StdJsonBackend = StdJsonBackend()
+
+
+def set_json_backend(name: str = "auto") -> StdJsonBackend:
+    """
+    设置 JSON 的实现。
+
+    Args:
+        name (str): json | orjson | auto，auto 在安装了 orjson 时使用 orjson。
+
+    Returns:
+        StdJsonBackend: 当前使用的实现。
+    """
+    global _backend
+    if name == "auto":
+        name = "orjson" if "orjson" in JSON_BACKENDS else "json"
+    if name not in JSON_BACKENDS:
+        raise ValueError(
+            f"JSON backend '{name}' is not available: {list(JSON_BACKENDS)}"
+        )
+    _backend = JSON_BACKENDS[name]()
+    return _backend
+
+
+def get_json_backend() -> StdJsonBackend:
+    """获取当前使用的 JSON 实现"""
+    return _backend
+
+
 def dict_to_json(data=None):
     """
     将字典转换为 JSON 字符串。
@@ -48,7 +247,7 @@ def dict_to_json(data=None):
         str: JSON 字符串。
     """
     data = {} if data is None else data
-    return json.dumps(data, cls=CJsonEncoder)
+    return _backend.dumps(data)
 
 
 def dict_to_json_ensure_ascii(data=None, ensure_ascii=False):
@@ -63,7 +262,7 @@ def dict_to_json_ensure_ascii(data=None, ensure_ascii=False):
         str: JSON 字符串。
     """
     data = {} if data is None else data
-    return json.dumps(data, cls=CJsonEncoder, ensure_ascii=ensure_ascii)
+    return _backend.dumps(data, ensure_ascii=ensure_ascii)
 
 
 def dict_to_json_ensure_ascii_indent(data=None, ensure_ascii=False):
@@ -78,7 +277,7 @@ def dict_to_json_ensure_ascii_indent(data=None, ensure_ascii=False):
         str: JSON 字符串。
     """
     data = {} if data is None else data
-    return json.dumps(data, cls=CJsonEncoder, ensure_ascii=ensure_ascii, indent=4)
+    return _backend.dumps(data, ensure_ascii=ensure_ascii, indent=4)
 
 
 def json_to_dict(json_msg):
@@ -91,7 +290,7 @@ def json_to_dict(json_msg):
     Returns:
         dict: 解析后的字典。
     """
-    return json.loads(json_msg)
+    return _backend.loads(json_msg)
 
 
 def obj_to_json(obj, ensure_ascii=False):
@@ -106,15 +305,17 @@ def obj_to_json(obj, ensure_ascii=False):
         str: JSON 字符串。
     """
     data = obj.__dict__
-    return json.dumps(data, cls=CJsonEncoder, ensure_ascii=ensure_ascii, indent=4)
+    return _backend.dumps(data, ensure_ascii=ensure_ascii, indent=4)
 
 
 def class_to_dict(obj):
     """
     将类实例转换为字典。
+    使用按类型缓存转换计划的 ObjectSerializer，支持 __slots__、dataclass 及 pydantic 模型，
+    存在循环引用时抛出 CircularReferenceError
 
     Args:
-        obj: 类实例。
+        obj: 类实例，或类实例的列表、集合。
 
     Returns:
         dict: 转换后的字典。
@@ -122,20 +323,4 @@ def class_to_dict(obj):
     if not obj:
         return None
 
-    if isinstance(obj, list | set):
-        return [class_to_dict(item) for item in obj]
-
-    result = {}
-    for key, value in obj.__dict__.items():
-        if isinstance(
-            value, datetime.datetime | datetime.date | decimal.Decimal | bytes
-        ):
-            result[key] = CJsonEncoder().default(value)
-        elif isinstance(value, list | set):
-            result[key] = [class_to_dict(item) for item in value]
-        elif hasattr(value, "__dict__"):
-            result[key] = class_to_dict(value)
-        else:
-            result[key] = value
-
-    return result
+    return default_serializer.to_dict(obj)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   precompressed.py
+@Time    :   2026/10/19 18:32:14
+@Desc    :   预压缩的响应内容，按 Accept-Encoding 协商编码并支持 ETag
+"""
+
+import gzip
+import hashlib
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import zstandard
+except ImportError:  # 未安装时不提供 zstd
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # 未安装时不提供 br
+    brotli = None
+
+# 服务端优先使用的编码顺序
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+
+
+def available_encodings() -> tuple[str, ...]:
+    """当前环境可以压缩的编码"""
+    return tuple(
+        encoding
+        for encoding, module in (("zstd", zstandard), ("br", brotli), ("gzip", gzip))
+        if module is not None
+    )
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    使用指定编码压缩内容。
+
+    Args:
+        data (bytes): 原始内容。
+        encoding (str): 编码 gzip | zstd | br。
+
+    Returns:
+        bytes: 压缩后的内容。
+    """
+    if encoding == "gzip":
+        # 固定 mtime，相同内容的压缩结果不变
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def negotiate_encoding(accept_encoding: str, available) -> str | None:
+    """
+    根据请求头 Accept-Encoding 选择编码。
+
+    Args:
+        accept_encoding (str): 请求头 Accept-Encoding 的内容。
+        available: 可以使用的编码。
+
+    Returns:
+        str | None: 选中的编码，客户端不接受任何可用编码时返回None（使用原始内容）。
+    """
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip()] = quality
+    wildcard = weights.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding not in available:
+            continue
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encoding_etag(etag: str, encoding: str | None) -> str:
+    """
+    生成指定编码的 ETag，不同编码的内容字节不同，需要使用不同的强 ETag。
+
+    Args:
+        etag (str): 原始内容的 ETag，如 "<hash>"。
+        encoding (str | None): 编码，None 表示原始内容。
+
+    Returns:
+        str: 编码对应的 ETag，如 "<hash>-gzip"。
+    """
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """检查请求头 If-None-Match 是否包含原始内容或任一编码的 ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etags = {etag, *(encoding_etag(etag, e) for e in ENCODING_PREFERENCE)}
+    return any(
+        tag.strip().removeprefix("W/") in etags for tag in if_none_match.split(",")
+    )
+
+
+class PrecompressedBody:
+    """
+    预先压缩好的响应内容，请求时只需按编码选择对应的字节，每个编码使用各自的 ETag
+    用法示例：
+    body = PrecompressedBody(html.encode(), media_type="text/html; charset=utf-8")
+
+    async def handler(request: Request):
+        return body.response(request)
+    """
+
+    __slots__ = ("media_type", "etag", "cache_control", "bodies")
+
+    def __init__(
+        self,
+        content: bytes,
+        media_type: str,
+        cache_control: str = "no-cache",
+        encodings=None,
+    ) -> None:
+        """
+        压缩内容。
+
+        Args:
+            content (bytes): 原始内容。
+            media_type (str): 响应的 Content-Type。
+            cache_control (str): 响应的 Cache-Control，默认每次使用 ETag 验证。
+            encodings: 需要预先压缩的编码，默认当前环境可用的全部编码。
+        """
+        self.media_type = media_type
+        self.etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+        self.cache_control = cache_control
+        self.bodies: dict[str | None, bytes] = {None: content}
+        for encoding in encodings or available_encodings():
+            compressed = compress(content, encoding)
+            # 压缩后更大的内容没有意义
+            if len(compressed) < len(content):
+                self.bodies[encoding] = compressed
+
+    def response(self, request: Request) -> Response:
+        """
+        生成响应，ETag 未变化时返回304。
+
+        Args:
+            request (Request): 请求对象。
+
+        Returns:
+            Response: 选择了编码的响应。
+        """
+        encoding = negotiate_encoding(
+            request.headers.get("accept-encoding", ""), self.bodies
+        )
+        headers = {
+            "etag": encoding_etag(self.etag, encoding),
+            "cache-control": self.cache_control,
+            "vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match", ""), self.etag):
+            return Response(status_code=304, headers=headers)
+        if encoding is not None:
+            headers["content-encoding"] = encoding
+        return Response(
+            self.bodies[encoding], media_type=self.media_type, headers=headers
+        )
@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   prefork.py
+@Time    :   2026/10/19 20:52:18
+@Desc    :   预先创建应用再 fork 多个 worker 的启动器，worker 之间以写时复制的方式共享内存
+"""
+
+import gc
+import os
+import random
+import signal
+import socket
+import time
+
+import uvicorn
+from fastapi import FastAPI
+from pydantic_settings import BaseSettings as Settings
+
+from core.plugins.loguru import logger
+
+
+def process_memory_mb(pid: int) -> float | None:
+    """
+    获取进程独占的内存（MB），与父进程共享的写时复制页不计入，非 Linux 系统返回 None。
+
+    Args:
+        pid (int): 进程ID。
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            private_kb = sum(
+                int(line.split()[1])
+                for line in file
+                if line.startswith(("Private_Clean:", "Private_Dirty:"))
+            )
+        return private_kb / 1024
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class _WorkerServer(uvicorn.Server):
+    """处理的请求数达到上限时通知父进程，由父进程启动替代的 worker 之后再通知退出"""
+
+    def __init__(
+        self, config: uvicorn.Config, max_requests: int | None, notify_fd: int | None
+    ) -> None:
+        super().__init__(config)
+        self.max_requests = max_requests
+        self.notify_fd = notify_fd
+        self.recycle_requested = False
+
+    async def on_tick(self, counter: int) -> bool:
+        if (
+            not self.recycle_requested
+            and self.max_requests is not None
+            and self.server_state.total_requests >= self.max_requests
+        ):
+            self.recycle_requested = True
+            os.write(self.notify_fd, f"{os.getpid()}\n".encode())
+        return await super().on_tick(counter)
+
+
+class PreforkServer:
+    """
+    预先 fork 的多进程启动器
+    - 父进程中创建并预热应用，执行 gc.freeze() 之后再 fork，worker 共享已加载的模块和对象
+    - 支持 SO_REUSEPORT（每个 worker 独立监听，由内核分配连接）或父进程创建的共享 socket
+    - worker 处理的请求数或独占内存超过上限时，由父进程先启动新的 worker 再让旧的 worker 优雅退出，
+      请求数达到上限的 worker 通过管道通知父进程，在被替换之前继续处理请求
+    插件的启动和关闭跟随每个 worker 的 lifespan 执行，数据库连接等不会在进程之间共享
+    用法示例：
+    PreforkServer.from_settings(app, settings).run()
+    """
+
+    class PreforkConfig(Settings):
+        """默认配置"""
+
+        HOST: str = "127.0.0.1"
+        PORT: int = 8000
+        # worker 数量，为 0 时使用 CPU 核数
+        WORKERS: int = 0
+        # 是否使用 SO_REUSEPORT，系统不支持时使用共享的 socket
+        REUSE_PORT: bool = True
+        BACKLOG: int = 2048
+        # 每个 worker 处理的请求数上限及随机增加的数量（避免同时重启），为 0 时不限制
+        MAX_REQUESTS: int = 0
+        MAX_REQUESTS_JITTER: int = 0
+        # 每个 worker 独占内存的上限（MB），为 0 时不限制
+        MAX_MEMORY_MB: int = 0
+        # 检查 worker 状态的间隔（秒）
+        CHECK_INTERVAL: float = 1
+        # worker 优雅退出的等待时间（秒），超时后强制结束
+        GRACEFUL_TIMEOUT: float = 30
+
+    def __init__(self, app: FastAPI, settings: PreforkConfig | None = None) -> None:
+        """
+        创建启动器。
+
+        Args:
+            app (FastAPI): 已创建好的应用。
+            settings (PreforkConfig | None): 启动配置。
+        """
+        self.app = app
+        self.settings = settings or self.PreforkConfig()
+        self.workers: dict[int, float] = {}  # pid -> 启动时间
+        # 已通知退出、等待回收的 worker
+        self.retiring: set[int] = set()
+        # worker 请求数达到上限时写入进程ID的管道 (读, 写)，未限制请求数时为 None
+        self.recycle_pipe: tuple[int, int] | None = None
+        self.sockets: list[socket.socket] = []
+        self.reuse_port = self.settings.REUSE_PORT and hasattr(socket, "SO_REUSEPORT")
+        self._running = False
+
+    @classmethod
+    def from_settings(cls, app: FastAPI, settings) -> "PreforkServer":
+        """根据应用配置创建启动器"""
+        return cls(
+            app=app,
+            settings=cls.PreforkConfig(
+                HOST=settings.prefork_host,
+                PORT=settings.prefork_port,
+                WORKERS=settings.prefork_workers,
+                REUSE_PORT=settings.prefork_reuse_port,
+                BACKLOG=settings.prefork_backlog,
+                MAX_REQUESTS=settings.prefork_max_requests,
+                MAX_REQUESTS_JITTER=settings.prefork_max_requests_jitter,
+                MAX_MEMORY_MB=settings.prefork_max_memory_mb,
+                CHECK_INTERVAL=settings.prefork_check_interval,
+                GRACEFUL_TIMEOUT=settings.prefork_graceful_timeout,
+            ),
+        )
+
+    @property
+    def worker_count(self) -> int:
+        """Worker 数量，未配置时使用 CPU 核数"""
+        return self.settings.WORKERS or os.cpu_count() or 1
+
+    def warm_up(self) -> None:
+        """
+        在父进程中生成 worker 都会用到的对象，fork 之后直接共享：
+        中间件栈、openapi 文档及各插件 prebuild 的结果（如压缩的静态文件和文档、日志的路由策略表）。
+        插件的 startup 需要事件循环和 worker 自己的连接，仍在每个 worker 中执行，
+        路由预热插件的预热请求依赖已启动的插件，也在每个 worker 中执行
+        """
+        # 中间件栈在第一次请求时才创建
+        if self.app.middleware_stack is None:
+            self.app.middleware_stack = self.app.build_middleware_stack()
+        self.app.openapi()
+        for plugin in getattr(self.app.state, "plugins", {}).values():
+            plugin.prebuild()
+
+    def create_socket(self, listen: bool = True) -> socket.socket:
+        """
+        创建 socket。
+
+        Args:
+            listen (bool): 是否开始监听，SO_REUSEPORT 模式下父进程只绑定端口，不参与分配连接。
+        """
+        sock = socket.socket(
+            socket.AF_INET6 if ":" in self.settings.HOST else socket.AF_INET
+        )
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.settings.HOST, self.settings.PORT))
+        if listen:
+            sock.listen(self.settings.BACKLOG)
+        sock.set_inheritable(True)
+        return sock
+
+    def spawn_worker(self) -> int:
+        """Fork 一个 worker，返回进程ID"""
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = time.monotonic()
+            return pid
+        # 子进程
+        exit_code = 0
+        try:
+            self.run_worker()
+        except BaseException as e:  # noqa: BLE001
+            logger.info(f"[Prefork] worker {os.getpid()} failed: {e}")
+            exit_code = 1
+        finally:
+            # 不执行父进程注册的退出处理
+            os._exit(exit_code)
+
+    def run_worker(self) -> None:
+        """在 worker 进程中运行 uvicorn"""
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        if self.reuse_port:
+            # 父进程的 socket 只用于占用端口，worker 各自监听
+            for sock in self.sockets:
+                sock.close()
+            sockets = [self.create_socket()]
+        else:
+            sockets = self.sockets
+        max_requests, notify_fd = None, None
+        if self.recycle_pipe is not None:
+            os.close(self.recycle_pipe[0])
+            notify_fd = self.recycle_pipe[1]
+            max_requests = self.settings.MAX_REQUESTS + random.randint(
+                0, self.settings.MAX_REQUESTS_JITTER
+            )
+        config = uvicorn.Config(
+            self.app,
+            log_config=None,
+            lifespan="on",
+            timeout_graceful_shutdown=self.settings.GRACEFUL_TIMEOUT,
+        )
+        _WorkerServer(config, max_requests, notify_fd).run(sockets=sockets)
+
+    def stop_worker(self, pid: int, sig: int = signal.SIGTERM) -> None:
+        """通知 worker 退出"""
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+
+    def reap_workers(self) -> None:
+        """回收已退出的 worker，并补充新的 worker"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            self.retiring.discard(pid)
+            if self.workers.pop(pid, None) is not None and self._running:
+                logger.info(
+                    f"[Prefork] worker {pid} exited with code "
+                    f"{os.waitstatus_to_exitcode(status)}, respawning"
+                )
+        while self._running and len(self.workers) < self.worker_count:
+            self.spawn_worker()
+
+    def recycle_worker(self, pid: int, reason: str) -> None:
+        """先启动替代的 worker，再通知旧的 worker 优雅退出"""
+        logger.info(f"[Prefork] worker {pid} {reason}, recycling")
+        self.workers.pop(pid)
+        self.retiring.add(pid)
+        self.spawn_worker()
+        self.stop_worker(pid)
+
+    def check_requests(self) -> None:
+        """替换处理的请求数达到上限的 worker"""
+        if self.recycle_pipe is None:
+            return
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self.recycle_pipe[0], 4096)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+        for pid in map(int, data.split()):
+            # 已经因为内存超过上限被替换的 worker 不再处理
+            if pid in self.workers:
+                self.recycle_worker(pid, "reached the request limit")
+
+    def check_memory(self) -> None:
+        """替换独占内存超过上限的 worker"""
+        limit = self.settings.MAX_MEMORY_MB
+        if not limit:
+            return
+        for pid in list(self.workers):
+            memory_mb = process_memory_mb(pid)
+            if memory_mb is not None and memory_mb > limit:
+                self.recycle_worker(pid, f"uses {memory_mb:.1f}MB > {limit}MB")
+
+    def handle_exit(self, signum, frame) -> None:
+        """父进程收到退出信号"""
+        self._running = False
+
+    def shutdown(self) -> None:
+        """通知所有 worker 退出，超时后强制结束"""
+        for pid in list(self.workers):
+            self.stop_worker(pid)
+        pending = set(self.workers) | self.retiring
+        deadline = time.monotonic() + self.settings.GRACEFUL_TIMEOUT
+        while pending and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                pending.discard(pid)
+            else:
+                time.sleep(0.1)
+        for pid in pending:
+            self.stop_worker(pid, signal.SIGKILL)
+        self.workers.clear()
+        self.retiring.clear()
+        for sock in self.sockets:
+            sock.close()
+        if self.recycle_pipe is not None:
+            for fd in self.recycle_pipe:
+                os.close(fd)
+            self.recycle_pipe = None
+
+    def run(self) -> None:
+        """启动并管理 worker，直到收到 SIGTERM 或 SIGINT"""
+        self.warm_up()
+        self.sockets = [self.create_socket(listen=not self.reuse_port)]
+        if self.settings.MAX_REQUESTS:
+            self.recycle_pipe = os.pipe()
+            os.set_blocking(self.recycle_pipe[0], False)
+        # 之后不会再改变的对象移出垃圾回收的扫描范围，worker 回收垃圾时不会写这些对象所在的内存页
+        gc.collect()
+        gc.freeze()
+        self._running = True
+        signal.signal(signal.SIGTERM, self.handle_exit)
+        signal.signal(signal.SIGINT, self.handle_exit)
+        logger.info(
+            f"[Prefork] listening on {self.settings.HOST}:{self.settings.PORT} with "
+            f"{self.worker_count} workers ({'SO_REUSEPORT' if self.reuse_port else 'shared socket'})"
+        )
+        for _ in range(self.worker_count):
+            self.spawn_worker()
+        try:
+            while self._running:
+                self.reap_workers()
+                self.check_requests()
+                self.check_memory()
+                time.sleep(self.settings.CHECK_INTERVAL)
+        finally:
+            self._running = False
+            self.shutdown()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   radix_router.py
+@Time    :   2026/10/19 18:10:37
+@Desc    :   基数树路由匹配
+"""
+
+import re
+from re import Pattern
+
+from fastapi import FastAPI
+from starlette.convertors import CONVERTOR_TYPES
+from starlette.datastructures import URL
+from starlette.responses import RedirectResponse
+from starlette.routing import (
+    BaseRoute,
+    Match,
+    Route,
+    Router,
+    WebSocketRoute,
+    get_route_path,
+)
+from starlette.types import Receive, Scope, Send
+
+# 整段为路径参数的片段，如 {user_id} 或 {user_id:int}
+PARAM_SEGMENT = re.compile(
+    r"\{([a-zA-Z_][a-zA-Z0-9_]*)(?::([a-zA-Z_][a-zA-Z0-9_]*))?\}"
+)
+# 可以放入基数树的参数类型，path 等可能跨越多段的参数只能逐个匹配
+SEGMENT_CONVERTORS = ("int", "float", "uuid", "str")
+
+
+class TrackedRoutes(list):
+    """记录修改次数的路由列表，路由变化后重新构建基数树"""
+
+    version = 0
+
+    def _changed(self) -> None:
+        self.version += 1
+
+    def append(self, route) -> None:
+        """添加路由"""
+        super().append(route)
+        self._changed()
+
+    def extend(self, routes) -> None:
+        """批量添加路由"""
+        super().extend(routes)
+        self._changed()
+
+    def insert(self, index, route) -> None:
+        """插入路由"""
+        super().insert(index, route)
+        self._changed()
+
+    def remove(self, route) -> None:
+        """删除路由"""
+        super().remove(route)
+        self._changed()
+
+    def pop(self, index=-1):
+        """删除并返回路由"""
+        route = super().pop(index)
+        self._changed()
+        return route
+
+    def clear(self) -> None:
+        """清空路由"""
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs) -> None:
+        """路由排序"""
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self) -> None:
+        """路由倒序"""
+        super().reverse()
+        self._changed()
+
+    def __setitem__(self, index, route) -> None:
+        """替换路由"""
+        super().__setitem__(index, route)
+        self._changed()
+
+    def __delitem__(self, index) -> None:
+        """删除路由"""
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, routes):
+        """批量添加路由"""
+        result = super().__iadd__(routes)
+        self._changed()
+        return result
+
+
+class RadixNode:
+    """基数树的节点，一个节点对应路径中的一段"""
+
+    __slots__ = ("static", "params", "routes")
+
+    def __init__(self) -> None:
+        # 静态片段的子节点
+        self.static: dict[str, RadixNode] = {}
+        # 参数片段的子节点 (参数类型, 参数正则, 子节点)
+        self.params: list[tuple[str, Pattern, RadixNode]] = []
+        # 在此节点结束的路由序号
+        self.routes: list[int] = []
+
+    def param_child(self, convertor: str) -> "RadixNode":
+        """获取或创建参数类型对应的子节点"""
+        for name, _, child in self.params:
+            if name == convertor:
+                return child
+        child = RadixNode()
+        self.params.append(
+            (convertor, re.compile(CONVERTOR_TYPES[convertor].regex), child)
+        )
+        # 类型更严格的参数排在前面，str 最后
+        self.params.sort(key=lambda item: SEGMENT_CONVERTORS.index(item[0]))
+        return child
+
+
+class RadixRouteIndex:
+    """
+    把路由按路径片段编译为基数树，查找时只返回可能匹配的路由
+    树只用于筛选候选路由，候选路由仍按注册顺序调用 route.matches，匹配结果与逐个匹配完全一致
+    """
+
+    def __init__(self, routes: list[BaseRoute]) -> None:
+        """
+        构建基数树。
+
+        Args:
+            routes (list[BaseRoute]): 路由列表。
+        """
+        self.root = RadixNode()
+        self.size = len(routes)
+        # 无法放入树中的路由（Mount、自定义路由、path 参数等），每次查找都是候选
+        self.fallback: list[int] = []
+        for index, route in enumerate(routes):
+            segments = self.split(route)
+            if segments is None:
+                self.fallback.append(index)
+                continue
+            node = self.root
+            for kind, value in segments:
+                if kind == "static":
+                    node = node.static.setdefault(value, RadixNode())
+                else:
+                    node = node.param_child(value)
+            node.routes.append(index)
+
+    @staticmethod
+    def split(route: BaseRoute) -> list[tuple[str, str]] | None:
+        """把路由路径拆分为片段，无法放入树中时返回None"""
+        if not isinstance(route, Route | WebSocketRoute):
+            return None
+        segments = []
+        for part in route.path.split("/")[1:]:
+            if "{" not in part:
+                segments.append(("static", part))
+                continue
+            matched = PARAM_SEGMENT.fullmatch(part)
+            convertor = matched and (matched.group(2) or "str")
+            if convertor not in SEGMENT_CONVERTORS:
+                return None
+            segments.append(("param", convertor))
+        return segments
+
+    def lookup(self, path: str) -> list[int]:
+        """
+        查找可能匹配路径的路由。
+
+        Args:
+            path (str): 请求路径。
+
+        Returns:
+            list[int]: 按注册顺序排列的候选路由序号。
+        """
+        if path.endswith("\n"):
+            # 路由正则的 $ 可以匹配结尾的换行符，这种路径直接逐个匹配
+            return list(range(self.size))
+        if not path.startswith("/"):
+            return list(self.fallback)
+        found = list(self.fallback)
+        segments = path.split("/")[1:]
+        last = len(segments)
+        # 深度优先遍历，静态片段优先
+        stack = [(self.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth == last:
+                found.extend(node.routes)
+                continue
+            segment = segments[depth]
+            for _, pattern, child in node.params:
+                if pattern.fullmatch(segment):
+                    stack.append((child, depth + 1))
+            child = node.static.get(segment)
+            if child is not None:
+                stack.append((child, depth + 1))
+        if len(found) > 1:
+            found.sort()
+        return found
+
+
+class RadixDispatcher:
+    """
+    使用基数树分发请求的路由入口，替换 Router 的匹配过程
+    匹配、405 处理及末尾斜杠重定向与 starlette 的 Router.app 保持一致
+    """
+
+    def __init__(self, router: Router) -> None:
+        """
+        创建分发器。
+
+        Args:
+            router (Router): 应用的路由。
+        """
+        if not isinstance(router.routes, TrackedRoutes):
+            router.routes = TrackedRoutes(router.routes)
+        self.router = router
+        self.index: RadixRouteIndex | None = None
+        self.version = -1
+
+    def candidates(self, path: str) -> list[BaseRoute]:
+        """获取可能匹配路径的路由，路由变化后重新构建基数树"""
+        routes = self.router.routes
+        if not isinstance(routes, TrackedRoutes):
+            # 路由列表被整个替换（如 app.router.routes = [...]），重新包装后再记录修改
+            routes = self.router.routes = TrackedRoutes(routes)
+            self.index = None
+        if self.index is None or self.version != routes.version:
+            self.index = RadixRouteIndex(routes)
+            self.version = routes.version
+        return [routes[index] for index in self.index.lookup(path)]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """分发请求"""
+        router = self.router
+        if scope["type"] == "lifespan":
+            await router.app(scope, receive, send)
+            return
+        if "router" not in scope:
+            scope["router"] = router
+
+        route_path = get_route_path(scope)
+        partial = None
+        for route in self.candidates(route_path):
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                scope.update(child_scope)
+                await route.handle(scope, receive, send)
+                return
+            elif match == Match.PARTIAL and partial is None:
+                partial = route
+                partial_scope = child_scope
+
+        if partial is not None:
+            scope.update(partial_scope)
+            await partial.handle(scope, receive, send)
+            return
+
+        if scope["type"] == "http" and router.redirect_slashes and route_path != "/":
+            redirect_scope = dict(scope)
+            if route_path.endswith("/"):
+                redirect_scope["path"] = redirect_scope["path"].rstrip("/")
+            else:
+                redirect_scope["path"] = redirect_scope["path"] + "/"
+
+            for route in self.candidates(get_route_path(redirect_scope)):
+                match, _ = route.matches(redirect_scope)
+                if match != Match.NONE:
+                    response = RedirectResponse(url=str(URL(scope=redirect_scope)))
+                    await response(scope, receive, send)
+                    return
+
+        await router.default(scope, receive, send)
+
+
+def install_radix_router(app: FastAPI) -> RadixDispatcher:
+    """
+    应用使用基数树匹配路由，之后添加或删除的路由也会生效。
+
+    Args:
+        app (FastAPI): 应用实例。
+
+    Returns:
+        RadixDispatcher: 路由分发器。
+    """
+    if app.router.middleware_stack != app.router.app:
+        # 路由自身带有中间件时无法替换匹配过程
+        raise RuntimeError("Router with middleware is not supported by radix router")
+    dispatcher = RadixDispatcher(app.router)
+    # Router.__call__ 通过 middleware_stack 进入匹配过程
+    app.router.middleware_stack = dispatcher
+    return dispatcher
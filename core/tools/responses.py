@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   responses.py
+@Time    :   2026/10/19 19:21:40
+@Desc    :   使用 json_helper 当前 JSON 实现的响应类
+"""
+
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator, Mapping
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from .json_helper import get_json_backend
+from .serializer import default_serializer
+
+# 流式响应每个分块的目标字节数
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON 响应，序列化使用 json_helper 当前的实现（安装了 orjson 时使用 orjson）
+    输出与 JSONResponse 相同的紧凑 UTF-8 格式，可作为应用的 default_response_class
+    """
+
+    def render(self, content: Any) -> bytes:
+        """序列化响应内容"""
+        return get_json_backend().dumps_bytes(content)
+
+
+class StreamingJSONResponse(StreamingResponse):
+    """
+    流式 JSON 数组响应，逐个编码可迭代对象中的元素，按 chunk_size 攒成分块发送
+    - 支持同步和异步的迭代器，同步迭代器每次在线程池中生成一个分块，不阻塞事件循环
+    - 每个分块在 send 完成（客户端读取跟不上时服务器会暂停写入）之后才生成下一个，
+      内存中最多只有一个分块，与结果的总大小无关
+    - 字典直接序列化，其他对象先使用 default_serializer 转换
+    - 客户端断开时关闭迭代器，生成器中的数据库游标等资源可以在 finally 中释放
+    用法示例：
+    return StreamingJSONResponse(service.iter_users())
+    """
+
+    media_type = "application/json"
+    # 空结果的内容及结束时追加的内容
+    empty = b"[]"
+    end = b"]"
+
+    def __init__(
+        self,
+        content: Iterable[Any] | AsyncIterable[Any],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+    ) -> None:
+        """
+        创建流式响应。
+
+        Args:
+            content (Iterable | AsyncIterable): 元素的迭代器。
+            chunk_size (int): 每个分块的目标字节数。
+            status_code (int): 状态码。
+            headers (Mapping[str, str] | None): 响应头。
+            media_type (str | None): 响应类型。
+            background (BackgroundTask | None): 响应发送完成之后执行的任务。
+        """
+        self.chunk_size = chunk_size
+        super().__init__(
+            self.iter_chunks(content),
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            background=background,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """发送响应，客户端断开时 body_iterator 停在 yield 处，需要主动关闭"""
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+
+    def join(self, parts: list[bytes], first: bool) -> bytes:
+        """把一批编码后的元素拼接为一个分块"""
+        return (b"[" if first else b",") + b",".join(parts)
+
+    def _fill(self, iterator: Iterator[Any], dumps) -> tuple[list[bytes], bool]:
+        """从同步迭代器中读取一个分块的元素，返回编码后的元素及迭代器是否结束"""
+        chunk_size, to_dict = self.chunk_size, default_serializer.to_dict
+        parts, size = [], 0
+        for item in iterator:
+            data = dumps(item if type(item) is dict else to_dict(item))
+            parts.append(data)
+            size += len(data)
+            if size >= chunk_size:
+                return parts, False
+        return parts, True
+
+    async def iter_chunks(
+        self, content: Iterable[Any] | AsyncIterable[Any]
+    ) -> AsyncIterator[bytes]:
+        """
+        逐个分块编码元素。
+
+        Args:
+            content (Iterable | AsyncIterable): 元素的迭代器。
+
+        Yields:
+            bytes: 分块的内容。
+        """
+        dumps = get_json_backend().dumps_bytes
+        first = True
+        if isinstance(content, AsyncIterable):
+            iterator = aiter(content)
+            try:
+                to_dict = default_serializer.to_dict
+                parts, size = [], 0
+                async for item in iterator:
+                    data = dumps(item if type(item) is dict else to_dict(item))
+                    parts.append(data)
+                    size += len(data)
+                    if size >= self.chunk_size:
+                        yield self.join(parts, first)
+                        first, parts, size = False, [], 0
+                if parts:
+                    yield self.join(parts, first)
+                    first = False
+            finally:
+                if hasattr(iterator, "aclose"):
+                    await iterator.aclose()
+        else:
+            iterator = iter(content)
+            try:
+                done = False
+                while not done:
+                    parts, done = await run_in_threadpool(self._fill, iterator, dumps)
+                    if parts:
+                        yield self.join(parts, first)
+                        first = False
+            finally:
+                if hasattr(iterator, "close"):
+                    iterator.close()
+        if first:
+            if self.empty:
+                yield self.empty
+        elif self.end:
+            yield self.end
+
+
+class StreamingNDJSONResponse(StreamingJSONResponse):
+    """流式 NDJSON 响应，每行一个元素，客户端可以边接收边逐行解析"""
+
+    media_type = "application/x-ndjson"
+    empty = b""
+    end = b""
+
+    def join(self, parts: list[bytes], first: bool) -> bytes:
+        """每个元素后面追加换行"""
+        parts.append(b"")
+        return b"\n".join(parts)
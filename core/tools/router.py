@@ -6,35 +6,258 @@
 @Desc    :
 """
 
+import asyncio
 import importlib
-from pathlib import Path
+import json
+import os
+import tempfile
+import zlib
+from time import perf_counter
 
-from fastapi import APIRouter
+from fastapi import APIRouter, FastAPI
 from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
 
+from core.libs.cachedir import user_cache_dir
 from core.plugins.loguru import logger
 
+# 清单文件的格式版本，格式变化时旧的清单自动失效
+MANIFEST_VERSION = 1
 
-def load_controller_modules(app_router: APIRouter, module_dir: str):
+
+class ControllerManifest:
+    """
+    控制器发现清单，缓存目录及 controller.py 的修改时间和路由前缀
+    目录和文件的修改时间都没有变化时跳过目录扫描，新增或删除文件会改变所在目录的修改时间
+    """
+
+    def __init__(self, path: str, module_dir: str) -> None:
+        """
+        加载清单。
+
+        Args:
+            path (str): 清单文件路径。
+            module_dir (str): 模块目录相对路径。
+        """
+        self.path = path
+        self.module_dir = module_dir
+        self.dirs: dict[str, int] = {}
+        # 模块路径: {"file": 文件路径, "mtime_ns": 修改时间, "prefix": 路由前缀}
+        self.modules: dict[str, dict] = {}
+        self.changed = False
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if (
+            data.get("version") == MANIFEST_VERSION
+            and data.get("module_dir") == module_dir
+        ):
+            self.dirs = data["dirs"]
+            self.modules = data["modules"]
+
+    def is_fresh(self) -> bool:
+        """检查清单是否仍然有效"""
+        if not self.dirs:
+            return False
+        try:
+            return all(
+                os.stat(directory).st_mtime_ns == mtime_ns
+                for directory, mtime_ns in self.dirs.items()
+            ) and all(
+                os.stat(entry["file"]).st_mtime_ns == entry["mtime_ns"]
+                for entry in self.modules.values()
+            )
+        except OSError:
+            return False
+
+    def scan(self) -> None:
+        """扫描目录下所有的 controller.py，已有模块的路由前缀在文件未修改时保留"""
+        dirs, modules = {}, {}
+        for root, dir_names, file_names in os.walk(self.module_dir):
+            dir_names[:] = sorted(name for name in dir_names if name != "__pycache__")
+            dirs[root] = os.stat(root).st_mtime_ns
+            # 只加载包含 controller.py 的模块
+            if "controller.py" not in file_names:
+                continue
+            file_path = os.path.join(root, "controller.py")
+            module_path = ".".join(
+                os.path.normpath(os.path.join(root, "controller")).split(os.sep)
+            )
+            mtime_ns = os.stat(file_path).st_mtime_ns
+            entry = {"file": file_path, "mtime_ns": mtime_ns, "prefix": None}
+            cached = self.modules.get(module_path)
+            if cached and cached["mtime_ns"] == mtime_ns:
+                entry["prefix"] = cached["prefix"]
+            modules[module_path] = entry
+        self.dirs, self.modules = dirs, modules
+        self.changed = True
+
+    def set_prefix(self, module_path: str, prefix: str) -> None:
+        """记录模块的路由前缀"""
+        entry = self.modules[module_path]
+        if entry["prefix"] != prefix:
+            entry["prefix"] = prefix
+            self.changed = True
+
+    def save(self) -> None:
+        """
+        保存清单，先写入同目录下的临时文件再替换，
+        多个进程同时启动时读取到的清单总是完整的
+        """
+        if not self.changed:
+            return
+        temp_path = None
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(
+                prefix=".controllers-", suffix=".tmp", dir=directory
+            )
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "version": MANIFEST_VERSION,
+                        "module_dir": self.module_dir,
+                        "dirs": self.dirs,
+                        "modules": self.modules,
+                    },
+                    file,
+                )
+            os.replace(temp_path, self.path)
+            temp_path = None
+        except OSError as e:
+            logger.info(f"Save controller manifest failed {self.path}: {e}")
+        finally:
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+
+class LazyControllerRoute(BaseRoute):
+    """
+    延迟导入的控制器路由，第一次请求该路由前缀时才导入模块
+    导入后把模块的路由注册到应用并移除自身，通知插件刷新（事件订阅者、日志路由策略等），
+    再重新分发本次请求；模块导入前接口不会出现在 openapi 文档中，也不会被 @warmup 预热
+    """
+
+    def __init__(self, path_prefix: str, module_path: str, router_prefix: str) -> None:
+        """
+        创建延迟导入的路由。
+
+        Args:
+            path_prefix (str): 模块路由的完整前缀。
+            module_path (str): 控制器模块路径。
+            router_prefix (str): 模块路由注册到应用时使用的前缀。
+        """
+        self.path_prefix = path_prefix
+        self.module_path = module_path
+        self.router_prefix = router_prefix
+        self.loaded = False
+        self._lock = asyncio.Lock()
+
+    def matches(self, scope: Scope) -> tuple[Match, Scope]:
+        """匹配路由前缀"""
+        if scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if path == self.path_prefix or path.startswith(self.path_prefix + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params):
+        """模块导入前无法生成路由地址"""
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """导入模块并重新分发请求"""
+        app: FastAPI = scope["app"]
+        async with self._lock:
+            if not self.loaded:
+                start_time = perf_counter()
+                module = importlib.import_module(self.module_path)
+                app.include_router(module.router, prefix=self.router_prefix)
+                app.router.routes.remove(self)
+                # 重新生成 openapi 文档
+                app.openapi_schema = None
+                # 模块中声明的订阅者、路由的日志策略等在启动时已经生成，需要刷新
+                for plugin in getattr(app.state, "plugins", {}).values():
+                    plugin.refresh()
+                self.loaded = True
+                logger.info(
+                    f"[{self.module_path}] lazy loaded in "
+                    f"{(perf_counter() - start_time) * 1000:.2f}ms"
+                )
+        await app.router(scope, receive, send)
+
+
+def default_manifest_path(module_dir: str) -> str:
+    """
+    默认的清单文件路径，放在当前用户的缓存目录中。
+    清单中的模块路径会被直接导入，不能放在其他用户可以写入的系统临时目录
+    """
+    key = zlib.crc32(os.path.abspath(module_dir).encode())
+    return os.path.join(user_cache_dir("controllers"), f"controllers-{key:08x}.json")
+
+
+def load_controller_modules(
+    app_router: APIRouter,
+    module_dir: str,
+    manifest_path: str | None = None,
+    lazy: bool = False,
+    app: FastAPI | None = None,
+) -> dict[str, dict]:
     """
     加载指定目录下的所有模块，并自动注册路由
     :param app_router: APIRouter 应用实例
     :param module_dir: 模块目录相对路径
+    :param manifest_path: 控制器发现清单的路径，为空时使用当前用户的缓存目录
+    :param lazy: 是否延迟到第一次请求时才导入模块，需要传入 app 且清单中已记录路由前缀
+    :param app: FastAPI 应用实例
+    :return: 每个模块的导入耗时及路由数量
     """
-    path = Path(module_dir)
-    for module_file in path.glob("**/controller.py"):  # 只加载包含 controller.py 的模块
-        module_name = module_file.parent.name
-        module_path = f"{module_dir.replace('/', '.')}.{module_name}.controller"
+    start_time = perf_counter()
+    manifest = ControllerManifest(
+        manifest_path or default_manifest_path(module_dir), module_dir
+    )
+    cached = manifest.is_fresh()
+    if not cached:
+        manifest.scan()
 
+    report: dict[str, dict] = {}
+    for module_path, entry in manifest.modules.items():
+        prefix = entry["prefix"]
+        if lazy and app is not None and prefix:
+            # 路由前缀已知的模块延迟导入
+            app.router.routes.append(
+                LazyControllerRoute(
+                    app_router.prefix + prefix, module_path, app_router.prefix
+                )
+            )
+            report[module_path] = {"lazy": True, "prefix": prefix}
+            continue
+        import_start_time = perf_counter()
         try:
             module = importlib.import_module(module_path)
-            # 自动注册路由
-            if hasattr(module, "router"):
-                app_router.include_router(module.router)
-                for r in module.router.routes:
-                    if isinstance(r, APIRoute):
-                        methods = ", ".join(r.methods)
-                        logger.info(f"[{r.endpoint.__module__}] {methods} {r.path}")
-
         except ImportError as e:
             logger.info(f"Import module routing failed {module_path}: {e}")
+            continue
+        import_ms = (perf_counter() - import_start_time) * 1000
+        # 自动注册路由
+        if hasattr(module, "router"):
+            app_router.include_router(module.router)
+            manifest.set_prefix(module_path, module.router.prefix)
+            routes = sum(isinstance(r, APIRoute) for r in module.router.routes)
+        else:
+            routes = 0
+        report[module_path] = {"import_ms": round(import_ms, 2), "routes": routes}
+        logger.info(f"[{module_path}] {routes} routes imported in {import_ms:.2f}ms")
+    manifest.save()
+    logger.info(
+        f"Controllers loaded in {(perf_counter() - start_time) * 1000:.2f}ms "
+        f"({'manifest' if cached else 'scan'}): {len(report)} modules"
+    )
+    return report
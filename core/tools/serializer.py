@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   serializer.py
+@Time    :   2026/10/19 19:48:12
+@Desc    :   按类型编译转换计划的对象序列化，把领域对象转换为可以 JSON 序列化的字典
+"""
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import sys
+from collections.abc import Callable
+from functools import partial
+
+try:
+    from pydantic import BaseModel
+except ImportError:  # 未安装时不支持 pydantic 模型
+    BaseModel = None
+
+
+def _format_datetime(obj: datetime.datetime) -> str:
+    """与 strftime("%Y-%m-%d %H:%M:%S") 的结果相同，isoformat 快得多"""
+    if obj.year < 1000:
+        # strftime 的年份不补零
+        return obj.strftime("%Y-%m-%d %H:%M:%S")
+    # 去掉时区偏移
+    return obj.isoformat(" ", "seconds")[:19]
+
+
+def _format_date(obj: datetime.date) -> str:
+    """与 strftime("%Y-%m-%d") 的结果相同"""
+    return obj.isoformat() if obj.year >= 1000 else obj.strftime("%Y-%m-%d")
+
+
+# 常见类型按精确类型直接转换，避免逐个判断
+EXACT_TYPE_CONVERTERS = {
+    datetime.datetime: _format_datetime,
+    datetime.date: _format_date,
+    decimal.Decimal: float,
+    bytes: lambda obj: str(obj, encoding="utf-8"),
+}
+# 不需要转换的类型
+PRIMITIVE_TYPES = frozenset({str, int, float, bool, type(None)})
+# 转换为列表的容器类型
+SEQUENCE_TYPES = (list, set, tuple, frozenset)
+
+# 对象字段不存在时的占位
+_MISSING = object()
+
+# 转换函数：(值, 正在转换的对象ID) -> 转换后的值
+Converter = Callable[[object, set], object]
+
+
+def _ignore_seen(convert, value, seen):
+    """不会包含其他对象的值，不需要检查循环引用"""
+    return convert(value)
+
+
+class CircularReferenceError(ValueError):
+    """对象之间存在循环引用"""
+
+
+class ObjectSerializer:
+    """
+    对象序列化，第一次遇到某个类型时编译它的转换计划（字段列表及转换方式）并缓存
+    - 支持普通对象（__dict__）、__slots__、dataclass 及 pydantic 模型
+    - datetime、date、Decimal、bytes 的转换与 CJsonEncoder 一致，列表、集合、元组转换为列表
+    - 标准库中的其他类型（UUID、Path 等）原样返回
+    - 对象之间存在循环引用时抛出 CircularReferenceError
+    用法示例：
+    serializer = ObjectSerializer()
+    rows = serializer.to_dict(users)
+    """
+
+    def __init__(self) -> None:
+        """创建序列化器"""
+        self._converters: dict[type, Converter] = {}
+
+    def to_dict(self, obj):
+        """
+        转换对象。
+
+        Args:
+            obj: 对象，或对象的列表、集合。
+
+        Returns:
+            可以 JSON 序列化的字典、列表或基础类型的值。
+        """
+        return self.convert(obj, set())
+
+    def convert(self, value, seen: set):
+        """转换单个值，seen 为当前转换路径上的容器及对象ID"""
+        cls = type(value)
+        if cls in PRIMITIVE_TYPES:
+            return value
+        converter = self._converters.get(cls) or self.compile(cls)
+        return converter(value, seen)
+
+    def compile(self, cls: type) -> Converter:
+        """
+        编译类型的转换计划。
+
+        Args:
+            cls (type): 值的类型。
+
+        Returns:
+            Converter: 转换函数。
+        """
+        converter = self._compile(cls)
+        self._converters[cls] = converter
+        return converter
+
+    def _compile(self, cls: type) -> Converter:
+        """根据类型选择转换方式"""
+        for base, convert in EXACT_TYPE_CONVERTERS.items():
+            if issubclass(cls, base):
+                return partial(_ignore_seen, convert)
+        if issubclass(cls, enum.Enum):
+            return lambda value, seen: self.convert(value.value, seen)
+        if issubclass(cls, str | int | float):
+            return lambda value, seen: value
+        if issubclass(cls, SEQUENCE_TYPES):
+            return self._convert_sequence
+        if issubclass(cls, dict):
+            return self._convert_mapping
+        names, has_dict = self._fields(cls)
+        if names is None:
+            return lambda value, seen: value
+        return self._object_converter(cls, names, has_dict)
+
+    @staticmethod
+    def _fields(cls: type) -> tuple[tuple[str, ...] | None, bool]:
+        """获取类型的字段列表及是否需要读取实例的 __dict__，不是领域对象时返回 (None, False)"""
+        if BaseModel is not None and issubclass(cls, BaseModel):
+            return tuple(cls.model_fields), False
+        if dataclasses.is_dataclass(cls):
+            return tuple(field.name for field in dataclasses.fields(cls)), False
+        if cls.__module__.partition(".")[0] in sys.stdlib_module_names:
+            return None, False
+        names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get("__slots__", ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            names.extend(
+                name for name in slots if name not in ("__dict__", "__weakref__")
+            )
+        # 继承链上有类没有定义 __slots__ 时实例才有 __dict__
+        has_dict = any(
+            "__dict__" in klass.__dict__ for klass in cls.__mro__ if klass is not object
+        )
+        if not names and not has_dict:
+            return None, False
+        return tuple(names), has_dict
+
+    def _object_converter(
+        self, cls: type, names: tuple[str, ...], has_dict: bool
+    ) -> Converter:
+        """生成对象的转换函数，字段值的转换函数直接从缓存中查找，减少函数调用"""
+        converters = self._converters
+        compile_ = self.compile
+        is_pydantic = BaseModel is not None and issubclass(cls, BaseModel)
+
+        def convert_object(obj, seen: set) -> dict:
+            key = id(obj)
+            if key in seen:
+                raise CircularReferenceError(
+                    f"Circular reference detected: {cls.__name__}"
+                )
+            seen.add(key)
+            try:
+                result = {}
+                if names:
+                    for name in names:
+                        value = getattr(obj, name, _MISSING)
+                        if value is _MISSING:
+                            # 未赋值的 slots 字段
+                            continue
+                        value_cls = type(value)
+                        if value_cls in PRIMITIVE_TYPES:
+                            result[name] = value
+                        else:
+                            converter = converters.get(value_cls) or compile_(value_cls)
+                            result[name] = converter(value, seen)
+                if has_dict:
+                    for name, value in obj.__dict__.items():
+                        value_cls = type(value)
+                        if value_cls in PRIMITIVE_TYPES:
+                            result[name] = value
+                        else:
+                            converter = converters.get(value_cls) or compile_(value_cls)
+                            result[name] = converter(value, seen)
+                if is_pydantic and obj.__pydantic_extra__:
+                    for name, value in obj.__pydantic_extra__.items():
+                        result[name] = self.convert(value, seen)
+                return result
+            finally:
+                seen.discard(key)
+
+        return convert_object
+
+    def _convert_sequence(self, values, seen: set) -> list:
+        """转换列表等容器，连续相同类型的元素复用同一个转换函数"""
+        key = id(values)
+        if key in seen:
+            raise CircularReferenceError("Circular reference detected: list")
+        seen.add(key)
+        try:
+            converters = self._converters
+            result = []
+            append = result.append
+            last_cls, last_converter = None, None
+            for item in values:
+                cls = type(item)
+                if cls in PRIMITIVE_TYPES:
+                    append(item)
+                    continue
+                if cls is not last_cls:
+                    last_cls = cls
+                    last_converter = converters.get(cls) or self.compile(cls)
+                append(last_converter(item, seen))
+            return result
+        finally:
+            seen.discard(key)
+
+    def _convert_mapping(self, values: dict, seen: set) -> dict:
+        """转换字典的值，key 保持不变"""
+        key = id(values)
+        if key in seen:
+            raise CircularReferenceError("Circular reference detected: dict")
+        seen.add(key)
+        try:
+            convert = self.convert
+            return {
+                name: value if type(value) in PRIMITIVE_TYPES else convert(value, seen)
+                for name, value in values.items()
+            }
+        finally:
+            seen.discard(key)
+
+
+# 默认的序列化器，转换计划在整个进程内共享
+default_serializer = ObjectSerializer()
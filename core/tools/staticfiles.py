@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   staticfiles.py
+@Time    :   2026/10/19 18:58:06
+@Desc    :   预压缩、按内容哈希长期缓存的静态文件服务
+"""
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, PlainTextResponse
+from starlette.routing import get_route_path
+from starlette.types import Receive, Scope, Send
+
+from .precompressed import (
+    available_encodings,
+    compress,
+    encoding_etag,
+    etag_matches,
+    negotiate_encoding,
+)
+
+# 预先压缩好的同名文件后缀，如 swagger-ui.css.gz
+SIBLING_SUFFIXES = {".br": "br", ".gz": "gzip", ".zst": "zstd"}
+# 带有正确版本号的请求长期缓存
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 不带版本号的请求每次使用 ETag 验证
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def is_compressible(media_type: str) -> bool:
+    """文本类的文件才值得压缩"""
+    return media_type.startswith("text/") or media_type in (
+        "application/javascript",
+        "application/json",
+        "application/xml",
+        "image/svg+xml",
+    )
+
+
+class StaticAsset:
+    """一个静态文件及其各个编码的内容"""
+
+    __slots__ = ("media_type", "version", "etag", "bodies", "files", "compressed")
+
+    def __init__(self, path: str, memory_max_size: int) -> None:
+        """
+        读取文件并计算内容哈希。
+
+        Args:
+            path (str): 文件路径。
+            memory_max_size (int): 放入内存的文件大小上限，更大的文件从磁盘发送。
+        """
+        self.media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        # 各个编码在内存中的内容，为空时从磁盘发送 files 中的文件
+        self.bodies: dict[str | None, bytes] = {}
+        self.files: dict[str | None, str] = {None: path}
+        mtime = os.stat(path).st_mtime
+        for suffix, encoding in SIBLING_SUFFIXES.items():
+            # 只使用不早于原文件的预压缩文件
+            sibling = path + suffix
+            if os.path.isfile(sibling) and os.stat(sibling).st_mtime >= mtime:
+                self.files[encoding] = sibling
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as file:
+            content = file.read()
+        digest.update(content)
+        self.version = digest.hexdigest()[:12]
+        self.etag = f'"{digest.hexdigest()}"'
+        if len(content) <= memory_max_size:
+            for encoding, file_path in self.files.items():
+                if encoding is None:
+                    self.bodies[None] = content
+                else:
+                    with open(file_path, "rb") as file:
+                        self.bodies[encoding] = file.read()
+        # 是否已在内存中压缩
+        self.compressed = not self.bodies or not is_compressible(self.media_type)
+
+    def compress(self) -> None:
+        """压缩内存中还没有对应编码的内容"""
+        if self.compressed:
+            return
+        content = self.bodies[None]
+        for encoding in available_encodings():
+            if encoding not in self.bodies:
+                compressed = compress(content, encoding)
+                if len(compressed) < len(content):
+                    self.bodies[encoding] = compressed
+        self.compressed = True
+
+
+class PrecompressedStaticFiles:
+    """
+    静态文件服务，替代 StaticFiles
+    - 启动时扫描目录，小文件读入内存并预先压缩，也会使用目录中预先生成的 .gz/.br/.zst 文件
+    - 按 Accept-Encoding 协商编码，大文件从磁盘分块发送
+    - url 带上内容哈希（?v=xxx）时返回 immutable 的长期缓存，否则每次使用 ETag 验证
+    版本号放在查询参数中，反向代理按文件名转发的配置（proxy_pass 会保留查询参数）不需要修改
+    """
+
+    def __init__(self, directory: str, memory_max_size: int = 4 * 1024 * 1024) -> None:
+        """
+        扫描静态文件目录。
+
+        Args:
+            directory (str): 静态文件目录。
+            memory_max_size (int): 放入内存的文件大小上限（字节）。
+        """
+        if not os.path.isdir(directory):
+            raise RuntimeError(f"Directory '{directory}' does not exist")
+        self.directory = directory
+        self.assets: dict[str, StaticAsset] = {}
+        for root, _, file_names in os.walk(directory):
+            for name in sorted(file_names):
+                base, suffix = os.path.splitext(name)
+                if suffix in SIBLING_SUFFIXES and base in file_names:
+                    continue
+                path = os.path.join(root, name)
+                url_path = os.path.relpath(path, directory).replace(os.sep, "/")
+                self.assets[url_path] = StaticAsset(path, memory_max_size)
+        self._prepared = False
+        self._lock = asyncio.Lock()
+
+    def url_for(self, path: str) -> str:
+        """
+        获取带内容哈希的文件路径，用于页面中引用静态文件。
+
+        Args:
+            path (str): 相对于静态目录的文件路径。
+
+        Returns:
+            str: 如 swagger-ui.css?v=0123456789ab。
+        """
+        asset = self.assets.get(path)
+        return f"{path}?v={asset.version}" if asset else path
+
+    def compress_all(self) -> None:
+        """压缩全部文件，不需要事件循环，预先 fork 时在父进程中调用"""
+        for asset in self.assets.values():
+            asset.compress()
+        self._prepared = True
+
+    async def prepare(self) -> None:
+        """在线程中压缩全部文件，应用启动时调用，未调用时在第一次请求时执行"""
+        if self._prepared:
+            return
+        async with self._lock:
+            if not self._prepared:
+                await asyncio.to_thread(self.compress_all)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """发送静态文件"""
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse(
+                "Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"}
+            )
+            await response(scope, receive, send)
+            return
+        asset = self.assets.get(get_route_path(scope).lstrip("/"))
+        if asset is None:
+            raise HTTPException(status_code=404)
+        await self.prepare()
+
+        request_headers = Headers(scope=scope)
+        version = QueryParams(scope.get("query_string", b"")).get("v")
+        available = asset.bodies or asset.files
+        encoding = negotiate_encoding(
+            request_headers.get("accept-encoding", ""), available
+        )
+        headers = {
+            # 各个编码的内容不同，分别使用各自的 ETag
+            "etag": encoding_etag(asset.etag, encoding),
+            "cache-control": (
+                IMMUTABLE_CACHE_CONTROL
+                if version == asset.version
+                else REVALIDATE_CACHE_CONTROL
+            ),
+            "vary": "Accept-Encoding",
+        }
+        if etag_matches(request_headers.get("if-none-match", ""), asset.etag):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if encoding is not None:
+            headers["content-encoding"] = encoding
+        if not asset.bodies:
+            # 大文件从磁盘分块发送
+            response = FileResponse(
+                asset.files[encoding], headers=headers, media_type=asset.media_type
+            )
+            await response(scope, receive, send)
+            return
+
+        body = asset.bodies[encoding]
+        media_type = asset.media_type
+        if media_type.startswith("text/"):
+            media_type += "; charset=utf-8"
+        raw_headers = [(k.encode(), v.encode()) for k, v in headers.items()]
+        raw_headers += [
+            (b"content-type", media_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": raw_headers}
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": b"" if scope["method"] == "HEAD" else body,
+            }
+        )
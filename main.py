@@ -2,9 +2,14 @@
 # -*- coding: UTF-8 -*-
 """这是一个使用 FastAPI 框架创建的 Web 应用程序"""
 
+from core.libs.profiling import import_profiler
+
+# 设置了 STARTUP_PROFILE_IMPORTS 环境变量时，记录应用模块的导入耗时并写入启动报告
+import_profiler.start_from_env()
+
 # 必须在外部载入 app 对象
 
-from app.application import app  # noqa: F401
+from app.application import app  # noqa: E402, F401
 
 # if __name__ == "__main__":
 #     import inspect
@@ -0,0 +1,15 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   conftest.py
+@Time    :   2026/10/19 22:40:18
+@Desc    :   测试的公共配置
+"""
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    """异步测试使用 asyncio 运行"""
+    return "asyncio"
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_database.py
+@Time    :   2026/10/19 22:10:12
+@Desc    :   数据库插件的连接池及SQL执行统计
+"""
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("aiosqlite")
+
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from core.plugins.database import (  # noqa: E402
+    DatabasePluginClient,
+    current_session,
+    get_db_session,
+)
+from core.plugins.globalrequest import GlobalRequestPluginClient  # noqa: E402
+from core.plugins.pluginbase import plugins_lifespan  # noqa: E402
+
+
+def create_app(database_url: str) -> tuple[FastAPI, DatabasePluginClient]:
+    """创建只安装数据库插件的应用，慢查询阈值为 0，所有SQL都计入慢查询"""
+    app = FastAPI(lifespan=plugins_lifespan)
+    database = DatabasePluginClient(
+        app=app,
+        name="Database",
+        settings=DatabasePluginClient.DatabaseConfig(
+            DATABASE_URL=database_url, POOL_SIZE=2, SLOW_QUERY_MS=0
+        ),
+    )
+    # 全局请求插件最后注册，在最外层创建请求上下文
+    GlobalRequestPluginClient(app=app, name="GlobalRequest")
+
+    @app.get("/count")
+    async def count(session: AsyncSession = Depends(get_db_session)):
+        # 依赖和 current_session 在同一个请求内获取到同一个会话
+        assert current_session() is session
+        result = await session.execute(text("SELECT 1 + 1"))
+        return {"value": result.scalar_one()}
+
+    @app.get("/error")
+    async def error(session: AsyncSession = Depends(get_db_session)):
+        try:
+            await session.execute(text("SELECT * FROM missing_table"))
+        except Exception:
+            return {"failed": True}
+        return {"failed": False}
+
+    return app, database
+
+
+@pytest.fixture(params=["memory", "file"])
+def database_url(request, tmp_path) -> str:
+    """内存数据库使用 StaticPool，文件数据库使用 AsyncAdaptedQueuePool"""
+    if request.param == "memory":
+        return "sqlite+aiosqlite://"
+    return f"sqlite+aiosqlite:///{tmp_path / 'test.db'}"
+
+
+def test_metrics_record_pool_and_queries(database_url):
+    """请求执行SQL之后连接池和SQL执行的统计都有数据"""
+    app, database = create_app(database_url)
+    with TestClient(app) as client:
+        for _ in range(3):
+            response = client.get("/count")
+            assert response.status_code == 200
+            assert response.json() == {"value": 2}
+        assert client.get("/error").json() == {"failed": True}
+        metrics = database.metrics()
+
+    pool, queries = metrics["pool"], metrics["queries"]
+    # 启动检查 1 次 + 每个请求 1 次
+    assert pool["checkouts"] >= 5
+    assert pool["avg_wait_ms"] >= 0
+    assert pool["max_wait_ms"] >= pool["avg_wait_ms"]
+    # 请求结束时会话已经关闭，连接全部归还
+    if database_url.endswith(".db"):
+        assert pool["size"] == 2
+        assert pool["checked_out"] == 0
+    # SELECT 1（启动检查）+ 3 次 SELECT 1 + 1，失败的SQL不计入成功次数
+    assert queries["count"] == 4
+    assert queries["failed"] == 1
+    assert queries["slow"] == 4
+    statements = {item["statement"]: item for item in queries["slow_statements"]}
+    assert statements["SELECT 1 + 1"]["count"] == 3
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_events.py
+@Time    :   2026/10/20 10:31:47
+@Desc    :   事件总线插件
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.plugins.events import Event, base, subscriber
+from core.plugins.events.client import EventBusPluginClient
+from core.plugins.pluginbase import plugins_lifespan
+
+
+class Pinged(Event):
+    """测试事件"""
+
+    name: str
+
+
+@pytest.fixture
+def handled(monkeypatch) -> list[tuple[str, int]]:
+    """声明一个订阅者，记录收到的事件及处理时所在的线程"""
+    monkeypatch.setattr(base, "subscribers", [])
+    handled = []
+
+    @subscriber(Pinged)
+    async def on_pinged(event: Pinged):
+        handled.append((event.name, threading.get_ident()))
+
+    return handled
+
+
+def create_app() -> tuple[FastAPI, EventBusPluginClient]:
+    """创建启用了事件总线插件的应用"""
+    app = FastAPI(lifespan=plugins_lifespan)
+    return app, EventBusPluginClient(app=app, name="Events")
+
+
+def wait_for(condition, timeout: float = 5) -> None:
+    """等待条件成立"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_apps_keep_their_own_queues(handled):
+    """两个应用共享订阅者的声明，各自的事件由各自的消费协程处理"""
+    first_app, first_bus = create_app()
+    second_app, second_bus = create_app()
+    with TestClient(first_app), TestClient(second_app):
+        first_bus.publish_nowait(Pinged(name="first"))
+        second_bus.publish_nowait(Pinged(name="second"))
+        wait_for(lambda: len(handled) == 2)
+        threads = dict(handled)
+        assert threads["first"] == first_bus._loop_thread_id
+        assert threads["second"] == second_bus._loop_thread_id
+        assert threads["first"] != threads["second"]
+        for bus in (first_bus, second_bus):
+            [stats] = bus.metrics().values()
+            assert stats["delivered"] == 1
+    # 一个应用关闭之后另一个应用不受影响
+    with TestClient(second_app):
+        second_bus.publish_nowait(Pinged(name="again"))
+        wait_for(lambda: len(handled) == 3)
+        assert handled[-1][0] == "again"
+
+
+def test_business_modules_do_not_import_the_plugin():
+    """业务模块只导入事件的声明，没有启用插件时不加载插件代码"""
+    code = (
+        "import sys, app.modules.user.service;"
+        "print('core.plugins.events.client' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parents[2],
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_globalrequest_cache.py
+@Time    :   2026/10/20 09:41:06
+@Desc    :   请求级别缓存的重入调用
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from core.libs.context import RequestCache
+
+
+def test_sync_reentrant_call():
+    """同步函数用相同的参数调用自身时不会死锁"""
+    cache = RequestCache()
+    calls = []
+
+    def load(depth: int) -> int:
+        calls.append(depth)
+        if len(calls) < 3:
+            return cache.get_or_call("key", load, depth + 1)
+        return depth
+
+    worker = threading.Thread(
+        target=lambda: cache.get_or_call("key", load, 0), daemon=True
+    )
+    worker.start()
+    worker.join(timeout=5)
+    assert not worker.is_alive()
+    assert calls == [0, 1, 2]
+    assert cache["key"] == 2
+    assert cache.get_or_call("key", load, 0) == 2
+
+
+@pytest.mark.anyio
+async def test_async_reentrant_call():
+    """异步函数用相同的参数调用自身时直接执行，不等待自己的结果"""
+    cache = RequestCache()
+    calls = []
+
+    async def load(depth: int) -> int:
+        calls.append(depth)
+        if len(calls) < 3:
+            return await cache.get_or_call_async("key", load, depth + 1)
+        return depth
+
+    assert await asyncio.wait_for(cache.get_or_call_async("key", load, 0), 5) == 2
+    assert calls == [0, 1, 2]
+
+
+@pytest.mark.anyio
+async def test_async_concurrent_calls_share_result():
+    """其他任务并发调用相同的key时仍然只执行一次"""
+    cache = RequestCache()
+    calls = []
+
+    async def load() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    results = await asyncio.gather(
+        *(cache.get_or_call_async("key", load) for _ in range(5))
+    )
+    assert results == [1] * 5
+    assert calls == [1]
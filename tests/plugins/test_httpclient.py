@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_httpclient.py
+@Time    :   2026/10/19 22:40:18
+@Desc    :   HTTP请求插件的连接池、重试及熔断，使用本地启动的 uvicorn 作为目标服务
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+
+import httpx
+import pytest
+import uvicorn
+from fastapi import FastAPI
+
+from core.plugins.httpclient import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HttpClientPluginClient,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class StandInServer:
+    """
+    目标服务，记录每个请求使用的客户端端口（即连接）及同时处理的请求数
+    /ok 返回200，/fail 返回503，/flaky 前 n 次返回503，/slow 等待后返回200
+    """
+
+    def __init__(self) -> None:
+        """创建服务"""
+        self.connections: Counter[int] = Counter()
+        self.active = 0
+        self.max_active = 0
+        self.flaky_calls = 0
+        self.base_url = ""
+
+    async def __call__(self, scope, receive, send) -> None:
+        """ASGI 入口"""
+        if scope["type"] != "http":
+            return
+        self.connections[scope["client"][1]] += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            status = 200
+            path = scope["path"]
+            if path == "/fail":
+                status = 503
+            elif path == "/flaky":
+                self.flaky_calls += 1
+                failures = int(scope["query_string"].decode().partition("=")[2] or 0)
+                status = 503 if self.flaky_calls <= failures else 200
+            elif path == "/slow":
+                await asyncio.sleep(0.2)
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await send({"type": "http.response.body", "body": path.encode()})
+        finally:
+            self.active -= 1
+
+
+def free_port() -> int:
+    """获取一个空闲的端口"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[StandInServer]:
+    """在后台线程中启动目标服务"""
+    app = StandInServer()
+    port = free_port()
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"
+    )
+    uvicorn_server = uvicorn.Server(config)
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not uvicorn_server.started:
+        assert time.monotonic() < deadline, "stand-in server did not start"
+        time.sleep(0.01)
+    app.base_url = f"http://127.0.0.1:{port}"
+    yield app
+    uvicorn_server.should_exit = True
+    thread.join(5)
+
+
+@pytest.fixture
+def stand_in(server: StandInServer) -> StandInServer:
+    """每个测试前清空目标服务的统计"""
+    server.connections.clear()
+    server.max_active = 0
+    server.flaky_calls = 0
+    return server
+
+
+@pytest.fixture
+async def make_client() -> AsyncIterator:
+    """创建并启动插件，测试结束后关闭"""
+    clients: list[HttpClientPluginClient] = []
+
+    async def factory(**options) -> HttpClientPluginClient:
+        options.setdefault("RETRY_BACKOFF", 0)
+        client = HttpClientPluginClient(
+            app=FastAPI(),
+            name="HttpClient",
+            settings=HttpClientPluginClient.HttpClientConfig(**options),
+        )
+        await client.startup()
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in clients:
+        await client.shutdown()
+
+
+async def test_sequential_requests_reuse_one_connection(stand_in, make_client):
+    """连续的请求复用连接池中的同一个连接"""
+    client = await make_client()
+    for _ in range(20):
+        response = await client.get(f"{stand_in.base_url}/ok")
+        assert response.status_code == 200
+    assert sum(stand_in.connections.values()) == 20
+    assert len(stand_in.connections) == 1
+
+
+async def test_per_host_limit_bounds_connections(stand_in, make_client):
+    """同一个主机同时进行的请求数量不超过 PER_HOST_LIMIT，连接数量也不会超过"""
+    client = await make_client(PER_HOST_LIMIT=2)
+    responses = await asyncio.gather(
+        *(client.get(f"{stand_in.base_url}/slow") for _ in range(8))
+    )
+    assert all(response.status_code == 200 for response in responses)
+    assert stand_in.max_active == 2
+    assert len(stand_in.connections) <= 2
+    host_stats = client.metrics()["127.0.0.1"]
+    assert host_stats["requests"] == 8
+    assert host_stats["failures"] == 0
+
+
+async def test_retry_on_retryable_status(stand_in, make_client):
+    """幂等请求遇到 503 时重试，重试成功后返回成功的响应"""
+    client = await make_client(RETRIES=2)
+    response = await client.get(f"{stand_in.base_url}/flaky?failures=2")
+    assert response.status_code == 200
+    assert stand_in.flaky_calls == 3
+    host_stats = client.metrics()["127.0.0.1"]
+    assert host_stats["retries"] == 2
+    assert host_stats["failures"] == 2
+
+
+async def test_retries_exhausted_returns_last_response(stand_in, make_client):
+    """重试次数用完时返回最后一次的响应"""
+    client = await make_client(RETRIES=1, BREAKER_THRESHOLD=10)
+    response = await client.get(f"{stand_in.base_url}/fail")
+    assert response.status_code == 503
+    assert sum(stand_in.connections.values()) == 2
+
+
+async def test_post_is_not_retried(stand_in, make_client):
+    """非幂等的请求默认不重试，可以通过 retry 参数开启"""
+    client = await make_client(RETRIES=2)
+    response = await client.post(f"{stand_in.base_url}/flaky?failures=1")
+    assert response.status_code == 503
+    assert stand_in.flaky_calls == 1
+    response = await client.post(f"{stand_in.base_url}/flaky?failures=2", retry=True)
+    assert response.status_code == 200
+    assert stand_in.flaky_calls == 3
+
+
+async def test_transport_error_is_retried_then_raised(make_client):
+    """连接失败时重试，重试次数用完后抛出 httpx 的异常"""
+    client = await make_client(RETRIES=2, BREAKER_THRESHOLD=10)
+    url = f"http://127.0.0.1:{free_port()}/ok"
+    with pytest.raises(httpx.ConnectError):
+        await client.get(url)
+    host_stats = client.metrics()["127.0.0.1"]
+    assert host_stats["requests"] == 3
+    assert host_stats["failures"] == 3
+    assert host_stats["retries"] == 2
+
+
+async def test_breaker_opens_rejects_and_closes(stand_in, make_client):
+    """连续失败后打开，打开期间拒绝请求，超过重置时间后试探成功则关闭"""
+    client = await make_client(
+        RETRIES=0, BREAKER_THRESHOLD=2, BREAKER_RESET_TIMEOUT=0.2
+    )
+    breaker = client.breakers["127.0.0.1"]
+    for _ in range(2):
+        assert (await client.get(f"{stand_in.base_url}/fail")).status_code == 503
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        await client.get(f"{stand_in.base_url}/ok")
+    assert client.metrics()["127.0.0.1"]["rejected"] == 1
+
+    await asyncio.sleep(0.25)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert (await client.get(f"{stand_in.base_url}/ok")).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+
+async def test_breaker_failed_trial_reopens(stand_in, make_client):
+    """半开状态下试探失败时重新打开"""
+    client = await make_client(
+        RETRIES=0, BREAKER_THRESHOLD=1, BREAKER_RESET_TIMEOUT=0.2
+    )
+    breaker = client.breakers["127.0.0.1"]
+    await client.get(f"{stand_in.base_url}/fail")
+    assert breaker.state == CircuitBreaker.OPEN
+    await asyncio.sleep(0.25)
+    assert (await client.get(f"{stand_in.base_url}/fail")).status_code == 503
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        await client.get(f"{stand_in.base_url}/ok")
+
+
+async def test_breaker_half_open_allows_single_trial(stand_in, make_client):
+    """半开状态下只放行一个试探请求，其他请求仍然被拒绝"""
+    client = await make_client(
+        RETRIES=0, BREAKER_THRESHOLD=1, BREAKER_RESET_TIMEOUT=0.2
+    )
+    await client.get(f"{stand_in.base_url}/fail")
+    await asyncio.sleep(0.25)
+    results = await asyncio.gather(
+        *(client.get(f"{stand_in.base_url}/slow") for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert sum(isinstance(result, httpx.Response) for result in results) == 1
+    assert sum(isinstance(result, CircuitOpenError) for result in results) == 2
+    assert client.breakers["127.0.0.1"].state == CircuitBreaker.CLOSED
+
+
+async def test_cancelled_trial_releases_the_slot(stand_in, make_client):
+    """试探请求被取消时释放试探名额，熔断器不会一直停留在打开状态"""
+    client = await make_client(
+        RETRIES=0, BREAKER_THRESHOLD=1, BREAKER_RESET_TIMEOUT=0.2
+    )
+    breaker = client.breakers["127.0.0.1"]
+    await client.get(f"{stand_in.base_url}/fail")
+    await asyncio.sleep(0.25)
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(client.get(f"{stand_in.base_url}/slow"), 0.05)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert (await client.get(f"{stand_in.base_url}/ok")).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_unexpected_error_in_trial_releases_the_slot(stand_in, make_client):
+    """试探请求出现与目标主机无关的异常时同样释放试探名额"""
+    client = await make_client(
+        RETRIES=0, BREAKER_THRESHOLD=1, BREAKER_RESET_TIMEOUT=0.2
+    )
+    breaker = client.breakers["127.0.0.1"]
+    await client.get(f"{stand_in.base_url}/fail")
+    await asyncio.sleep(0.25)
+    with pytest.raises(TypeError):
+        await client.get(f"{stand_in.base_url}/ok", unknown_option=True)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert (await client.get(f"{stand_in.base_url}/ok")).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
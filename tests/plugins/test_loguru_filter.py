@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_loguru_filter.py
+@Time    :   2026/10/20 09:12:31
+@Desc    :   日志URL过滤器和路由日志策略表
+"""
+
+import pytest
+from fastapi import APIRouter
+
+from core.plugins.loguru.enums import LogPolicy
+from core.plugins.loguru.filter import RequestUrlFilter, RoutePolicyTable, log_policy
+
+
+def scope(path: str, method: str = "GET") -> dict:
+    """只包含过滤和匹配用到的字段的 HTTP 作用域"""
+    return {"type": "http", "method": method, "path": path, "root_path": ""}
+
+
+@pytest.mark.parametrize(
+    ("path", "method", "expected"),
+    [
+        # 精确匹配
+        ("/", "GET", True),
+        ("/docs", "GET", True),
+        ("/docs/", "GET", False),
+        ("/document", "GET", False),
+        # 末尾带*的前缀匹配
+        ("/static/", "GET", True),
+        ("/static/css/app.css", "GET", True),
+        ("/statics", "GET", False),
+        # 通配符匹配
+        ("/api/v1/users/health", "GET", True),
+        ("/api/v1/a/b/health", "GET", True),
+        ("/api/v1/users/healthz", "GET", False),
+        ("/api/v2/users/health", "GET", False),
+        ("/files/a1.log", "GET", True),
+        ("/files/ab.log", "GET", False),
+        # OPTIONS 请求和 websocket 路径都跳过
+        ("/api/v1/users/list", "OPTIONS", True),
+        ("/ws/websocket", "GET", True),
+        ("/api/v1/users/list", "GET", False),
+    ],
+)
+def test_request_url_filter(path, method, expected):
+    """精确、前缀和通配符规则的匹配结果"""
+    url_filter = RequestUrlFilter(
+        ["/", "/docs", "/static/*", "/api/v1/*/health", "/files/a[0-9].log"]
+    )
+    assert url_filter.match(scope(path, method)) is expected
+
+
+def test_request_url_filter_compiles_rules():
+    """规则按类型分别编译，没有通配符规则时不生成正则"""
+    url_filter = RequestUrlFilter(["/", "/static/*", "/api/*/health"])
+    assert url_filter.exact_paths == {"/"}
+    assert url_filter.prefixes == ("/static/",)
+    assert url_filter.pattern is not None
+    assert RequestUrlFilter(["/", "/static/*"]).pattern is None
+    assert not RequestUrlFilter([]).match(scope("/"))
+
+
+def create_routes() -> list:
+    """声明了不同日志策略的路由"""
+    router = APIRouter()
+
+    @router.get("/health")
+    @log_policy(LogPolicy.SKIP)
+    def health():
+        return "ok"
+
+    @router.post("/upload")
+    @log_policy(LogPolicy.HEADERS_ONLY)
+    def upload():
+        return "ok"
+
+    @router.get("/upload")
+    def upload_status():
+        return "ok"
+
+    @router.get("/items/{item_id:int}")
+    @log_policy(LogPolicy.HEADERS_ONLY)
+    def item(item_id: int):
+        return item_id
+
+    @router.put("/files/{path:path}")
+    @log_policy(LogPolicy.SKIP)
+    def file(path: str):
+        return path
+
+    @router.get("/users/{user_id}")
+    def user(user_id: str):
+        return user_id
+
+    return router.routes
+
+
+@pytest.mark.parametrize(
+    ("path", "method", "expected"),
+    [
+        # 静态路由按方法区分
+        ("/health", "GET", LogPolicy.SKIP),
+        ("/health", "POST", LogPolicy.FULL),
+        ("/upload", "POST", LogPolicy.HEADERS_ONLY),
+        ("/upload", "GET", LogPolicy.FULL),
+        # 带路径参数的路由按转换器匹配
+        ("/items/1", "GET", LogPolicy.HEADERS_ONLY),
+        ("/items/abc", "GET", LogPolicy.FULL),
+        ("/items/1", "DELETE", LogPolicy.FULL),
+        ("/files/a/b/c.txt", "PUT", LogPolicy.SKIP),
+        # 未声明策略或未注册的路由完整记录
+        ("/users/1", "GET", LogPolicy.FULL),
+        ("/missing", "GET", LogPolicy.FULL),
+    ],
+)
+def test_route_policy_table(path, method, expected):
+    """静态路由、路径参数、请求方法及未声明时的默认策略"""
+    table = RoutePolicyTable(create_routes())
+    assert table.resolve(scope(path, method)) is expected
+
+
+def test_route_policy_table_keeps_declared_routes_only():
+    """只保存声明了策略的路由，静态路由放入字典"""
+    table = RoutePolicyTable(create_routes())
+    assert table.static_routes[("GET", "/health")] is LogPolicy.SKIP
+    assert ("GET", "/upload") not in table.static_routes
+    assert [route.path for route, _ in table.dynamic_routes] == [
+        "/items/{item_id:int}",
+        "/files/{path:path}",
+    ]
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_swaggerui.py
+@Time    :   2026/10/20 10:48:05
+@Desc    :   本地 Swaggerui 文档插件
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.plugins.swaggerui import SwaggeruiPluginClient
+
+
+def test_builtin_doc_routes_replaced():
+    """FastAPI 自带的文档路由被过滤，由插件提供"""
+    app = FastAPI()
+    plugin = SwaggeruiPluginClient(app=app)
+    paths = [route.path for route in app.routes]
+    for path in (
+        "/docs",
+        "/redoc",
+        app.openapi_url,
+        app.swagger_ui_oauth2_redirect_url,
+    ):
+        assert paths.count(path) == 1
+
+    client = TestClient(app)
+    response = client.get(app.swagger_ui_oauth2_redirect_url)
+    assert response.status_code == 200
+    assert response.headers["etag"]
+    assert plugin._oauth2_redirect_body is not None
+
+
+def test_oauth2_redirect_disabled():
+    """关闭 oauth2-redirect 时不注册该路由"""
+    app = FastAPI(swagger_ui_oauth2_redirect_url=None)
+    SwaggeruiPluginClient(app=app)
+    client = TestClient(app)
+    assert client.get("/docs").status_code == 200
+    assert client.get("/docs/oauth2-redirect").status_code == 404
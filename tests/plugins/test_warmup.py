@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_warmup.py
+@Time    :   2026/10/20 12:58:14
+@Desc    :   路由预热插件
+"""
+
+import pytest
+from fastapi import FastAPI, HTTPException, Query
+
+from core.plugins.warmup import WarmupPluginClient, warmup
+
+
+def create_app() -> tuple[FastAPI, WarmupPluginClient]:
+    """声明了各种预热样例的应用"""
+    app = FastAPI()
+    plugin = WarmupPluginClient(app=app, name="Warmup")
+
+    @app.get("/items/{item_id}")
+    @warmup(path_params={"item_id": 1})
+    @warmup(path_params={"item_id": "abc"})
+    @warmup(method="POST", path_params={"item_id": 1})
+    @warmup(path_params={})
+    def item(item_id: int, limit: int = Query(10, le=100)):
+        return {"id": item_id, "limit": limit}
+
+    @app.get("/private")
+    @warmup()
+    def private():
+        raise HTTPException(status_code=401)
+
+    @app.get("/broken")
+    @warmup()
+    def broken():
+        raise HTTPException(status_code=500)
+
+    @app.get("/missing")
+    @warmup()
+    def missing():
+        raise HTTPException(status_code=404)
+
+    return app, plugin
+
+
+@pytest.mark.anyio
+async def test_warmup_errors():
+    """5xx 及说明样例与接口不匹配的 404/405/422 记为失败，401 等其他状态不是失败"""
+    app, plugin = create_app()
+    report = await plugin.run()
+    # 样例按装饰器从下到上的顺序执行
+    assert [(route["route"], route["status"]) for route in report["routes"]] == [
+        ("POST /items/1", 405),
+        ("GET /items/abc", 422),
+        ("GET /items/1", 200),
+        ("GET /private", 401),
+        ("GET /broken", 500),
+        ("GET /missing", 404),
+    ]
+    assert report["errors"] == [
+        "GET /items/{item_id}: invalid sample, KeyError: 'item_id'",
+        "POST /items/1: status 405",
+        "GET /items/abc: status 422",
+        "GET /broken: status 500",
+        "GET /missing: status 404",
+    ]
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_json_helper.py
+@Time    :   2026/10/19 23:20:45
+@Desc    :   标准库和 orjson 两种 JSON 实现的一致性
+"""
+
+import datetime
+import decimal
+import enum
+import json
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pytest
+
+from core.tools.json_helper import OrjsonBackend, StdJsonBackend, orjson
+
+pytestmark = pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+
+std_backend, orjson_backend = StdJsonBackend(), OrjsonBackend()
+
+
+class Color(enum.Enum):
+    """普通枚举"""
+
+    RED = "red"
+    BLUE = 2
+
+
+class Level(enum.IntEnum):
+    """整数枚举"""
+
+    HIGH = 3
+
+
+class Mode(str, enum.Enum):
+    """字符串枚举"""
+
+    FAST = "fast"
+
+
+class Row:
+    """类字典对象，CJsonEncoder 转换为 dict"""
+
+    def __init__(self, **fields) -> None:
+        self.fields = fields
+
+    def keys(self):
+        """字段名"""
+        return self.fields.keys()
+
+    def __getitem__(self, key):
+        """字段值"""
+        return self.fields[key]
+
+
+@dataclass
+class Point:
+    """两种实现都不支持的 dataclass"""
+
+    x: int
+
+
+ACCEPTED = {
+    "empty": {},
+    "scalars": {"s": "a", "i": 1, "f": 0.5, "neg_zero": -0.0, "t": True, "n": None},
+    "unicode": {"name": "中文", "emoji": "😀", "control": "\x00 "},
+    "floats": [1e16, 1.5e-7, 0.1, 1e300, 1.2345678901234568e17],
+    "big_ints": [2**63, -(2**63) - 1, 10**30],
+    "non_str_keys": {1: "a", 2.5: "b", None: "c", False: "d"},
+    "nested": {"a": [{"b": (1, 2)}, [None, "null"]]},
+    "datetime": {
+        "at": datetime.datetime(2026, 10, 19, 23, 20, 45),
+        "day": datetime.date(2026, 10, 19),
+    },
+    "decimal": {"price": decimal.Decimal("1024.50")},
+    "bytes": {"token": b"0123456789abcdef"},
+    "uuid": {"id": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+    "enum": [Color.RED, Color.BLUE, Level.HIGH, Mode.FAST],
+    "mapping": {"row": Row(id=1, at=datetime.date(2026, 1, 1))},
+    "ordered": OrderedDict(b=1, a=2),
+}
+
+REJECTED = {
+    "set": {1, 2},
+    "object": {"o": object()},
+    "dataclass": Point(1),
+    "datetime_key": {datetime.date(2026, 1, 1): 1},
+    "uuid_key": {uuid.UUID(int=1): 1},
+    "nan": {"a": float("nan")},
+    "inf": [1.0, float("-inf")],
+    "decimal_nan": {"a": decimal.Decimal("NaN")},
+    "nested_nan": {"a": [None, {"b": (float("inf"),)}]},
+}
+
+
+def outcome(func, *args, **kwargs):
+    """执行函数，返回结果或异常类型"""
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("data", ACCEPTED.values(), ids=ACCEPTED.keys())
+def test_dumps_bytes_parity(data):
+    """响应使用的紧凑字节解析结果相同"""
+    expected = std_backend.dumps_bytes(data)
+    result = orjson_backend.dumps_bytes(data)
+    assert isinstance(result, bytes)
+    assert json.loads(result) == json.loads(expected)
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+@pytest.mark.parametrize("data", ACCEPTED.values(), ids=ACCEPTED.keys())
+def test_dumps_parity(data, ensure_ascii):
+    """字符串输出解析结果相同，需要转义时文本也相同"""
+    expected = std_backend.dumps(data, ensure_ascii=ensure_ascii)
+    result = orjson_backend.dumps(data, ensure_ascii=ensure_ascii)
+    assert json.loads(result) == json.loads(expected)
+    if ensure_ascii:
+        assert result.isascii()
+
+
+@pytest.mark.parametrize("data", ACCEPTED.values(), ids=ACCEPTED.keys())
+def test_indent_is_identical(data):
+    """缩进输出都由标准库生成，文本完全相同"""
+    assert orjson_backend.dumps(data, indent=4) == std_backend.dumps(data, indent=4)
+
+
+@pytest.mark.parametrize("data", REJECTED.values(), ids=REJECTED.keys())
+def test_same_errors_and_nan_output(data):
+    """不支持的数据抛出相同的异常，NaN 在 dumps 中输出相同的文本"""
+    assert outcome(orjson_backend.dumps_bytes, data) == outcome(
+        std_backend.dumps_bytes, data
+    )
+    assert outcome(orjson_backend.dumps, data) == outcome(std_backend.dumps, data)
+
+
+def test_nan_is_not_written_as_null():
+    """NaN 不会被 orjson 写为 null：dumps_bytes 抛出 ValueError，dumps 输出 NaN"""
+    with pytest.raises(ValueError):
+        orjson_backend.dumps_bytes({"a": float("nan"), "b": None})
+    assert orjson_backend.dumps({"a": float("nan")}) == '{"a": NaN}'
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"a": 1, "b": [true, false, null]}',
+        '{"name": "\\u4e2d\\u6587"}',
+        '{"a": NaN, "b": -Infinity}',
+        "[18446744073709551616, -9223372036854775809]",
+        '"\\ud800"',
+        '{"a": 1, "a": 2}',
+        "1.5e-07",
+    ],
+)
+def test_loads_parity(text):
+    """解析结果相同，orjson 不支持的内容交给标准库"""
+    expected = std_backend.loads(text)
+    result = orjson_backend.loads(text)
+    assert json.dumps(result) == json.dumps(expected)
+    assert json.dumps(orjson_backend.loads(text.encode())) == json.dumps(expected)
+
+
+@pytest.mark.parametrize("text", ["", "{", "[1,]", "{'a': 1}", memoryview(b"{}")])
+def test_loads_invalid(text):
+    """无效的 JSON 抛出相同的异常"""
+    assert outcome(orjson_backend.loads, text) == outcome(std_backend.loads, text)
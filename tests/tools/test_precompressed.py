@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_precompressed.py
+@Time    :   2026/10/20 10:12:37
+@Desc    :   预压缩响应和静态文件的编码协商与 ETag
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from core.tools.precompressed import (
+    PrecompressedBody,
+    encoding_etag,
+    etag_matches,
+)
+from core.tools.staticfiles import PrecompressedStaticFiles
+
+CONTENT = b"<html>" + b"swagger ui " * 200 + b"</html>"
+
+
+@pytest.fixture
+def client(tmp_path):
+    """同时挂载预压缩响应和静态文件的应用"""
+    (tmp_path / "app.js").write_bytes(CONTENT)
+    body = PrecompressedBody(CONTENT, media_type="text/html; charset=utf-8")
+    app = FastAPI()
+
+    @app.get("/page")
+    async def page(request: Request):
+        return body.response(request)
+
+    app.mount("/static", PrecompressedStaticFiles(str(tmp_path)))
+    return TestClient(app)
+
+
+def test_encoding_etag():
+    """每个编码在原始 ETag 后追加编码名"""
+    assert encoding_etag('"abc"', None) == '"abc"'
+    assert encoding_etag('"abc"', "gzip") == '"abc-gzip"'
+
+
+def test_etag_matches_any_encoding():
+    """If-None-Match 中的原始内容或任一编码的 ETag 都视为匹配"""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc-gzip"', '"abc"')
+    assert etag_matches('"other", "abc-br"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abc-deflate"', '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches("", '"abc"')
+
+
+@pytest.mark.parametrize("path", ["/page", "/static/app.js"])
+def test_etag_per_encoding(client, path):
+    """不同编码的响应使用不同的 ETag，并能用于条件请求"""
+    identity = client.get(path, headers={"accept-encoding": "identity"})
+    gzipped = client.get(path, headers={"accept-encoding": "gzip"})
+    assert identity.content == gzipped.content == CONTENT
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == encoding_etag(identity.headers["etag"], "gzip")
+
+    for response, accept in ((identity, "identity"), (gzipped, "gzip")):
+        cached = client.get(
+            path,
+            headers={
+                "accept-encoding": accept,
+                "if-none-match": response.headers["etag"],
+            },
+        )
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == response.headers["etag"]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_prefork.py
+@Time    :   2026/10/20 12:26:40
+@Desc    :   预先 fork 的多进程启动器回收 worker
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+
+from core.tools.prefork import PreforkServer
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+
+SERVER = """
+import os
+import sys
+
+from fastapi import FastAPI
+
+from core.tools.prefork import PreforkServer
+
+app = FastAPI()
+
+
+@app.get("/pid")
+def pid():
+    return os.getpid()
+
+
+PreforkServer(
+    app,
+    PreforkServer.PreforkConfig(
+        PORT=int(sys.argv[1]),
+        WORKERS=1,
+        MAX_REQUESTS=3,
+        CHECK_INTERVAL=0.05,
+    ),
+).run()
+"""
+
+
+def free_port() -> int:
+    """获取一个空闲的端口"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_recycle_spawns_before_stopping(monkeypatch):
+    """请求数达到上限的 worker 先启动替代的 worker 再通知退出，重复通知只处理一次"""
+    server = PreforkServer(FastAPI(), PreforkServer.PreforkConfig(MAX_REQUESTS=10))
+    calls = []
+    monkeypatch.setattr(server, "spawn_worker", lambda: calls.append("spawn"))
+    monkeypatch.setattr(server, "stop_worker", lambda pid: calls.append(pid))
+    server.workers = {101: 0.0, 102: 0.0}
+    server.recycle_pipe = os.pipe()
+    os.set_blocking(server.recycle_pipe[0], False)
+    try:
+        server.check_requests()
+        assert calls == []
+
+        os.write(server.recycle_pipe[1], b"101\n999\n")
+        os.write(server.recycle_pipe[1], b"101\n")
+        server.check_requests()
+        assert calls == ["spawn", 101]
+        assert server.retiring == {101}
+        assert list(server.workers) == [102]
+    finally:
+        for fd in server.recycle_pipe:
+            os.close(fd)
+
+
+def test_request_limit_without_gap():
+    """Worker 达到请求数上限后先启动新的 worker 再退出，期间端口始终有 worker 监听"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER, str(port)],
+        cwd=Path(__file__).parents[2],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        pids, refused = [], 0
+        deadline = time.monotonic() + 30
+        while len(set(pids)) < 4:
+            assert time.monotonic() < deadline, pids
+            try:
+                with urllib.request.urlopen(
+                    f"http://127.0.0.1:{port}/pid", timeout=5
+                ) as response:
+                    pids.append(int(response.read()))
+            except OSError as e:
+                # 退出的 worker 会关闭已接受、还没有收到请求的连接，
+                # 只允许在第一个 worker 启动之前拒绝连接
+                if isinstance(getattr(e, "reason", e), ConnectionRefusedError):
+                    refused += bool(pids)
+                    time.sleep(0.01)
+        assert refused == 0
+        # 每个 worker 至少处理到上限才被替换
+        assert all(pids.count(pid) >= 3 for pid in list(dict.fromkeys(pids))[:-1])
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_profiling.py
+@Time    :   2026/10/20 12:04:51
+@Desc    :   启动耗时预算检查
+"""
+
+import pytest
+
+from core.libs.profiling import (
+    BUDGET_ENV,
+    BUDGET_MODE_ENV,
+    StartupBudgetExceeded,
+    StartupProfile,
+)
+
+
+def make_report(startup_ms: float = 120.0) -> dict:
+    """只包含预算检查用到的字段的启动报告"""
+    return {"startup_ms": startup_ms, "phases": {"plugins": 80.0, "routes": 30.0}}
+
+
+def test_no_budget(monkeypatch):
+    """未设置预算时不检查"""
+    monkeypatch.delenv(BUDGET_ENV, raising=False)
+    assert StartupProfile.check_budget(make_report()) is None
+    monkeypatch.setenv(BUDGET_ENV, " ")
+    assert StartupProfile.check_budget(make_report()) is None
+
+
+def test_within_and_over_budget(monkeypatch):
+    """超出预算时返回说明，包含最慢的阶段"""
+    monkeypatch.setenv(BUDGET_ENV, "200")
+    report = make_report()
+    assert StartupProfile.check_budget(report) is None
+    assert report["budget_ms"] == 200.0
+
+    monkeypatch.setenv(BUDGET_ENV, "100")
+    message = StartupProfile.check_budget(make_report())
+    assert message == (
+        "Startup took 120.0ms, budget is 100.0ms, slowest phase: plugins 80.0ms"
+    )
+    monkeypatch.setenv(BUDGET_MODE_ENV, "fail")
+    with pytest.raises(StartupBudgetExceeded, match="budget is 100.0ms"):
+        StartupProfile.check_budget(make_report())
+
+
+@pytest.mark.parametrize("budget", ["abc", "100ms", "0", "-5", "nan", "inf"])
+def test_invalid_budget(monkeypatch, budget):
+    """预算不是正数时给出明确的说明，fail 模式下启动失败"""
+    monkeypatch.setenv(BUDGET_ENV, budget)
+    report = make_report()
+    message = StartupProfile.check_budget(report)
+    assert message.startswith(f"Invalid {BUDGET_ENV}={budget!r}")
+    assert "budget_ms" not in report
+    monkeypatch.setenv(BUDGET_MODE_ENV, "fail")
+    with pytest.raises(StartupBudgetExceeded, match="positive number"):
+        StartupProfile.check_budget(report)
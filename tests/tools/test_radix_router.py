@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_radix_router.py
+@Time    :   2026/10/20 11:02:26
+@Desc    :   基数树路由与 starlette 默认路由的匹配结果一致
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from core.tools.radix_router import RadixDispatcher, TrackedRoutes, install_radix_router
+
+
+def route(path: str, name: str, methods: tuple[str, ...] = ("GET",)) -> Route:
+    """创建路由，接口返回路由名称及匹配到的参数"""
+
+    async def endpoint(request: Request) -> JSONResponse:
+        return JSONResponse(
+            {
+                "route": name,
+                "root_path": request.scope.get("root_path", ""),
+                "params": {k: repr(v) for k, v in request.path_params.items()},
+            }
+        )
+
+    return Route(path, endpoint, methods=list(methods), name=name)
+
+
+def create_app(radix: bool) -> FastAPI:
+    """创建路由相同的应用，radix 为真时使用基数树匹配"""
+    app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+    app.router.routes.extend(
+        [
+            route("/", "root"),
+            # 同一段的不同参数类型按注册顺序匹配
+            route("/items/special", "special"),
+            route("/items/{item_id:int}", "item_int"),
+            route("/items/{item_id:float}", "item_float"),
+            route("/items/{name}", "item_str"),
+            route("/items/{item_id:int}/detail", "item_detail"),
+            route("/ids/{uid:uuid}", "uuid"),
+            route("/ids/{name:str}", "uuid_fallback"),
+            # 可能跨越多段的参数
+            route("/files/{file_path:path}", "file_path"),
+            route("/files/{file_path:path}/meta", "file_meta"),
+            # 片段中不止一个参数
+            route("/reports/{name}.json", "report_json"),
+            route("/reports/{year:int}-{month:int}", "report_month"),
+            # 方法不匹配时返回 405
+            route("/only-post", "only_post", ("POST",)),
+            route("/items/{item_id:int}", "item_delete", ("DELETE",)),
+            # 末尾斜杠的重定向
+            route("/slash/", "slash"),
+            route("/no-slash", "no_slash"),
+            Mount(
+                "/sub",
+                routes=[
+                    route("/", "sub_root"),
+                    route("/users/{user_id:int}", "sub_user"),
+                    route("/users/{user_id:int}", "sub_user_put", ("PUT",)),
+                ],
+                name="sub",
+            ),
+            route("/sub/extra", "after_mount"),
+        ]
+    )
+    if radix:
+        install_radix_router(app)
+    return app
+
+
+PATHS = [
+    "/",
+    "/items/special",
+    "/items/1",
+    "/items/-1",
+    "/items/1.5",
+    "/items/abc",
+    "/items/1/detail",
+    "/items/abc/detail",
+    "/items/",
+    "/items",
+    "/ids/12345678-1234-5678-1234-567812345678",
+    "/ids/not-a-uuid",
+    "/files/a",
+    "/files/a/b/c.txt",
+    "/files/a/b/meta",
+    "/files/",
+    "/reports/daily.json",
+    "/reports/2026-10",
+    "/reports/2026-oct",
+    "/only-post",
+    "/only-post/",
+    "/slash",
+    "/slash/",
+    "/no-slash/",
+    "/no-slash",
+    "/sub",
+    "/sub/",
+    "/sub/users/7",
+    "/sub/users/x",
+    "/sub/extra",
+    "/missing",
+    "/missing/",
+    "//items/1",
+    # 路由正则的 $ 可以匹配结尾的换行符
+    "/items/1%0A",
+    "/no-slash%0A",
+    "/items/%E4%B8%AD%E6%96%87",
+]
+
+
+@pytest.fixture(scope="module")
+def clients() -> tuple[TestClient, TestClient]:
+    """默认路由和基数树路由的客户端"""
+    return TestClient(create_app(False)), TestClient(create_app(True))
+
+
+def outcome(response) -> tuple:
+    """比较用的响应内容"""
+    return (
+        response.status_code,
+        response.content,
+        response.headers.get("location"),
+        response.headers.get("allow"),
+    )
+
+
+@pytest.mark.parametrize("method", ["GET", "POST", "PUT", "DELETE", "HEAD"])
+@pytest.mark.parametrize("path", PATHS)
+def test_same_result_as_router(clients, path, method):
+    """相同的请求得到相同的路由、参数、状态码、重定向地址及 Allow"""
+    default_client, radix_client = clients
+    expected = default_client.request(method, path, follow_redirects=False)
+    result = radix_client.request(method, path, follow_redirects=False)
+    assert outcome(result) == outcome(expected)
+
+
+def test_cases_cover_router_branches(clients):
+    """用例覆盖完整匹配、405、重定向和 404"""
+    default_client, _ = clients
+    statuses = {
+        default_client.get(path, follow_redirects=False).status_code for path in PATHS
+    }
+    assert {200, 307, 404, 405} <= statuses
+    assert default_client.get("/items/1%0A").json()["route"] == "item_int"
+
+
+def test_routes_added_after_install():
+    """安装之后添加、删除的路由立即生效"""
+    app = create_app(True)
+    client = TestClient(app)
+    assert client.get("/late").status_code == 404
+    app.router.routes.append(route("/late", "late"))
+    assert client.get("/late").json()["route"] == "late"
+    app.router.routes.pop()
+    assert client.get("/late").status_code == 404
+
+
+def test_routes_list_replaced_after_install():
+    """路由列表被整个替换之后重新包装，新的路由生效"""
+    app = create_app(True)
+    client = TestClient(app)
+    assert client.get("/items/1").json()["route"] == "item_int"
+    app.router.routes = [r for r in app.router.routes if r.name != "item_int"]
+    assert client.get("/items/1").json()["route"] == "item_float"
+    assert isinstance(app.router.routes, TrackedRoutes)
+    app.router.routes.append(route("/late", "late"))
+    assert client.get("/late").json()["route"] == "late"
+
+
+def test_dispatcher_wraps_routes():
+    """分发器把路由列表替换为记录修改次数的列表"""
+    app = FastAPI()
+    dispatcher = install_radix_router(app)
+    assert isinstance(dispatcher, RadixDispatcher)
+    assert isinstance(app.router.routes, TrackedRoutes)
+    assert app.router.middleware_stack is dispatcher
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_responses.py
+@Time    :   2026/10/20 11:32:18
+@Desc    :   流式 JSON 及 NDJSON 响应
+"""
+
+import datetime
+import json
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from core.middleware.base import BaseResponseMiddleware
+from core.plugins.loguru.client import LoguruPluginClient
+from core.plugins.loguru.middleware import LoguruPluginClientMiddleware
+from core.tools.responses import StreamingJSONResponse, StreamingNDJSONResponse
+
+ITEMS = [{"id": i, "name": f"user{i:04d}"} for i in range(50)]
+
+
+class Tracked:
+    """记录是否已关闭的迭代器"""
+
+    def __init__(self, items) -> None:
+        self.items = list(items)
+        self.yielded = 0
+        self.closed = False
+
+    def __iter__(self):
+        """同步迭代"""
+        try:
+            for item in self.items:
+                self.yielded += 1
+                yield item
+        finally:
+            self.closed = True
+
+    async def __aiter__(self):
+        """异步迭代"""
+        try:
+            for item in self.items:
+                self.yielded += 1
+                yield item
+        finally:
+            self.closed = True
+
+
+async def collect(response: StreamingJSONResponse) -> list[bytes]:
+    """读取响应的全部分块"""
+    return [chunk async for chunk in response.body_iterator]
+
+
+def parse_ndjson(body: bytes) -> list:
+    """逐行解析 NDJSON"""
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("is_async", [False, True])
+async def test_empty_iterator(is_async):
+    """空结果返回 [] ，NDJSON 不返回任何内容"""
+    content = Tracked([]).__aiter__() if is_async else iter([])
+    assert await collect(StreamingJSONResponse(content)) == [b"[]"]
+    content = Tracked([]).__aiter__() if is_async else iter([])
+    assert await collect(StreamingNDJSONResponse(content)) == []
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("is_async", [False, True])
+@pytest.mark.parametrize("chunk_size", [1, 30, 200, 64 * 1024])
+async def test_chunk_boundaries(is_async, chunk_size):
+    """按 chunk_size 攒成分块，分块拼接后是完整的 JSON 数组及 NDJSON"""
+    items = Tracked(ITEMS)
+    content = items.__aiter__() if is_async else iter(items)
+    chunks = await collect(StreamingJSONResponse(content, chunk_size=chunk_size))
+    assert json.loads(b"".join(chunks)) == ITEMS
+    assert items.closed
+    # 除了最后的分块及结尾的 ]，每个分块都不小于 chunk_size
+    assert chunks[-1] == b"]"
+    for chunk in chunks[:-2]:
+        assert len(chunk) > chunk_size
+    if chunk_size == 1:
+        assert len(chunks) == len(ITEMS) + 1
+
+    items = Tracked(ITEMS)
+    content = items.__aiter__() if is_async else iter(items)
+    chunks = await collect(StreamingNDJSONResponse(content, chunk_size=chunk_size))
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert parse_ndjson(b"".join(chunks)) == ITEMS
+
+
+@pytest.mark.anyio
+async def test_objects_use_serializer():
+    """非字典元素使用 default_serializer 转换"""
+
+    class User:
+        def __init__(self, id: int) -> None:
+            self.id = id
+            self.created = datetime.datetime(2026, 10, 20, 8, 0, 0, 1)
+
+    chunks = await collect(StreamingJSONResponse([User(1), {"id": 2}]))
+    assert json.loads(b"".join(chunks)) == [
+        {"id": 1, "created": "2026-10-20 08:00:00"},
+        {"id": 2},
+    ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("is_async", [False, True])
+@pytest.mark.parametrize("spec_version", ["2.0", "2.4"])
+async def test_close_iterator_on_disconnect(is_async, spec_version):
+    """客户端断开时关闭迭代器，不再继续生成元素"""
+    items = Tracked(ITEMS * 100)
+    content = items.__aiter__() if is_async else iter(items)
+    response = StreamingJSONResponse(content, chunk_size=100)
+    sent = []
+    disconnected = anyio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+        if len(sent) == 3:
+            disconnected.set()
+            if spec_version == "2.4":
+                raise OSError("client disconnected")
+            await anyio.sleep_forever()
+
+    scope = {"type": "http", "asgi": {"spec_version": spec_version}}
+    if spec_version == "2.4":
+        with pytest.raises(ClientDisconnect):
+            await response(scope, receive, send)
+    else:
+        await response(scope, receive, send)
+    assert items.closed
+    assert items.yielded < len(items.items)
+
+
+class CaptureMiddleware(BaseResponseMiddleware):
+    """记录传给 after_request 的响应"""
+
+    body_limit = 100
+    responses = []
+
+    async def after_request(self, request, res=None):
+        """保存响应"""
+        self.responses.append(res)
+
+
+@pytest.mark.parametrize("is_proxy", [False, True])
+def test_middleware_body_limit(is_proxy):
+    """中间件最多保留 body_limit 个字节，流式响应结束时才调用 after_request"""
+    CaptureMiddleware.responses = []
+    app = FastAPI()
+    app.add_middleware(CaptureMiddleware, is_proxy=is_proxy)
+
+    @app.get("/users")
+    def users():
+        return StreamingNDJSONResponse(ITEMS, chunk_size=30)
+
+    @app.get("/small")
+    def small():
+        return StreamingJSONResponse(ITEMS[:1])
+
+    client = TestClient(app)
+    response = client.get("/users")
+    assert parse_ndjson(response.content) == ITEMS
+    (captured,) = CaptureMiddleware.responses
+    assert captured.body == response.content[: CaptureMiddleware.body_limit]
+
+    assert client.get("/small").json() == ITEMS[:1]
+    assert (
+        CaptureMiddleware.responses[-1].body
+        == json.dumps(ITEMS[:1], separators=(",", ":")).encode()
+    )
+
+
+def test_loguru_record_response_limit(monkeypatch, tmp_path):
+    """日志中间件最多保留 RECORD_RESPONSE_LIMIT 个字节，超出时注明总大小"""
+    responses = []
+
+    async def after_request(self, request, context, response=None):
+        responses.append(response)
+
+    monkeypatch.setattr(LoguruPluginClientMiddleware, "after_request", after_request)
+    app = FastAPI()
+    LoguruPluginClient(
+        app=app,
+        name="Loguru",
+        settings=LoguruPluginClient.LoguruConfig(
+            LOG_FILE_PATH=str(tmp_path / "logs"),
+            FLITER_REQUEST_URL=[],
+            RECORD_RESPONSE_LIMIT=100,
+        ),
+    )
+
+    @app.get("/users")
+    def users():
+        return StreamingJSONResponse(ITEMS, chunk_size=30)
+
+    response = TestClient(app).get("/users")
+    assert response.json() == ITEMS
+    (captured,) = responses
+    assert captured.body.decode() == (
+        f"{response.text[:100]}...(truncated, {len(response.content)} bytes)"
+    )
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_router.py
+@Time    :   2026/10/19 22:58:03
+@Desc    :   控制器发现清单及延迟导入
+"""
+
+import json
+import os
+import stat
+import sys
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from core.plugins.events import base as events_base
+from core.plugins.events.client import EventBusPluginClient
+from core.plugins.loguru.client import LoguruPluginClient
+from core.plugins.loguru.enums import LogPolicy
+from core.plugins.pluginbase import plugins_lifespan
+from core.tools.router import (
+    ControllerManifest,
+    default_manifest_path,
+    load_controller_modules,
+)
+
+CONTROLLER = """
+from fastapi import APIRouter
+
+from core.plugins.events import Event, subscriber
+from core.plugins.loguru.enums import LogPolicy
+from core.plugins.loguru.filter import log_policy
+
+router = APIRouter(prefix="/demo")
+received = []
+
+
+class Pinged(Event):
+    name: str
+
+
+@subscriber(Pinged)
+async def on_pinged(event: Pinged):
+    received.append(event.name)
+
+
+@router.get("/ping")
+async def ping():
+    return {"pong": True}
+
+
+@router.get("/quiet")
+@log_policy(LogPolicy.SKIP)
+async def quiet():
+    return {}
+"""
+
+
+@pytest.fixture
+def module_dir(tmp_path, monkeypatch) -> str:
+    """在临时目录中创建包含一个控制器的模块目录"""
+    package = tmp_path / "lazy_modules" / "demo"
+    package.mkdir(parents=True)
+    (tmp_path / "lazy_modules" / "__init__.py").write_text("")
+    (package / "__init__.py").write_text("")
+    (package / "controller.py").write_text(CONTROLLER)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    # 模块中的订阅者注册到独立的列表，不影响其他测试
+    monkeypatch.setattr(events_base, "subscribers", [])
+    yield "lazy_modules"
+    for name in [name for name in sys.modules if name.startswith("lazy_modules")]:
+        del sys.modules[name]
+
+
+def test_default_manifest_is_private(module_dir):
+    """默认清单放在当前用户的缓存目录中，只有当前用户可以读写"""
+    path = default_manifest_path(module_dir)
+    assert path.startswith(os.environ["XDG_CACHE_HOME"])
+    load_controller_modules(APIRouter(prefix="/api"), module_dir)
+    data = json.loads(open(path, encoding="utf-8").read())
+    assert data["modules"]["lazy_modules.demo.controller"]["prefix"] == "/demo"
+    if os.name != "nt":
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+    # 替换写入，目录中不残留临时文件
+    assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]
+
+
+def test_manifest_save_replaces_file(tmp_path):
+    """保存时替换整个文件，读取方不会看到写了一半的清单"""
+    path = str(tmp_path / "manifest.json")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("stale")
+    inode = os.stat(path).st_ino
+    manifest = ControllerManifest(path, "missing_dir")
+    manifest.changed = True
+    manifest.save()
+    assert (
+        json.loads(open(path, encoding="utf-8").read())["module_dir"] == "missing_dir"
+    )
+    assert os.stat(path).st_ino != inode
+
+
+def test_lazy_import_refreshes_plugins(module_dir, tmp_path):
+    """延迟导入的模块加载后，其中的订阅者启动，路由的日志策略生效"""
+    # 第一次启动时导入模块，清单记录路由前缀
+    load_controller_modules(APIRouter(prefix="/api"), module_dir)
+    del sys.modules["lazy_modules.demo.controller"]
+    events_base.subscribers.clear()
+
+    app = FastAPI(lifespan=plugins_lifespan)
+    events = EventBusPluginClient(app=app, name="Events")
+    loguru = LoguruPluginClient(
+        app=app,
+        name="Loguru",
+        settings=LoguruPluginClient.LoguruConfig(
+            LOG_FILE_PATH=str(tmp_path / "logs"), FLITER_REQUEST_URL=[]
+        ),
+    )
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    app_router = APIRouter(prefix="/api")
+    report = load_controller_modules(app_router, module_dir, lazy=True, app=app)
+    app.include_router(app_router)
+    assert report["lazy_modules.demo.controller"]["lazy"] is True
+
+    with TestClient(app) as client:
+        # 第一次请求生成路由策略表，此时模块还没有导入
+        assert client.get("/health").status_code == 200
+        assert loguru.route_policy_table is not None
+        assert events.queues == {}
+
+        assert client.get("/api/demo/ping").json() == {"pong": True}
+        module = sys.modules["lazy_modules.demo.controller"]
+        assert [item.name for item in events.queues.values()] == [
+            "lazy_modules.demo.controller.on_pinged"
+        ]
+        assert next(iter(events.queues.values())).task is not None
+        events.publish_nowait(module.Pinged(name="lazy"))
+        client.get("/health")
+
+        scope = {"type": "http", "path": "/api/demo/quiet", "method": "GET"}
+        assert loguru.resolve_log_policy(scope) == LogPolicy.SKIP
+    assert module.received == ["lazy"]
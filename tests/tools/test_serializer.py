@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@File    :   test_serializer.py
+@Time    :   2026/10/20 11:05:26
+@Desc    :   按类型编译转换计划的对象序列化
+"""
+
+import datetime
+import decimal
+import enum
+import json
+import pathlib
+import uuid
+from dataclasses import dataclass, field
+
+import pytest
+from pydantic import BaseModel, ConfigDict
+
+from core.tools.json_helper import CJsonEncoder
+from core.tools.serializer import CircularReferenceError, ObjectSerializer
+
+
+class Plain:
+    """只有 __dict__ 的普通对象"""
+
+    def __init__(self, **kwargs) -> None:
+        self.__dict__.update(kwargs)
+
+
+class Slotted:
+    """只有 __slots__ 的对象"""
+
+    __slots__ = ("id", "name")
+
+    def __init__(self, id: int, name: str) -> None:
+        self.id = id
+        self.name = name
+
+
+class SlottedChild(Slotted):
+    """父类有 __slots__，自身没有定义 __slots__，实例同时有 __dict__"""
+
+    def __init__(self, id: int, name: str, **kwargs) -> None:
+        super().__init__(id, name)
+        self.__dict__.update(kwargs)
+
+
+class SlottedWithDict:
+    """__slots__ 中显式包含 __dict__"""
+
+    __slots__ = ("id", "__dict__")
+
+    def __init__(self, id: int, **kwargs) -> None:
+        self.id = id
+        self.__dict__.update(kwargs)
+
+
+class Level(enum.Enum):
+    """枚举的值按值的类型转换"""
+
+    LOW = 1
+    AT = datetime.date(2026, 10, 20)
+
+
+@dataclass
+class Item:
+    """dataclass"""
+
+    sku: str
+    price: decimal.Decimal
+    tags: list = field(default_factory=list)
+
+
+class Order(BaseModel):
+    """允许额外字段的 pydantic 模型"""
+
+    model_config = ConfigDict(extra="allow", arbitrary_types_allowed=True)
+
+    id: int
+    created: datetime.datetime
+    items: list[Item] = []
+
+
+@pytest.fixture
+def serializer() -> ObjectSerializer:
+    """每个测试使用独立的转换计划缓存"""
+    return ObjectSerializer()
+
+
+def test_primitives_and_containers(serializer):
+    """基础类型原样返回，列表、集合、元组转换为列表，字典的 key 保持不变"""
+    assert serializer.to_dict(None) is None
+    assert serializer.to_dict("a") == "a"
+    assert serializer.to_dict((1, 2)) == [1, 2]
+    assert serializer.to_dict(frozenset({3})) == [3]
+    assert serializer.to_dict({1: {"a": (Level.LOW,)}}) == {1: {"a": [1]}}
+
+
+def test_slots_and_dict(serializer):
+    """__slots__ 与 __dict__ 的字段都会输出，未赋值的 slots 字段跳过"""
+    assert serializer.to_dict(Slotted(1, "a")) == {"id": 1, "name": "a"}
+    assert serializer.to_dict(SlottedChild(1, "a", extra=Level.LOW)) == {
+        "id": 1,
+        "name": "a",
+        "extra": 1,
+    }
+    assert serializer.to_dict(SlottedWithDict(2, note=b"x")) == {"id": 2, "note": "x"}
+    empty = Slotted.__new__(Slotted)
+    assert serializer.to_dict(empty) == {}
+    # 同一个类型的实例新增了 __dict__ 字段
+    assert serializer.to_dict([Plain(a=1), Plain(b=[Plain(c=2)])]) == [
+        {"a": 1},
+        {"b": [{"c": 2}]},
+    ]
+
+
+def test_dataclass_and_pydantic(serializer):
+    """按字段输出 dataclass，pydantic 模型的额外字段也会输出"""
+    created = datetime.datetime(2026, 10, 20, 8, 30, 15, 123456)
+    order = Order(
+        id=1,
+        created=created,
+        items=[Item("a", decimal.Decimal("1.50"), tags={"x"})],
+        remark=Plain(at=datetime.date(2026, 1, 2)),
+    )
+    assert serializer.to_dict(order) == {
+        "id": 1,
+        "created": "2026-10-20 08:30:15",
+        "items": [{"sku": "a", "price": 1.5, "tags": ["x"]}],
+        "remark": {"at": "2026-01-02"},
+    }
+    assert serializer.to_dict(Order(id=2, created=created)) == {
+        "id": 2,
+        "created": "2026-10-20 08:30:15",
+        "items": [],
+    }
+
+
+def test_stdlib_passthrough(serializer):
+    """标准库中的其他类型原样返回，交给 JSON 编码器处理"""
+    value = uuid.uuid4()
+    path = pathlib.PurePosixPath("/tmp/a")
+    delta = datetime.timedelta(seconds=1)
+    assert serializer.to_dict([value, path, delta]) == [value, path, delta]
+
+
+def test_circular_reference_through_list(serializer):
+    """对象经过列表引用自身"""
+    node = Plain(children=[])
+    node.children.append(node)
+    with pytest.raises(CircularReferenceError):
+        serializer.to_dict(node)
+
+    values = []
+    values.append({"self": values})
+    with pytest.raises(CircularReferenceError):
+        serializer.to_dict(values)
+
+
+def test_circular_reference_through_objects(serializer):
+    """对象之间互相引用"""
+    parent = Slotted(1, "parent")
+    child = SlottedChild(2, "child", parent=parent)
+    parent.name = child
+    with pytest.raises(CircularReferenceError):
+        serializer.to_dict(parent)
+    # 循环引用的检查不影响之后的转换
+    parent.name = "parent"
+    assert serializer.to_dict(child)["parent"] == {"id": 1, "name": "parent"}
+
+
+def test_shared_reference_is_not_circular(serializer):
+    """同一个对象被多处引用时不是循环引用"""
+    shared = Plain(a=1)
+    assert serializer.to_dict([shared, {"x": shared}, Plain(y=shared)]) == [
+        {"a": 1},
+        {"x": {"a": 1}},
+        {"y": {"a": 1}},
+    ]
+
+
+class LocalDateTime(datetime.datetime):
+    """datetime 的子类"""
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        datetime.datetime(2026, 10, 20, 8, 30, 15, 999999),
+        datetime.datetime(2026, 10, 20, tzinfo=datetime.UTC),
+        datetime.datetime(999, 1, 2, 3, 4, 5),
+        LocalDateTime(2026, 1, 1, 0, 0, 1),
+        datetime.date(2026, 10, 20),
+        datetime.date(5, 1, 1),
+        decimal.Decimal("3.14"),
+        decimal.Decimal("-0.000001"),
+        b"bytes",
+        "中文".encode(),
+    ],
+)
+def test_same_as_cjson_encoder(serializer, value):
+    """datetime、date、Decimal、bytes 的转换结果与 CJsonEncoder 一致"""
+    expected = json.loads(json.dumps({"v": value}, cls=CJsonEncoder))
+    assert json.loads(json.dumps({"v": serializer.to_dict(value)})) == expected
+    assert serializer.to_dict(Plain(v=value)) == expected